@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: bench_frame_encode.py
+Update: 2026.10.18
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.frame_writer import save_frame  # noqa: E402
+
+SIZES = {
+    '1080p': (1080, 1920),
+    '4k': (2160, 3840),
+}
+
+
+def make_frame(height, width, seed=0):
+    """
+    生成接近真实视频画面的 BGR 测试帧（平滑渐变叠加轻微噪声）。
+
+    :param height: 帧高度。
+    :param width: 帧宽度。
+    :param seed: 随机种子。
+    :return: BGR 图像数组。
+    """
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    frame = np.stack([x / width * 255, y / height * 255, (x + y) / (width + height) * 255], axis=-1)
+    frame += rng.normal(0, 6, frame.shape)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def bench(frame, target_format, backend, repeat, output_dir):
+    """
+    测试单个编码后端保存一帧的平均耗时。
+
+    :param frame: BGR 图像数组。
+    :param target_format: 目标格式。
+    :param backend: 编码后端，'cv2' 或 'pil'。
+    :param repeat: 重复次数。
+    :param output_dir: 临时输出文件夹。
+    :return: (每帧平均毫秒数, 文件字节数)。
+    """
+    filepath = os.path.join(output_dir, f"frame_{backend}.{target_format}")
+    save_frame(frame, filepath, backend)  # 预热
+    start = time.perf_counter()
+    for _ in range(repeat):
+        save_frame(frame, filepath, backend)
+    elapsed = time.perf_counter() - start
+    return elapsed / repeat * 1000, os.path.getsize(filepath)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比 cv2 与 PIL 两种抽帧编码后端的保存耗时")
+    parser.add_argument('--sizes', nargs='+', default=list(SIZES), choices=list(SIZES), help="测试分辨率")
+    parser.add_argument('--formats', nargs='+', default=['jpeg', 'png', 'bmp', 'tiff'], help="测试格式")
+    parser.add_argument('--repeat', type=int, default=5, help="每项重复次数")
+    args = parser.parse_args()
+
+    print(f"{'size':<6} {'format':<6} {'pil ms':>9} {'cv2 ms':>9} {'speedup':>8} {'pil KB':>9} {'cv2 KB':>9}")
+    with tempfile.TemporaryDirectory() as output_dir:
+        for size in args.sizes:
+            frame = make_frame(*SIZES[size])
+            for target_format in args.formats:
+                pil_ms, pil_bytes = bench(frame, target_format, 'pil', args.repeat, output_dir)
+                cv2_ms, cv2_bytes = bench(frame, target_format, 'cv2', args.repeat, output_dir)
+                print(f"{size:<6} {target_format:<6} {pil_ms:>9.1f} {cv2_ms:>9.1f} {pil_ms / cv2_ms:>7.2f}x "
+                      f"{pil_bytes / 1024:>9.0f} {cv2_bytes / 1024:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
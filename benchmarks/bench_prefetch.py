@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: bench_prefetch.py
+Update: 2026.10.18
+"""
+
+import argparse
+import builtins
+import os
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.batch_executor import iter_folder_tasks, map_batch  # noqa: E402
+from core.image_convert import convert_image  # noqa: E402
+from core.prefetch import Prefetcher  # noqa: E402
+
+
+def slow_open(input_dir, latency):
+    """
+    生成模拟网络共享目录的 open：打开输入文件夹中的文件时先等待 latency 秒。
+
+    :param input_dir: 输入文件夹。
+    :param latency: 每次打开的延迟秒数。
+    :return: 替换 builtins.open 的函数。
+    """
+    original_open = builtins.open
+
+    def open_with_latency(file, *args, **kwargs):
+        if isinstance(file, str) and file.startswith(input_dir):
+            time.sleep(latency)
+        return original_open(file, *args, **kwargs)
+
+    return open_with_latency
+
+
+def run(input_dir, output_dir, prefetcher):
+    """
+    在当前进程内顺序转换输入文件夹，返回耗时与 'end' 事件。
+
+    :return: (耗时秒, 'end' 进度事件)。
+    """
+    events = []
+    tasks = [(input_path, output_path, 'jpeg') for input_path, output_path in iter_folder_tasks(input_dir, output_dir)]
+    start = time.perf_counter()
+    for _ in map_batch(convert_image, tasks, workers=1, progress_callback=events.append, prefetch=prefetcher):
+        pass
+    return time.perf_counter() - start, events[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="输入文件预读基准测试（以每次打开文件的固定延迟模拟网络共享目录）")
+    parser.add_argument('--files', type=int, default=100, help="图像文件数")
+    parser.add_argument('--size', type=int, default=640, help="图像边长（像素）")
+    parser.add_argument('--latency-ms', type=float, default=20, help="每次打开文件的模拟延迟（毫秒）")
+    parser.add_argument('--prefetch-files', type=int, default=16, help="预读文件数上限")
+    parser.add_argument('--prefetch-mb', type=float, default=256, help="预读内存上限（MB）")
+    parser.add_argument('--threads', type=int, default=4, help="预读线程数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_dir = os.path.join(temp_dir, 'input')
+        os.makedirs(input_dir)
+        for i in range(args.files):
+            Image.effect_noise((args.size, args.size), 40).convert('RGB').save(os.path.join(input_dir, f'{i:05d}.png'))
+
+        builtins.open = slow_open(input_dir, args.latency_ms / 1000)
+        for name, prefetcher in (('不预读', None),
+                                 ('预读', Prefetcher(args.prefetch_files, args.prefetch_mb * (1 << 20), args.threads))):
+            elapsed, end = run(input_dir, os.path.join(temp_dir, name), prefetcher)
+            line = f"{name:<4} {args.files / elapsed:8.1f} 个/秒, 耗时 {elapsed:6.2f} s"
+            if 'prefetch' in end:
+                stats = end['prefetch']
+                line += (f", 读取 {stats['read_seconds']:.2f} s, 等待 {stats['wait_seconds']:.2f} s, "
+                         f"隐藏 {stats['hidden_seconds']:.2f} s")
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: bench_startup.py
+Update: 2026.10.18
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 启动时导入的模块：GUI 主窗口（需要 PyQt5）与命令行入口，core 单独列出便于对比
+TARGETS = {
+    'core': 'import core',
+    'cli': 'import cli',
+    'gui': 'import main; from ui.main.main_window import MainWindow',
+}
+
+# 启动时不应加载的重量级模块，只有执行对应任务时才导入
+HEAVY_MODULES = ('cv2', 'numpy')
+
+
+def measure_import(statement, repeat=5):
+    """
+    用 python -X importtime 在新进程中执行导入语句，解析各模块的导入耗时。
+
+    :param statement: 导入语句。
+    :param repeat: 重复次数，取总耗时最小的一次，默认为 5。
+    :return: (总耗时微秒, {模块名: 累计耗时微秒})，导入失败时返回 (None, 错误信息)。
+    """
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=APP_DIR,
+                                capture_output=True, text=True, encoding='utf-8', errors='replace')
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+
+        modules = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            # 子模块缩进表示嵌套，顶层模块的累计耗时之和即为总耗时
+            modules[name.strip()] = (int(cumulative), not name[1:].startswith(' '))
+        total = sum(cumulative for cumulative, top_level in modules.values() if top_level)
+        if best is None or total < best[0]:
+            best = (total, {name: cumulative for name, (cumulative, _) in modules.items()})
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动导入耗时基准测试（python -X importtime）")
+    parser.add_argument('--targets', nargs='+', default=list(TARGETS), choices=list(TARGETS), help="测试对象")
+    parser.add_argument('--repeat', type=int, default=5, help="重复次数，取最小值")
+    parser.add_argument('--top', type=int, default=10, help="列出累计耗时最高的模块数")
+    args = parser.parse_args()
+
+    exit_code = 0
+    for target in args.targets:
+        total, modules = measure_import(TARGETS[target], args.repeat)
+        if total is None:
+            print(f"{target:<6} 跳过: {modules}")
+            continue
+        loaded = [name for name in HEAVY_MODULES if name in modules]
+        print(f"{target:<6} 总耗时 {total / 1000:8.1f} ms, 模块数 {len(modules)}, "
+              f"重量级模块: {', '.join(loaded) if loaded else '无'}")
+        for name, cumulative in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+        if loaded:
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: bench_update.py
+Update: 2026.10.18
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network.delta_update import delta_update, write_manifest  # noqa: E402
+from network.server_connect import LocalShareBackend  # noqa: E402
+
+
+class CountingFile:
+    """
+    统计读取字节数的文件包装类。
+    """
+
+    def __init__(self, file, backend):
+        self.file = file
+        self.backend = backend
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.file.close()
+
+    def seek(self, offset):
+        return self.file.seek(offset)
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        self.backend.bytes_read += len(data)
+        return data
+
+
+class CountingBackend(LocalShareBackend):
+    """
+    以本地文件夹代替服务器共享目录，并统计从“服务器”读取的字节数。
+    """
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.bytes_read = 0
+
+    def open_file(self, path, mode='r', **kwargs):
+        file = super().open_file(path, mode, **kwargs)
+        if 'b' in mode:
+            return CountingFile(file, self)
+        self.bytes_read += os.path.getsize(path)  # 文本文件（更新清单）整体读取
+        return file
+
+    def copy_file(self, src, dst):
+        super().copy_file(src, dst)
+        self.bytes_read += os.path.getsize(src)
+
+
+def make_release(remote_dir, files, file_size):
+    """
+    生成模拟的服务器软件文件夹与更新清单。
+
+    :param remote_dir: 服务器软件文件夹。
+    :param files: 文件数。
+    :param file_size: 每个文件的字节数。
+    """
+    os.makedirs(os.path.join(remote_dir, 'settings'), exist_ok=True)
+    with open(os.path.join(remote_dir, 'settings', 'software_infos.toml'), 'w', encoding='utf-8') as f:
+        f.write('version = "V1.6"\n')
+    for i in range(files):
+        sub_dir = os.path.join(remote_dir, 'lib', f'{i % 8}')
+        os.makedirs(sub_dir, exist_ok=True)
+        with open(os.path.join(sub_dir, f'module_{i}.pyd'), 'wb') as f:
+            f.write(os.urandom(file_size))
+    write_manifest(remote_dir)
+
+
+def run_update(remote_dir, local_dir, workers, chunk_size):
+    """
+    执行一次增量更新并统计读取字节数与耗时。
+
+    :return: (更新统计字典, 读取字节数, 耗时秒)。
+    """
+    backend = CountingBackend(os.path.dirname(remote_dir))
+    start = time.perf_counter()
+    stats = delta_update(backend, remote_dir, local_dir, workers=workers, chunk_size=chunk_size)
+    return stats, backend.bytes_read, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="增量更新传输量基准测试（本地文件夹模拟服务器共享目录）")
+    parser.add_argument('--files', type=int, default=64, help="软件文件数")
+    parser.add_argument('--size-mb', type=float, default=2, help="每个文件大小（MB）")
+    parser.add_argument('--workers', type=int, default=4, help="并行下载线程数")
+    parser.add_argument('--chunk-mb', type=float, default=8, help="下载区间大小（MB）")
+    args = parser.parse_args()
+
+    chunk_size = int(args.chunk_mb * (1 << 20))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        remote_dir = os.path.join(temp_dir, 'share', '格式转换软件')
+        local_dir = os.path.join(temp_dir, 'app')
+        os.makedirs(local_dir)
+        make_release(remote_dir, args.files, int(args.size_mb * (1 << 20)))
+
+        # 完整复制（原更新方式）的传输量即全部文件大小
+        backend = CountingBackend(temp_dir)
+        for root, _, names in os.walk(remote_dir):
+            for name in names:
+                backend.copy_file(os.path.join(root, name), os.path.join(temp_dir, 'full_copy_' + name))
+        print(f"完整复制:       {backend.bytes_read / (1 << 20):9.2f} MB")
+
+        scenarios = [('首次更新', None), ('无变化', None), ('一个文件变化', 'lib/3/module_3.pyd')]
+        for name, changed in scenarios:
+            if changed:
+                with open(os.path.join(remote_dir, *changed.split('/')), 'r+b') as f:
+                    f.write(os.urandom(4096))
+                write_manifest(remote_dir)
+            stats, read_bytes, elapsed = run_update(remote_dir, local_dir, args.workers, chunk_size)
+            print(f"{name:<8} 变化文件 {stats['changed']:4d}/{stats['files']}, 下载 {stats['bytes'] / (1 << 20):9.2f} MB, "
+                  f"读取 {read_bytes / 1024:10.1f} KB（含清单）, 耗时 {elapsed:.3f} s")
+        shutil.rmtree(local_dir)
+
+
+if __name__ == '__main__':
+    main()
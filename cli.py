@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: cli.py
+Update: 2026.10.18
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+
+import toml
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class JsonLinesReporter:
+    """
+    命令行进度输出类，每个进度事件输出为标准输出上的一行 JSON，便于流水线解析。
+
+    同时提供与 pyqtSignal 相同的 emit 接口，可作为 error_label 传入核心转换函数。
+
+    Attributes:
+        failed (int): 收到的失败文件与错误信息数量。
+    """
+
+    def __init__(self, stream=None):
+        """
+        初始化进度输出。
+
+        :param stream: 输出流，默认为标准输出。
+        """
+        self.stream = stream or sys.stdout
+        self.failed = 0
+
+    def __call__(self, event):
+        """
+        输出一个进度事件，可直接作为 progress_callback 使用。
+
+        :param event: 进度事件字典。
+        """
+        if event.get('event') == 'end':
+            self.failed = max(self.failed, event.get('failed', 0))
+        self.stream.write(json.dumps(event, ensure_ascii=False, default=str) + '\n')
+        self.stream.flush()
+
+    def emit(self, text):
+        """
+        输出一条错误信息事件，接口与 pyqtSignal.emit 保持一致。
+
+        :param text: 错误信息。
+        """
+        self.failed += 1
+        self({'event': 'error', 'message': text})
+
+
+def run_single(reporter, func, *args, **kwargs):
+    """
+    转换单个文件，并输出与批量转换相同格式的进度事件。
+
+    :param reporter: JsonLinesReporter 进度输出对象。
+    :param func: 单文件转换函数。
+    :param args: 单文件转换函数的位置参数，第一个为输入文件路径。
+    :param kwargs: 单文件转换函数的关键字参数。
+    """
+    start = time.perf_counter()
+    reporter({'event': 'start', 'total': 1, 'skipped': 0})
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        reporter.emit(f"错误: {str(e)}")
+        result = None
+    reporter({'event': 'file', 'input': args[0], 'output': result, 'ok': result is not None, 'done': 1, 'total': 1})
+    reporter({'event': 'end', 'done': 1, 'failed': int(result is None), 'skipped': 0,
+              'elapsed': time.perf_counter() - start})
+
+
+def load_bin_config(args):
+    """
+    合并 bin 参数：软件配置文件（或 --bin-config 指定的 TOML 文件）中的参数被命令行参数覆盖。
+
+    :param args: 命令行参数。
+    :return: bin 参数配置字典。
+    """
+    import config
+
+    if args.bin_config:
+        # 显式指定的文件不存在或格式错误时直接报错，不静默回退到默认参数
+        with open(args.bin_config, 'r', encoding='utf-8') as f:
+            bin_config = {**config.BIN_SETTING_DEFAULT_CONFIG, **toml.load(f)}
+    else:
+        bin_config = config.load_config(config.BIN_SETTING_FILE, config.BIN_SETTING_DEFAULT_CONFIG)
+    overrides = {
+        'width': args.width,
+        'height': args.height,
+        'channels': args.channels,
+        'dtype': args.dtype,
+        'channel_order': args.channel_order,
+        'layout': args.layout,
+        'endianness': args.endianness,
+        'normalize': args.normalize,
+        'flip': args.flip,
+        'rotate': args.rotate,
+        'use_mmap': args.mmap,
+        'multi_frame': args.multi_frame,
+        'header_bytes': args.header_bytes,
+        'frame_header_bytes': args.frame_header_bytes,
+        'frame_footer_bytes': args.frame_footer_bytes,
+    }
+    bin_config.update({key: value for key, value in overrides.items() if value is not None})
+    return bin_config
+
+
+def add_common_arguments(parser):
+    """
+    添加各转换子命令共用的参数。
+
+    :param parser: 子命令解析器。
+    """
+    parser.add_argument('input', help="输入文件或文件夹")
+    parser.add_argument('output', help="输出文件夹")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="批量转换进程数，0 表示自动，默认读取配置")
+    parser.add_argument('--incremental', action=argparse.BooleanOptionalAction, default=None,
+                        help="是否跳过输入与参数均未变化的文件，默认读取配置")
+    parser.add_argument('--resume', action='store_true', help="从输出文件夹中的检查点继续未完成的任务")
+    parser.add_argument('--include', action='append', default=None, metavar='GLOB',
+                        help="只转换匹配该通配符的文件（匹配文件名或相对路径），可重复指定，默认读取配置")
+    parser.add_argument('--exclude', action='append', default=None, metavar='GLOB',
+                        help="跳过匹配该通配符的文件与子文件夹，可重复指定，默认读取配置")
+    parser.add_argument('--ext', dest='extensions', action='append', default=None, metavar='EXT',
+                        help="处理的扩展名，如 .png，可重复指定，默认读取配置")
+
+
+def add_bin_arguments(parser):
+    """
+    添加 bin 参数，未指定的参数读取 --bin-config 文件或软件配置。
+
+    :param parser: 子命令解析器。
+    """
+    parser.add_argument('--bin-config', default=None, help="bin 参数 TOML 文件，默认使用软件配置")
+    parser.add_argument('--width', type=int, default=None, help="图像宽度")
+    parser.add_argument('--height', type=int, default=None, help="图像高度")
+    parser.add_argument('--channels', type=int, default=None, help="通道数")
+    parser.add_argument('--dtype', default=None, help="numpy 数据类型，如 uint8、float32")
+    parser.add_argument('--channel-order', default=None, choices=['RGB', 'BGR', 'GRAY'], help="通道顺序")
+    parser.add_argument('--layout', default=None, choices=['HWC', 'CHW'], help="数据排列方式")
+    parser.add_argument('--endianness', default=None, choices=['little', 'big'], help="字节序")
+    parser.add_argument('--normalize', action=argparse.BooleanOptionalAction, default=None,
+                        help="是否将 float 图像归一化到 0~255")
+    parser.add_argument('--flip', action=argparse.BooleanOptionalAction, default=None, help="是否垂直翻转")
+    parser.add_argument('--rotate', type=int, default=None, choices=[0, 90, 180, 270], help="旋转角度")
+    parser.add_argument('--mmap', action=argparse.BooleanOptionalAction, default=None, help="是否内存映射读取")
+    parser.add_argument('--multi-frame', action=argparse.BooleanOptionalAction, default=None,
+                        help="是否为多帧 bin 文件")
+    parser.add_argument('--header-bytes', type=int, default=None, help="多帧模式文件头字节数")
+    parser.add_argument('--frame-header-bytes', type=int, default=None, help="多帧模式帧头字节数")
+    parser.add_argument('--frame-footer-bytes', type=int, default=None, help="多帧模式帧尾字节数")
+
+
+def build_parser():
+    """
+    构建命令行参数解析器。
+
+    :return: argparse.ArgumentParser 对象。
+    """
+    parser = argparse.ArgumentParser(prog='cli.py', description="格式转换软件命令行版本，进度以 JSON Lines 输出到标准输出")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = subparsers.add_parser('convert_image', help="图片格式转换")
+    add_common_arguments(convert_parser)
+    convert_parser.add_argument('-f', '--format', required=True, help="目标格式，如 jpeg、png")
+
+    video_parser = subparsers.add_parser('video_to_image', help="视频抽帧或转 GIF（不支持 --incremental）")
+    add_common_arguments(video_parser)
+    video_parser.add_argument('-f', '--format', required=True, help="目标格式，如 jpeg、png、gif")
+    video_parser.add_argument('-n', '--nums', type=float, required=True, help="每秒提取帧数，GIF 时为分段数量")
+    video_parser.add_argument('--gif-scale', type=float, default=None, help="GIF 帧缩放比例")
+    video_parser.add_argument('--gif-frame-step', type=int, default=None, help="GIF 抽帧间隔")
+    video_parser.add_argument('--segments', type=int, default=None, help="单个视频按时间范围并行抽帧的段数")
+
+    bin_parser = subparsers.add_parser('bin_to_image', help="bin 文件转图片")
+    add_common_arguments(bin_parser)
+    bin_parser.add_argument('-f', '--format', required=True, help="目标格式，如 jpeg、png")
+    add_bin_arguments(bin_parser)
+
+    image_bin_parser = subparsers.add_parser('image_to_bin', help="图片转 bin 文件")
+    add_common_arguments(image_bin_parser)
+
+    resume_parser = subparsers.add_parser('resume', help="从检查点继续未完成的批量任务")
+    resume_parser.add_argument('output', nargs='?', default=None, help="任务输出文件夹，默认为最近一次批量任务")
+
+    watch_parser = subparsers.add_parser('watch', help="监视文件夹，持续转换新写入的 bin、视频与图片文件")
+    watch_parser.add_argument('input', help="监视的输入文件夹")
+    watch_parser.add_argument('output', help="输出文件夹")
+    watch_parser.add_argument('-w', '--workers', type=int, default=None, help="转换进程数，0 表示自动，默认读取配置")
+    watch_parser.add_argument('--queue-size', type=int, default=None, help="等待写入完成与等待转换的文件数上限")
+    watch_parser.add_argument('--stable-time', type=float, default=None, help="文件保持多少秒不变视为写入完成")
+    watch_parser.add_argument('--metrics-interval', type=float, default=None, help="输出运行指标的间隔秒数")
+    watch_parser.add_argument('--bin-format', default=None, help="bin 文件转换的图片格式，空字符串表示不处理")
+    watch_parser.add_argument('--video-format', default=None, help="视频抽帧的图片格式，空字符串表示不处理")
+    watch_parser.add_argument('-n', '--video-nums', type=float, default=None, help="视频每秒抽帧数量")
+    watch_parser.add_argument('--image-format', default=None, help="图片格式转换的目标格式，空字符串表示不处理")
+    add_bin_arguments(watch_parser)
+
+    return parser
+
+
+def run_watch(args, reporter):
+    """
+    运行监视模式，收到 SIGINT 或 SIGTERM 后等待转换中的文件完成再退出。
+
+    :param args: 命令行参数。
+    :param reporter: JsonLinesReporter 进度输出对象。
+    """
+    import core
+
+    overrides = {
+        'workers': args.workers,
+        'queue_size': args.queue_size,
+        'stable_time': args.stable_time,
+        'metrics_interval': args.metrics_interval,
+        'bin_format': args.bin_format,
+        'video_format': args.video_format,
+        'video_nums': args.video_nums,
+        'image_format': args.image_format,
+    }
+    watch_config = {key: value for key, value in overrides.items() if value is not None}
+    service = core.WatchFolderService(args.input, args.output, reporter, reporter, watch_config=watch_config,
+                                      bin_config=load_bin_config(args))
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: service.stop())
+    service.run()
+
+
+def run(args, reporter):
+    """
+    执行子命令。转换过程中收到 SIGINT/SIGTERM 时取消任务，已完成的文件记入检查点，可用 resume 继续。
+
+    :param args: 命令行参数。
+    :param reporter: JsonLinesReporter 进度输出对象。
+    """
+    import core
+
+    if args.command == 'watch':
+        run_watch(args, reporter)
+        return
+
+    cancel_token = core.CancelToken()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: cancel_token.cancel())
+    try:
+        with core.use_token(cancel_token):
+            run_conversion(args, reporter, cancel_token)
+    except core.ConversionCancelled:
+        reporter.emit("错误: 任务已取消")
+
+
+def run_conversion(args, reporter, cancel_token):
+    """
+    执行转换子命令。
+
+    :param args: 命令行参数。
+    :param reporter: JsonLinesReporter 进度输出对象。
+    :param cancel_token: 取消令牌 CancelToken。
+    """
+    import core
+
+    if args.command == 'resume':
+        core.resume_batch(args.output, reporter, progress_callback=reporter, cancel_token=cancel_token)
+        return
+
+    is_dir = os.path.isdir(args.input)
+    batch_kwargs = {'workers': args.workers, 'incremental': args.incremental, 'resume': args.resume,
+                    'progress_callback': reporter, 'cancel_token': cancel_token, 'include': args.include,
+                    'exclude': args.exclude, 'extensions': args.extensions}
+
+    if args.command == 'convert_image':
+        if is_dir:
+            core.convert_images(args.input, args.output, args.format, reporter, **batch_kwargs)
+        else:
+            run_single(reporter, core.convert_image, args.input, args.output, args.format, reporter)
+    elif args.command == 'video_to_image':
+        if is_dir:
+            batch_kwargs.pop('incremental')  # 视频抽帧不支持增量转换
+            core.videos_to_images(args.input, args.output, args.nums, args.format, reporter,
+                                  gif_scale=args.gif_scale, gif_frame_step=args.gif_frame_step, segments=args.segments,
+                                  **batch_kwargs)
+        else:
+            run_single(reporter, core.video_to_images, args.input, args.output, args.nums, args.format, reporter,
+                       gif_scale=args.gif_scale, gif_frame_step=args.gif_frame_step, segments=args.segments,
+                       progress_callback=reporter)
+    elif args.command == 'bin_to_image':
+        bin_config = load_bin_config(args)
+        if is_dir:
+            core.bins_to_images(args.input, args.output, args.format, reporter, bin_config=bin_config,
+                                **batch_kwargs)
+        else:
+            run_single(reporter, core.bin_to_image, args.input, args.output, args.format, reporter,
+                       plan=core.compile_bin_plan(bin_config))
+    elif args.command == 'image_to_bin':
+        if is_dir:
+            core.images_to_bins(args.input, args.output, reporter, **batch_kwargs)
+        else:
+            run_single(reporter, core.image_to_bin, args.input, args.output, reporter)
+
+
+def main(argv=None):
+    """
+    命令行入口。不导入 PyQt5、qt_material 与 smbclient，可在无界面的服务器上运行。
+
+    :param argv: 命令行参数列表，默认为 sys.argv[1:]。
+    :return: 退出码，0 表示全部成功，1 表示有文件失败或任务中断。
+    """
+    args = build_parser().parse_args(argv)
+
+    # 输入输出路径先转为绝对路径，再切换到软件目录，使 settings 中的配置文件与 GUI 共用
+    for name in ('input', 'output', 'bin_config'):
+        if getattr(args, name, None):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+    os.chdir(APP_DIR)
+
+    # 进度只写入原标准输出，核心函数（包括子进程）中的 print 日志重定向到标准错误，保证标准输出可逐行解析
+    sys.stdout.flush()
+    json_stream = os.fdopen(os.dup(sys.stdout.fileno()), 'w', encoding='utf-8')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    reporter = JsonLinesReporter(json_stream)
+    try:
+        run(args, reporter)
+    except Exception as e:
+        reporter({'event': 'error', 'message': f"错误: {str(e)}"})
+        return 1
+    return 1 if reporter.failed else 0
+
+
+if __name__ == '__main__':
+    import multiprocessing
+
+    multiprocessing.freeze_support()
+    sys.exit(main())
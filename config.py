@@ -4,16 +4,22 @@ Project Name: format_conversion
 File Created: 2025.06.24
 Author: ZhangYuetao
 File Name: config.py
-Update: 2025.06.25
+Update: 2026.10.18
 """
 
 import os
 import toml
 
 BIN_SETTING_FILE = r'settings/bin_setting.toml'
+BATCH_SETTING_FILE = r'settings/batch_setting.toml'
+VIDEO_SETTING_FILE = r'settings/video_setting.toml'
 SECRET_FILE = r'settings/.secret.toml'
 SOFTWARE_INFOS_FILE = r'settings/software_infos.toml'
 QT_MATERIAL_THEME_FILE = r'settings/qt_material_theme.toml'
+LAST_JOB_FILE = r'settings/last_job.toml'
+UPDATE_SETTING_FILE = r'settings/update_setting.toml'
+WATCH_SETTING_FILE = r'settings/watch_setting.toml'
+UPDATE_CACHE_FILE = r'settings/update_cache.toml'
 
 ICO_FILE = r'settings/xey.ico'
 
@@ -36,7 +42,77 @@ BIN_SETTING_DEFAULT_CONFIG = {
     'normalize': False,            # 是否将 float 图像归一化到 0~255 并转为 uint8
 
     'flip': False,                 # bool 类型，是否垂直翻转图像
-    'rotate': 0                    # int 类型，旋转角度，支持 0/90/180/270
+    'rotate': 0,                   # int 类型，旋转角度，支持 0/90/180/270
+
+    'use_mmap': True,              # bool 类型，是否以内存映射方式读取 bin 文件（零拷贝，降低大文件内存占用）
+
+    'multi_frame': False,          # bool 类型，是否为多帧 bin 文件（一个文件中连续存放多帧图像，帧数由文件大小自动推算）
+    'header_bytes': 0,             # int 类型，多帧模式下文件头字节数（全局偏移）
+    'frame_header_bytes': 0,       # int 类型，多帧模式下每帧前的帧头字节数
+    'frame_footer_bytes': 0,       # int 类型，多帧模式下每帧后的帧尾字节数
+}
+
+BATCH_SETTING_DEFAULT_CONFIG = {
+    'workers': 0,                  # int 类型，批量转换进程数，0 表示自动使用全部 CPU 核心，1 表示不启用进程池
+    'chunk_size': 4,               # int 类型，每次提交给子进程的文件数
+    'max_in_flight': 0,            # int 类型，同时在途的任务块上限，0 表示进程数的两倍
+    'ordered': False,              # bool 类型，是否按遍历顺序返回结果
+    'incremental': False,          # bool 类型，是否启用增量转换，跳过输入与参数均未变化的文件
+    'hash_content': False,         # bool 类型，增量转换时修改时间变化是否再比较内容哈希
+    'prefetch_files': 16,          # int 类型，预读后续输入文件的数量上限，0 表示不预读，多进程时按进程数平均分配（每个进程至少 1 个）
+    'prefetch_mb': 256,            # float 类型，预读数据的内存上限（MB），多进程时按进程数平均分配，超过分配额的单个文件不预读
+    'prefetch_threads': 4,         # int 类型，预读线程数，多进程时按进程数平均分配（每个进程至少 1 个）
+    'scan_threads': 8,             # int 类型，并行扫描输入文件夹的线程数
+    'scan_include': [],            # list 类型，只转换匹配任一通配符的文件（匹配文件名或相对路径），为空表示不限
+    'scan_exclude': [],            # list 类型，跳过匹配任一通配符的文件与子目录，如 ['.*', 'thumbs', '*_thumb.*']
+    'image_extensions': [],        # list 类型，图像类转换处理的扩展名，为空表示使用内置的图像扩展名
+    'video_extensions': [],        # list 类型，视频抽帧处理的扩展名，为空表示使用内置的视频扩展名
+    'bin_extensions': [],          # list 类型，bin 文件转换处理的扩展名，为空表示 ['.bin']
+}
+
+VIDEO_SETTING_DEFAULT_CONFIG = {
+    'sample_mode': 'auto',         # str 类型，抽帧方式，'grab' 顺序跳帧、'seek' 定位读取、'auto' 按抽帧间隔自动选择
+    'seek_min_stride': 30,         # int 类型，两帧间隔超过该帧数时使用定位读取，否则 grab 跳过中间帧
+    'segments': 1,                 # int 类型，单个视频按时间范围拆分并行抽帧的段数（进程数），1 表示不拆分
+    'encode_threads': 2,           # int 类型，抽帧图像的编码写入线程数，0 表示在解码线程中同步写入
+    'encode_queue_depth': 8,       # int 类型，解码与编码之间的帧队列深度，队列满时解码等待
+    'encode_backend': 'cv2',       # str 类型，抽帧图像编码后端，'cv2' 直接编码 BGR 帧，'pil' 经 PIL 转换后保存
+    'jpeg_quality': 75,            # int 类型，JPEG 质量，0~100
+    'png_compression': 6,          # int 类型，PNG 压缩级别，0~9，越大文件越小、编码越慢
+    'tiff_compression': 'none',    # str 类型，TIFF 压缩方式，'none'、'lzw' 或 'deflate'
+
+    'gif_scale': 1.0,              # float 类型，GIF 帧缩放比例，1.0 表示原尺寸
+    'gif_frame_step': 1,           # int 类型，GIF 抽帧间隔，每隔多少帧保留一帧
+}
+
+WATCH_SETTING_DEFAULT_CONFIG = {
+    'workers': 0,                  # int 类型，监视模式的转换进程数，0 表示自动使用全部 CPU 核心
+    'queue_size': 64,              # int 类型，等待写入完成与等待转换的文件数上限，达到上限时暂停接收新文件
+    'stable_time': 1.0,            # float 类型，文件大小与修改时间保持多少秒不变视为写入完成
+    'file_timeout': 3600,          # int 类型，单个文件等待写入完成的最长秒数
+    'rescan_interval': 5.0,        # float 类型，不支持 inotify 时重新扫描输入文件夹的间隔秒数
+    'metrics_interval': 10.0,      # float 类型，输出运行指标的间隔秒数
+    'bin_format': 'png',           # str 类型，bin 文件转换的图片格式，空字符串表示不处理 bin 文件
+    'video_format': 'jpeg',        # str 类型，视频抽帧的图片格式，空字符串表示不处理视频
+    'video_nums': 1.0,             # float 类型，视频每秒抽帧数量
+    'image_format': '',            # str 类型，图片格式转换的目标格式，空字符串表示不处理图片
+}
+
+LAST_JOB_DEFAULT_CONFIG = {
+    'output_folder': '',           # str 类型，最近一次批量任务的输出文件夹，用于继续未完成的任务
+}
+
+UPDATE_SETTING_DEFAULT_CONFIG = {
+    'check_timeout': 5.0,          # float 类型，启动时后台检查更新的超时秒数，超时视为网络未连接
+    'version_cache_ttl': 21600,    # int 类型，服务器最新版本号的缓存有效秒数，有效期内自动检查不访问服务器，0 表示不缓存
+    'share_lookup_ttl': 300,       # int 类型，服务器上软件文件夹查找结果的缓存有效秒数
+    'download_workers': 4,         # int 类型，增量更新的并行下载线程数
+    'download_chunk_mb': 8,        # int 类型，增量更新时大文件拆分的下载区间大小（MB）
+}
+
+UPDATE_CACHE_DEFAULT_CONFIG = {
+    'server_version': '',          # str 类型，最近一次获取到的服务器最新版本号
+    'checked_at': 0.0,             # float 类型，获取时间（Unix 时间戳）
 }
 
 QT_MATERIAL_THEME_DEFAULT_CONFIG = {
@@ -1,57 +1,138 @@
 # -*- coding: utf-8 -*-
-#
-# Auto created by: auto_generate_init.py
-#
 """
 Project Name: format_conversion
 File Created: 2025.06.24
 Author: ZhangYuetao
 File Name: __init__.py
-Update: 2025.06.25
+Update: 2026.10.18
 """
 
-# 导入 bin_to_image 模块中的函数
-from .bin_to_image import (
-    bin_to_image,
-    bins_to_images,
-)
-
-# 导入 image_convert 模块中的函数
-from .image_convert import (
-    convert_image,
-    convert_images,
-)
-
-# 导入 image_to_bin 模块中的函数
-from .image_to_bin import (
-    image_to_bin,
-    images_to_bins,
-)
-
-# 导入 video_to_image 模块中的函数
-from .video_to_image import (
-    get_video_fps,
-    video_to_images,
-    videos_to_images,
-)
+import importlib
+import sys
+import types
+
+# 公共接口与其所在的子模块，首次访问时才导入对应子模块（PEP 562），
+# 启动时不加载 cv2、numpy 等重量级依赖，例如只转换图片时不会导入 cv2
+_EXPORTS = {
+    # batch_executor
+    'OutputPlan': 'batch_executor',
+    'iter_folder_tasks': 'batch_executor',
+    'load_batch_config': 'batch_executor',
+    'map_batch': 'batch_executor',
+    'resolve_workers': 'batch_executor',
+    'run_chunk': 'batch_executor',
+    'scan_folder': 'batch_executor',
 
-# 定义包的公共接口
-__all__ = [
     # bin_to_image
-    'bin_to_image',
-    'bins_to_images',
+    'BinDecodePlan': 'bin_to_image',
+    'bin_to_image': 'bin_to_image',
+    'bins_to_images': 'bin_to_image',
+    'compile_bin_plan': 'bin_to_image',
+    'decode_bin_array': 'bin_to_image',
+    'iter_bin_frames': 'bin_to_image',
+    'read_bin_array': 'bin_to_image',
+
+    # cancel
+    'CancelToken': 'cancel',
+    'ConversionCancelled': 'cancel',
+    'checkpoint': 'cancel',
+    'use_token': 'cancel',
+
+    # file_monitor
+    'FileReadyWatcher': 'file_monitor',
+    'wait_until_complete': 'file_monitor',
+
+    # file_type
+    'InputFile': 'file_type',
+    'kind_from_extension': 'file_type',
+    'open_input': 'file_type',
+    'sniff': 'file_type',
+
+    # frame_writer
+    'FrameWriter': 'frame_writer',
+    'save_frame': 'frame_writer',
+
+    # gif_writer
+    'GifStreamWriter': 'gif_writer',
 
     # image_convert
-    'convert_image',
-    'convert_images',
+    'convert_image': 'image_convert',
+    'convert_images': 'image_convert',
 
     # image_to_bin
-    'image_to_bin',
-    'images_to_bins',
+    'image_dtype': 'image_to_bin',
+    'image_to_bin': 'image_to_bin',
+    'images_to_bins': 'image_to_bin',
+
+    # journal
+    'BatchJournal': 'journal',
+    'atomic_output': 'journal',
+    'load_job': 'journal',
+    'load_last_job': 'journal',
+    'resume_batch': 'journal',
+
+    # manifest
+    'ConversionManifest': 'manifest',
+    'open_manifest': 'manifest',
+
+    # prefetch
+    'Prefetcher': 'prefetch',
+
+    # progress
+    'ProgressTracker': 'progress',
+    'output_bytes': 'progress',
+
+    # scanner
+    'FolderScanner': 'scanner',
 
     # video_to_image
-    'get_video_fps',
-    'video_to_images',
-    'videos_to_images',
+    'extract_frame_range': 'video_to_image',
+    'frame_writer_options': 'video_to_image',
+    'get_video_fps': 'video_to_image',
+    'load_video_config': 'video_to_image',
+    'sample_frame_indices': 'video_to_image',
+    'video_to_images': 'video_to_image',
+    'videos_to_images': 'video_to_image',
+
+    # watch_folder
+    'WatchFolderService': 'watch_folder',
+    'load_watch_config': 'watch_folder',
+}
+
+# 定义包的公共接口
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    """
+    按需导入公共接口所在的子模块。
+
+    :param name: 属性名。
+    :return: 子模块中的同名对象。
+    :raises AttributeError: 如果不是公共接口。
+    """
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value  # 缓存，之后的访问不再经过 __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+class _LazyPackage(types.ModuleType):
+    """
+    子模块 bin_to_image、image_to_bin 与其导出的函数同名，导入子模块时导入系统会把子模块对象设置为包属性，
+    这里忽略这类设置，保证 core.bin_to_image 始终是函数（子模块仍可通过 from core.bin_to_image import ... 导入）。
+    """
+
+    def __setattr__(self, name, value):
+        if name in _EXPORTS and isinstance(value, types.ModuleType):
+            return
+        super().__setattr__(name, value)
+
 
-]
+sys.modules[__name__].__class__ = _LazyPackage
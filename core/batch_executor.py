@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: batch_executor.py
+Update: 2026.10.18
+"""
+
+import contextlib
+import os
+import multiprocessing
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import config
+from core.cancel import ConversionCancelled, checkpoint, current_token, install_token, use_token
+from core.file_type import KIND_EXTENSIONS
+from core.journal import DONE_FILENAME, JOB_FILENAME, TEMP_PREFIX
+from core.manifest import MANIFEST_FILENAME
+from core.prefetch import Prefetcher
+from core.progress import output_bytes
+from core.scanner import FolderScanner
+
+# 批处理自身产生的文件，遍历输入文件夹时跳过
+RESERVED_PREFIXES = (MANIFEST_FILENAME, JOB_FILENAME, DONE_FILENAME, TEMP_PREFIX)
+
+
+class _ErrorCollector:
+    """
+    子进程中代替 GUI 错误信号的收集器，错误信息随结果一起传回主进程再统一发送。
+
+    Attributes:
+        messages (list): 收集到的错误信息。
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def emit(self, text):
+        """
+        记录一条错误信息，接口与 pyqtSignal.emit 保持一致。
+
+        :param text: 错误信息。
+        """
+        self.messages.append(text)
+
+
+def load_batch_config():
+    """
+    加载批处理配置。
+
+    :return: 批处理配置字典。
+    """
+    return config.load_config(config.BATCH_SETTING_FILE, config.BATCH_SETTING_DEFAULT_CONFIG)
+
+
+def resolve_workers(workers=None):
+    """
+    解析实际使用的进程数。
+
+    :param workers: 进程数，None 表示读取配置，0 表示自动使用全部 CPU 核心。
+    :return: 实际进程数（至少为 1）。
+    """
+    if workers is None:
+        workers = load_batch_config()['workers']
+    workers = int(workers)
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return workers
+
+
+def scan_folder(input_folder, kind=None, include=None, exclude=None, extensions=None, output_folder=None):
+    """
+    按批处理配置创建输入文件夹的并行扫描器，跳过增量转换清单、检查点与临时文件。
+
+    :param input_folder: 输入文件夹地址。
+    :param kind: 转换处理的文件类型 file_type.IMAGE/VIDEO/BIN，决定默认的扩展名白名单，None 表示不按扩展名过滤。
+    :param include: 包含的通配符列表，None 表示读取配置。
+    :param exclude: 排除的通配符列表，None 表示读取配置。
+    :param extensions: 扩展名白名单，None 表示读取配置中该类型的扩展名，配置为空时使用内置扩展名。
+    :param output_folder: 输出文件夹地址，位于输入文件夹内时不扫描，避免边扫描边转换时把新写入的输出当作输入。
+    :return: FolderScanner 对象。
+    """
+    batch_config = load_batch_config()
+    if extensions is None and kind is not None:
+        extensions = batch_config[f'{kind}_extensions'] or KIND_EXTENSIONS[kind]
+    return FolderScanner(input_folder, extensions,
+                         batch_config['scan_include'] if include is None else include,
+                         batch_config['scan_exclude'] if exclude is None else exclude,
+                         batch_config['scan_threads'], RESERVED_PREFIXES, [output_folder])
+
+
+class OutputPlan:
+    """
+    批量转换的输出文件夹规划。输出目录由输入目录相对输入文件夹的路径得到，
+    每个输入目录只计算并创建一次输出目录，单文件转换函数不必逐个文件检查、创建输出目录。
+
+    Attributes:
+        input_folder (str): 输入文件夹地址。
+        output_folder (str): 输出文件夹地址。
+    """
+
+    def __init__(self, input_folder, output_folder):
+        """
+        初始化输出文件夹规划。
+
+        :param input_folder: 输入文件夹地址。
+        :param output_folder: 输出文件夹地址。
+        """
+        self.input_folder = input_folder
+        self.output_folder = output_folder
+        self._dirs = {}
+
+    def output_dir(self, root):
+        """
+        获取输入目录对应的输出目录，首次遇到该输入目录时创建输出目录。
+
+        :param root: 输入文件夹或其中的子目录。
+        :return: 输出目录路径。
+        """
+        output_dir = self._dirs.get(root)
+        if output_dir is None:
+            relative = os.path.relpath(root, self.input_folder)
+            output_dir = self.output_folder if relative == os.curdir else os.path.join(self.output_folder, relative)
+            os.makedirs(output_dir, exist_ok=True)
+            self._dirs[root] = output_dir
+        return output_dir
+
+
+def iter_folder_tasks(input_folder, output_folder, kind=None, scanner=None):
+    """
+    遍历输入文件夹，生成每个文件的输入路径与对应的输出文件夹路径，跳过增量转换清单、检查点与临时文件。
+
+    按扫描顺序流式生成，整个目录树扫描完成前即可开始转换。输出文件夹在生成该目录的第一个任务前创建（见 OutputPlan），
+    转换函数无需再创建。
+
+    :param input_folder: 输入文件夹地址。
+    :param output_folder: 输出文件夹地址。
+    :param kind: 只保留扩展名属于该类型（file_type.IMAGE/VIDEO/BIN）的文件，其他文件不会交给转换函数，
+                 默认为 None（不过滤）。
+    :param scanner: 已创建的目录扫描器，None 时按 kind 与配置调用 scan_folder 创建。
+    :return: (input_path, output_path) 生成器。
+    """
+    if scanner is None:
+        scanner = scan_folder(input_folder, kind, output_folder=output_folder)
+    plan = OutputPlan(input_folder, output_folder)
+    for root, file in scanner:
+        yield os.path.join(root, file), plan.output_dir(root)
+
+
+def _input_size(input_path):
+    """
+    获取任务输入文件的大小。
+
+    :param input_path: 输入文件路径。
+    :return: 字节数，无法访问的文件记为 0。
+    """
+    try:
+        return os.stat(input_path).st_size
+    except (OSError, TypeError, ValueError):
+        return 0
+
+
+def _init_worker(cancel_token):
+    """
+    进程池子进程的初始化函数：设置取消令牌。有取消令牌时忽略终端的 Ctrl+C，由主进程通过取消令牌统一停止。
+
+    :param cancel_token: 取消令牌 CancelToken 或 None。
+    """
+    if cancel_token is not None:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    install_token(cancel_token)
+
+
+def run_chunk(func, chunk, func_kwargs, collect_errors, prefetch=None):
+    """
+    顺序执行一组任务，供进程池子进程调用，也可在当前进程中直接调用。任务被取消时停止执行，只返回已完成的任务。
+
+    :param func: 单文件转换函数。
+    :param chunk: 任务参数元组列表。
+    :param func_kwargs: 每个任务共用的关键字参数。
+    :param collect_errors: 是否向转换函数传入错误收集器。
+    :param prefetch: 预读器 Prefetcher，不为 None 时在执行当前任务的同时预读块内后续文件，
+                     预读到的内容以 data 关键字参数传入转换函数。默认为 None。
+    :return: ((args, result, messages, exception) 列表, 预读统计字典)，未预读时统计为 None。
+    """
+    results = []
+    items = prefetch.iter(chunk) if prefetch is not None else ((args, None) for args in chunk)
+    with contextlib.closing(items):
+        for args, data in items:
+            collector = _ErrorCollector() if collect_errors else None
+            kwargs = dict(func_kwargs)
+            if collect_errors:
+                kwargs['error_label'] = collector
+            if data is not None:
+                kwargs['data'] = data
+            try:
+                checkpoint()
+                result = func(*args, **kwargs)
+                exc = None
+            except ConversionCancelled:
+                break
+            except Exception as e:
+                result = None
+                exc = e
+            results.append((args, result, collector.messages if collector else [], exc))
+    return results, prefetch.stats() if prefetch is not None else None
+
+
+def _iter_chunks(tasks, chunk_size):
+    """
+    将任务按块切分。
+
+    :param tasks: 任务的可迭代对象。
+    :param chunk_size: 每块任务数。
+    :return: 任务块生成器。
+    """
+    chunk = []
+    for item in tasks:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def map_batch(func, tasks, workers=None, chunk_size=None, max_in_flight=None, ordered=None, error_label=None,
+              func_kwargs=None, manifest=None, journal=None, progress_callback=None, cancel_token=None,
+              prefetch=False, scanner=None):
+    """
+    将单文件转换函数分发到进程池批量执行。
+
+    进程数为 1 时在当前线程内顺序执行，与逐个调用单文件函数的行为完全一致。
+
+    :param func: 单文件转换函数，必须是模块级函数以便传入子进程。
+    :param tasks: 任务参数元组的可迭代对象，每个元组为 func 的位置参数，可以是边扫描边生成的生成器。
+    :param workers: 进程数，None 表示读取配置，0 表示自动使用全部 CPU 核心。
+    :param chunk_size: 每次提交给子进程的任务数，None 表示读取配置。
+    :param max_in_flight: 同时在途的任务块上限，None 或 0 表示进程数的两倍。
+    :param ordered: 是否按提交顺序返回结果，None 表示读取配置。
+    :param error_label: 错误信息信号，不为 None 时会传入 func，子进程中的错误在主进程统一发送。
+    :param func_kwargs: 每个任务共用的关键字参数，如预先编译好的解码计划，必须可序列化。
+    :param manifest: 增量转换清单 ConversionManifest，不为 None 时跳过无需转换的任务，
+                     并在 func 返回输出路径后记录该任务。
+    :param journal: 批量任务检查点 BatchJournal，不为 None 时跳过已完成的任务，并在 func 成功返回后记录该任务。
+    :param progress_callback: 进度回调函数，接收一个事件字典：
+                              {'event': 'start', 'total', 'skipped', 'bytes_total', 'scanning'}、
+                              {'event': 'file', 'input', 'output', 'ok', 'done', 'total', 'skipped', 'bytes_total',
+                              'scanning', 'bytes_in', 'bytes_out'}、
+                              {'event': 'end', 'done', 'failed', 'skipped', 'cancelled', 'elapsed'}，
+                              预读时 'end' 事件还包括 'prefetch' 统计字典（见 Prefetcher.stats）。
+                              任务是生成器时 total 与 bytes_total 为估计值（已发现的文件数减去已跳过的文件数，
+                              未读取的文件按已读取文件的平均大小估计），scanning 为 True 表示目录树仍在扫描、总数还会增加。
+    :param cancel_token: 取消与暂停令牌 CancelToken，None 表示使用当前线程的令牌（如嵌套调用时外层任务的令牌）。
+                         每个任务开始前检查，并传入子进程供转换函数内部的检查点使用。
+    :param prefetch: 是否用线程池预读后续输入文件（数量与内存上限读取配置），预读到的内容以 data 关键字参数传入 func，
+                     func 须支持 data 参数；也可直接传入 Prefetcher 对象。默认为 False。
+                     进程数大于 1 时只向子进程传入文件路径，由各子进程在执行任务块时预读块内后续文件，
+                     预读的内存上限按进程数平均分配，合计不超过配置；文件数与线程数同样平均分配，但每个进程至少 1 个。
+    :param scanner: 生成 tasks 的目录扫描器 FolderScanner，用于在扫描完成前按已发现的文件数估计进度总数，默认为 None。
+    :return: (args, result) 生成器。
+    :raises Exception: 没有 error_label 时，func 抛出的异常会在主进程中重新抛出，此前完成的任务（包括同一任务块
+                       与其他执行中的任务块中的任务）已正常返回并记录；有 error_label 时异常作为错误信息发送，该任务记为失败。
+    :raises ConversionCancelled: 如果任务被取消，此前完成的任务已正常返回并记录。
+    """
+    batch_config = load_batch_config()
+    workers = resolve_workers(workers)
+    chunk_size = max(1, int(chunk_size or batch_config['chunk_size']))
+    max_in_flight = int(max_in_flight or batch_config['max_in_flight'] or workers * 2)
+    ordered = batch_config['ordered'] if ordered is None else ordered
+    func_kwargs = dict(func_kwargs or {})
+    cancel_token = cancel_token if cancel_token is not None else current_token()
+    if prefetch is True:
+        prefetch = Prefetcher.from_config(batch_config)
+
+    trackers = [tracker for tracker in (journal, manifest) if tracker is not None]
+    if trackers or progress_callback is not None:
+        # 任务流式经过检查点与增量清单的过滤，边遍历边转换；总数在遍历完成前按已发现的文件数估计
+        found = len(tasks) if hasattr(tasks, '__len__') else None
+        listed = total = bytes_total = done = failed = 0
+        sizes = {}
+        exhausted = False
+
+        def listed_tasks():
+            nonlocal listed
+            for args in tasks:
+                listed += 1
+                yield args
+
+        def pending_tasks(filtered):
+            nonlocal total, bytes_total, exhausted
+            for args in filtered:
+                size = _input_size(args[0]) if progress_callback is not None else 0
+                sizes[args[0]] = size
+                total += 1
+                bytes_total += size
+                yield args
+            exhausted = True
+
+        def progress_totals():
+            scanning = not exhausted and found is None and (scanner is None or not scanner.finished)
+            known = found if found is not None else scanner.found if scanner is not None else listed
+            remaining = 0 if exhausted else max(0, known - listed)
+            return {'total': total + remaining, 'skipped': listed - total,
+                    'bytes_total': bytes_total + (remaining * bytes_total // total if total else 0),
+                    'scanning': scanning}
+
+        filtered = listed_tasks()
+        for tracker in trackers:
+            filtered = tracker.filter_tasks(filtered)
+        start = time.perf_counter()
+        if progress_callback is not None:
+            progress_callback({'event': 'start', **progress_totals()})
+
+        cancelled = completed = False
+        try:
+            for args, result in map_batch(func, pending_tasks(filtered), workers, chunk_size, max_in_flight, ordered,
+                                          error_label, func_kwargs, cancel_token=cancel_token, prefetch=prefetch):
+                if result:
+                    for tracker in trackers:
+                        tracker.record_result(args, result)
+                done += 1
+                failed += result is None
+                if progress_callback is not None:
+                    progress_callback({'event': 'file', 'input': args[0], 'output': result,
+                                       'ok': result is not None, 'done': done, **progress_totals(),
+                                       'bytes_in': sizes.pop(args[0], 0), 'bytes_out': output_bytes(result)})
+                yield args, result
+            completed = True
+        except ConversionCancelled:
+            cancelled = True
+            raise
+        finally:
+            if progress_callback is not None and (cancelled or completed):
+                event = {'event': 'end', 'done': done, 'failed': failed, 'skipped': listed - total,
+                         'cancelled': cancelled, 'elapsed': time.perf_counter() - start}
+                if prefetch:
+                    event['prefetch'] = prefetch.stats()
+                progress_callback(event)
+        return
+
+    if hasattr(tasks, '__len__'):
+        workers = min(workers, max(1, len(tasks)))
+    if workers == 1:
+        items = prefetch.iter(tasks) if prefetch else ((args, None) for args in tasks)
+        with contextlib.closing(items):  # 提前结束或出错时停止预读线程
+            kwargs = dict(func_kwargs)
+            if error_label is not None:
+                kwargs['error_label'] = error_label
+            for args, data in items:
+                with use_token(cancel_token):
+                    checkpoint()
+                    try:
+                        result = func(*args, **kwargs) if data is None else func(*args, data=data, **kwargs)
+                    except Exception as e:
+                        if error_label is None:
+                            raise
+                        error_label.emit(f"错误: {str(e)}")
+                        result = None
+                yield args, result
+        return
+
+    # 在途任务块只携带文件路径，预读在子进程中进行，预读数据不经过进程间通信，
+    # 同时执行的任务块不超过进程数，预读内存合计不超过上限
+    worker_prefetch = prefetch.split(workers) if prefetch else None
+    collect_errors = error_label is not None
+    chunks = _iter_chunks(tasks, chunk_size)
+    pending = deque()
+    error = None
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(cancel_token,)) as executor:
+        def submit_next():
+            if cancel_token is not None and cancel_token.cancelled:
+                return False
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            pending.append(executor.submit(run_chunk, func, chunk, func_kwargs, collect_errors, worker_prefetch))
+            return True
+
+        def collect(future):
+            # 任务块中的每个任务都返回结果，失败的任务不影响同一块中其他已完成的任务
+            nonlocal error
+            results, prefetch_stats = future.result()
+            if prefetch_stats is not None:
+                prefetch.merge_stats(prefetch_stats)
+            for args, result, messages, exc in results:
+                for message in messages:
+                    error_label.emit(message)
+                if exc is None:
+                    yield args, result
+                elif error_label is not None:
+                    error_label.emit(f"错误: {str(exc)}")
+                    yield args, None
+                elif error is None:
+                    error = exc
+
+        while len(pending) < max_in_flight and submit_next():
+            pass
+
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+
+            submit_next()
+            yield from collect(future)
+
+            if error is not None or (cancel_token is not None and cancel_token.cancelled):
+                # 未开始的任务块直接取消；执行中的任务块（取消时在下一个检查点退出）
+                # 收回其中已完成的任务，使其照常记入增量清单与检查点
+                for other in pending:
+                    other.cancel()
+                for other in list(pending):
+                    if not other.cancelled():
+                        yield from collect(other)
+                if error is not None:
+                    raise error
+                raise ConversionCancelled()
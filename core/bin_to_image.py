@@ -4,19 +4,269 @@ Project Name: format_conversion
 File Created: 2024.06.18
 Author: ZhangYuetao
 File Name: bin_to_image.py
-Update: 2025.06.25
+Update: 2026.10.18
 """
 
 import os
+from dataclasses import asdict, dataclass
+
 import numpy as np
 
 from PIL import Image
-import zyt_validation_utils
 
 import config
+from core import batch_executor
+from core.cancel import checkpoint
+from core.file_type import BIN, kind_from_extension
+from core.journal import BatchJournal, atomic_output
+from core.manifest import open_manifest
+
+
+@dataclass(frozen=True)
+class BinDecodePlan:
+    """
+    bin文件解码计划，由 bin 参数配置一次性解析与校验得到，批量转换时在各文件间复用。
+
+    Attributes:
+        width (int): 图像宽度。
+        height (int): 图像高度。
+        channels (int): 通道数。
+        dtype (np.dtype): 带字节序的数据类型。
+        reshape_shape (tuple): 按 layout 顺序的数组形状。
+        transpose_order (tuple): 转为 HWC 顺序的维度排列。
+        normalize (bool): 是否将 float 图像归一化到 0~255 并转为 uint8。
+        swap_channels (bool): 是否将 BGR 调整为 RGB。
+        flip (bool): 是否垂直翻转图像。
+        rotate_k (int): 逆时针旋转 90 度的次数。
+        mode (str): PIL 图像模式。
+        use_mmap (bool): 是否以内存映射方式读取 bin 文件。
+        multi_frame (bool): 是否为多帧 bin 文件。
+        header_bytes (int): 多帧模式下文件头字节数。
+        frame_header_bytes (int): 多帧模式下每帧的帧头字节数。
+        frame_footer_bytes (int): 多帧模式下每帧的帧尾字节数。
+    """
+    width: int
+    height: int
+    channels: int
+    dtype: np.dtype
+    reshape_shape: tuple
+    transpose_order: tuple
+    normalize: bool
+    swap_channels: bool
+    flip: bool
+    rotate_k: int
+    mode: str
+    use_mmap: bool
+    multi_frame: bool
+    header_bytes: int
+    frame_header_bytes: int
+    frame_footer_bytes: int
+
+    @property
+    def expected_size(self):
+        """
+        单张图像的元素个数。
+        """
+        return self.width * self.height * self.channels
+
+    @property
+    def expected_bytes(self):
+        """
+        单张图像的字节数。
+        """
+        return self.expected_size * self.dtype.itemsize
+
+    @property
+    def frame_stride(self):
+        """
+        多帧模式下相邻两帧起始位置的字节间隔。
+        """
+        return self.frame_header_bytes + self.expected_bytes + self.frame_footer_bytes
+
+
+def compile_bin_plan(bin_config=None):
+    """
+    解析并校验 bin 参数配置，生成解码计划。
+
+    :param bin_config: bin 参数配置字典，为 None 时从配置文件读取。
+    :return: BinDecodePlan 解码计划。
+    :raises ValueError: 如果配置参数无效。
+    """
+    if bin_config is None:
+        bin_config = config.load_config(config.BIN_SETTING_FILE, config.BIN_SETTING_DEFAULT_CONFIG)
+
+    width = bin_config['width']
+    height = bin_config['height']
+    channels = bin_config['channels']
+    dtype = np.dtype(getattr(np, bin_config['dtype']))
+    endianness = bin_config['endianness']
+    layout = bin_config['layout'].upper()
+    normalize = bin_config['normalize']
+    channel_order = bin_config['channel_order'].upper()
+    flip = bin_config['flip']
+    rotate = bin_config['rotate']
+
+    if channels not in (1, 3, 4):
+        raise ValueError("channels 只支持 1/3/4")
+    if width <= 0 or height <= 0 or channels <= 0:
+        raise ValueError("width/height/channels 必须为正整数")
+    if sorted(layout) != ['C', 'H', 'W']:
+        raise ValueError(f"layout 格式无效（必须由 C, H, W 三个字母组成），当前: {layout}")
+    if rotate not in (0, 90, 180, 270):
+        raise ValueError("rotate 参数只支持 0 / 90 / 180 / 270")
+    if min(bin_config['header_bytes'], bin_config['frame_header_bytes'], bin_config['frame_footer_bytes']) < 0:
+        raise ValueError("header_bytes/frame_header_bytes/frame_footer_bytes 不能为负数")
 
+    # 处理字节序（endianness）
+    if endianness == 'little':
+        dtype = dtype.newbyteorder('<')
+    elif endianness == 'big':
+        dtype = dtype.newbyteorder('>')
 
-def bin_to_image(input_path, output_path, target_format, error_label=None):
+    # reshape 成对应 layout 顺序，再 transpose 成 HWC 顺序
+    dims = {'C': channels, 'H': height, 'W': width}
+    reshape_shape = tuple(dims[c] for c in layout)
+    transpose_order = tuple(layout.index(c) for c in 'HWC')
+
+    modes = {1: 'L', 3: 'RGB', 4: 'RGBA'}
+
+    return BinDecodePlan(
+        width=width,
+        height=height,
+        channels=channels,
+        dtype=dtype,
+        reshape_shape=reshape_shape,
+        transpose_order=transpose_order,
+        normalize=bool(normalize and np.issubdtype(dtype, np.floating)),
+        swap_channels=channels == 3 and channel_order == 'BGR',
+        flip=bool(flip),
+        rotate_k=rotate // 90,
+        mode=modes[channels],
+        use_mmap=bool(bin_config['use_mmap']),
+        multi_frame=bool(bin_config['multi_frame']),
+        header_bytes=int(bin_config['header_bytes']),
+        frame_header_bytes=int(bin_config['frame_header_bytes']),
+        frame_footer_bytes=int(bin_config['frame_footer_bytes']),
+    )
+
+
+def read_bin_array(input_path, plan, data=None):
+    """
+    按解码计划读取 bin 文件数据，读取前仅通过文件大小校验，不读取任何数据。
+
+    内存映射模式下返回文件的只读视图，后续 reshape/transpose 均在视图上完成，不产生中间拷贝。
+
+    :param input_path: bin文件地址。
+    :param plan: BinDecodePlan 解码计划。
+    :param data: 预读的文件内容，不为 None 时直接在其上解码，不再访问文件。
+    :return: 一维数据数组。
+    :raises ValueError: 如果文件大小与预期大小不匹配。
+    """
+    file_size = os.stat(input_path).st_size if data is None else len(data)
+    if file_size != plan.expected_bytes:
+        raise ValueError(f"二进制文件大小与预期大小 {plan.expected_bytes} 字节不匹配（实际 {file_size} 字节）")
+
+    if data is not None:
+        return np.frombuffer(data, dtype=plan.dtype)
+
+    if plan.use_mmap:
+        return np.memmap(input_path, dtype=plan.dtype, mode='r', shape=(plan.expected_size,))
+
+    with open(input_path, 'rb') as f:
+        img_data = f.read()
+    return np.frombuffer(img_data, dtype=plan.dtype)
+
+
+def iter_bin_frames(input_path, plan, data=None):
+    """
+    按解码计划逐帧读取多帧 bin 文件，帧数由文件大小自动推算。
+
+    内存映射模式下每次只访问当前帧所在的页，否则逐帧 seek 读取，均不会一次性载入整个文件。
+
+    :param input_path: bin文件地址。
+    :param plan: BinDecodePlan 解码计划。
+    :param data: 预读的文件内容，不为 None 时直接在其上逐帧切片，不再访问文件。
+    :return: (帧序号, 一维数据数组) 生成器。
+    :raises ValueError: 如果文件大小与帧结构不匹配。
+    """
+    file_size = os.stat(input_path).st_size if data is None else len(data)
+    data_size = file_size - plan.header_bytes
+    frame_count, remainder = divmod(max(data_size, 0), plan.frame_stride)
+    if frame_count == 0 or remainder:
+        raise ValueError(f"多帧文件大小 {file_size} 字节与帧结构不匹配"
+                         f"（文件头 {plan.header_bytes} 字节，每帧 {plan.frame_stride} 字节）")
+
+    if data is not None:
+        raw = np.frombuffer(data, dtype=np.uint8, offset=plan.header_bytes)
+        for index in range(frame_count):
+            start = index * plan.frame_stride + plan.frame_header_bytes
+            yield index, raw[start:start + plan.expected_bytes].view(plan.dtype)
+        return
+
+    if plan.use_mmap:
+        raw = np.memmap(input_path, dtype=np.uint8, mode='r', offset=plan.header_bytes,
+                        shape=(frame_count * plan.frame_stride,))
+        for index in range(frame_count):
+            start = index * plan.frame_stride + plan.frame_header_bytes
+            yield index, raw[start:start + plan.expected_bytes].view(plan.dtype)
+        return
+
+    with open(input_path, 'rb') as f:
+        for index in range(frame_count):
+            f.seek(plan.header_bytes + index * plan.frame_stride + plan.frame_header_bytes)
+            yield index, np.frombuffer(f.read(plan.expected_bytes), dtype=plan.dtype)
+
+
+def decode_bin_array(img_array, plan):
+    """
+    按解码计划将一维数据数组转换为 PIL 图像。
+
+    :param img_array: 一维数据数组，元素个数须等于 plan.expected_size。
+    :param plan: BinDecodePlan 解码计划。
+    :return: PIL 图像对象。
+    """
+    img_array = img_array.reshape(plan.reshape_shape)
+    img_array = np.transpose(img_array, plan.transpose_order)
+
+    # normalize（仅针对 float 类型）
+    if plan.normalize:
+        img_array = np.clip(img_array, 0, 1) * 255
+        img_array = img_array.astype(np.uint8)
+
+    # 通道顺序调整（BGR -> RGB）
+    if plan.swap_channels:
+        img_array = img_array[:, :, ::-1]
+
+    if plan.flip:
+        img_array = np.flipud(img_array)
+
+    if plan.rotate_k:
+        img_array = np.rot90(img_array, k=plan.rotate_k)
+
+    # 创建图像对象
+    if plan.channels == 1:
+        img_array = img_array[:, :, 0]
+    return Image.fromarray(img_array, plan.mode)
+
+
+def _save_image(img, output_file_path, target_format):
+    """
+    按目标格式做 PIL 兼容性处理后保存图像。
+
+    :param img: PIL 图像对象。
+    :param output_file_path: 输出图像地址。
+    :param target_format: 目标格式，如 "jpeg"、"png"等。
+    """
+    if target_format.upper() == 'JPEG' and img.mode in ("RGBA", "P"):
+        img = img.convert("RGB")
+    elif target_format.upper() == 'GIF' and img.mode not in ("P", "L"):
+        img = img.convert("P")
+
+    with atomic_output(output_file_path) as temp_path:
+        img.save(temp_path, target_format.upper())
+
+
+def bin_to_image(input_path, output_path, target_format, error_label=None, plan=None, data=None, create_dirs=True):
     """
     bin文件转换为图像。
 
@@ -24,111 +274,47 @@ def bin_to_image(input_path, output_path, target_format, error_label=None):
     :param output_path: 转换后图像保存地址。
     :param target_format: 目标格式，如 "jpeg"、"png"等。
     :param error_label: 错误信息信号，用于在 GUI 中显示错误信息，默认为 None。
+    :param plan: 预先编译的 BinDecodePlan 解码计划，为 None 时从配置文件读取并编译。
+    :param data: 预读的输入文件内容，为 None 时从 input_path 读取。
+    :param create_dirs: 是否创建输出文件夹，默认为 True。批量转换时输出目录已由 OutputPlan 预先创建，传入 False。
+    :return: 输出图像路径，多帧模式为路径列表，失败时返回 None。
     """
     try:
-        if not zyt_validation_utils.is_bin(input_path, speed="fast"):
+        # 原始 bin 数据没有魔数，只能按扩展名判断，不额外打开文件
+        if kind_from_extension(input_path) != BIN:
             raise ValueError("输入文件不是bin文件")
 
-        bin_config = config.load_config(config.BIN_SETTING_FILE, config.BIN_SETTING_DEFAULT_CONFIG)
+        if plan is None:
+            plan = compile_bin_plan()
 
-        width = bin_config['width']
-        height = bin_config['height']
-        channels = bin_config['channels']
-        dtype = np.dtype(getattr(np, bin_config['dtype']))
-        endianness = bin_config['endianness']
-        layout = bin_config['layout'].upper()
-        normalize = bin_config['normalize']
-        channel_order = bin_config['channel_order'].upper()
-        flip = bin_config['flip']
-        rotate = bin_config['rotate']
-        
-        if channels not in (1, 3, 4):
-            raise ValueError("channels 只支持 1/3/4")
-        if width <= 0 or height <= 0 or channels <= 0:
-            raise ValueError("width/height/channels 必须为正整数")
-
-        # 处理字节序（endianness）
-        if endianness == 'little':
-            dtype = dtype.newbyteorder('<')
-        elif endianness == 'big':
-            dtype = dtype.newbyteorder('>')
-            
-        with open(input_path, 'rb') as f:
-            img_data = f.read()
-
-        img_array = np.frombuffer(img_data, dtype=dtype)
-        expected_size = width * height * channels
-        if img_array.size != expected_size:
-            raise ValueError(f"二进制文件大小与预期大小 {expected_size} 不匹配（实际 {img_array.size}）")
-
-        img_array = img_array.reshape((height, width, channels))
-        
-        # reshape: 按 layout 参数处理
-        dims = {'C': channels, 'H': height, 'W': width}
-
-        if sorted(layout) != ['C', 'H', 'W']:
-            raise ValueError(f"layout 格式无效（必须由 C, H, W 三个字母组成），当前: {layout}")
-
-        # reshape 成对应 layout 顺序
-        reshape_shape = tuple(dims[c] for c in layout)
-        img_array = img_array.reshape(reshape_shape)
-
-        # transpose 成 HWC 顺序
-        transpose_order = [layout.index(c) for c in 'HWC']
-        img_array = np.transpose(img_array, transpose_order)
-        
-        # normalize（仅针对 float 类型）
-        if normalize and np.issubdtype(dtype, np.floating):
-            img_array = np.clip(img_array, 0, 1) * 255
-            img_array = img_array.astype(np.uint8)
-
-        # 通道顺序调整（BGR -> RGB）
-        if channels == 3 and channel_order == 'BGR':
-            img_array = img_array[:, :, ::-1]  # BGR → RGB
-
-        # flip
-        if flip:
-            img_array = np.flipud(img_array)
-
-        # rotate
-        if rotate in (90, 180, 270):
-            img_array = np.rot90(img_array, k=rotate // 90)
-        elif rotate != 0:
-            raise ValueError("rotate 参数只支持 0 / 90 / 180 / 270")
-        
-        # 创建图像对象
-        if channels == 1:
-            img_array = img_array[:, :, 0]
-            img = Image.fromarray(img_array, 'L')
-        elif channels == 2:
-            img = Image.fromarray(img_array, mode='LA')
-        elif channels == 3:
-            img = Image.fromarray(img_array, 'RGB')
-        elif channels == 4:
-            img = Image.fromarray(img_array, mode='RGBA')
-        else:
-            raise ValueError(f"不支持的通道数：{channels}")
-        
-        # PIL 兼容性处理
-        if target_format.upper() == 'JPEG' and img.mode in ("RGBA", "P"):
-            img = img.convert("RGB")
-        elif target_format.upper() == 'GIF' and img.mode not in ("P", "L"):
-            img = img.convert("P")
-
-        if not os.path.exists(output_path):
-            os.makedirs(output_path)
-
-        filename = os.path.basename(input_path)
-        output_file_path = os.path.join(output_path, os.path.splitext(filename)[0] + '.' + target_format.lower())
-        
-        img.save(output_file_path, target_format.upper())
+        if create_dirs:
+            os.makedirs(output_path, exist_ok=True)
+
+        filename = os.path.splitext(os.path.basename(input_path))[0]
+
+        if plan.multi_frame:
+            # 多帧文件逐帧解码保存，输出 name_00000.png 等
+            output_file_paths = []
+            for index, img_array in iter_bin_frames(input_path, plan, data):
+                checkpoint()
+                output_file_path = os.path.join(output_path, f"{filename}_{index:05d}.{target_format.lower()}")
+                _save_image(decode_bin_array(img_array, plan), output_file_path, target_format)
+                output_file_paths.append(output_file_path)
+            return output_file_paths
+
+        img_array = read_bin_array(input_path, plan, data)
+        output_file_path = os.path.join(output_path, filename + '.' + target_format.lower())
+        _save_image(decode_bin_array(img_array, plan), output_file_path, target_format)
+        return output_file_path
 
     except Exception as e:
         if error_label:
             error_label.emit(f"错误: {str(e)}")
 
 
-def bins_to_images(input_folder, output_folder, target_format, error_label=None):
+def bins_to_images(input_folder, output_folder, target_format, error_label=None, workers=None, incremental=None,
+                   resume=False, progress_callback=None, bin_config=None, cancel_token=None, include=None, exclude=None,
+                   extensions=None):
     """
     bin文件批量转换为图像。
 
@@ -136,9 +322,41 @@ def bins_to_images(input_folder, output_folder, target_format, error_label=None)
     :param output_folder: 转换后图像保存文件夹地址。
     :param target_format: 目标格式，如 "jpeg"、"png"等。
     :param error_label: 错误信息信号，用于在 GUI 中显示错误信息，默认为 None。
+    :param workers: 进程数，None 表示读取配置，0 表示自动使用全部 CPU 核心。
+    :param incremental: 是否跳过输入与解码参数均未变化的文件，None 表示读取配置。
+    :param resume: 是否从输出文件夹中的检查点继续未完成的任务，默认为 False。
+    :param progress_callback: 进度回调函数，接收 map_batch 定义的进度事件字典，默认为 None。
+    :param bin_config: bin 参数配置字典，None 表示读取配置文件。
+    :param cancel_token: 取消与暂停令牌 CancelToken，默认为 None。取消时已完成的文件记入检查点，可继续执行。
+    :param include: 只转换匹配任一通配符的文件（匹配文件名或相对路径），None 表示读取配置。
+    :param exclude: 跳过匹配任一通配符的文件与子目录，None 表示读取配置。
+    :param extensions: 处理的扩展名列表，None 表示读取配置，配置为空时使用内置扩展名。
     """
-    for root, _, files in os.walk(input_folder):
-        for file in files:
-            input_path = os.path.join(root, file)
-            output_path = root.replace(input_folder, output_folder)
-            bin_to_image(input_path, output_path, target_format, error_label)
+    # 整个批次只读取并解析一次 bin 参数配置；检查点记录读取到的参数，继续任务时按原参数解码，不受之后修改配置文件的影响
+    try:
+        if bin_config is None:
+            bin_config = config.load_config(config.BIN_SETTING_FILE, config.BIN_SETTING_DEFAULT_CONFIG)
+        plan = compile_bin_plan(bin_config)
+    except Exception as e:
+        if error_label:
+            error_label.emit(f"错误: {str(e)}")
+        return
+
+    scanner = batch_executor.scan_folder(input_folder, BIN, include, exclude, extensions, output_folder)
+    tasks = ((input_path, output_path, target_format)
+             for input_path, output_path in batch_executor.iter_folder_tasks(input_folder, output_folder,
+                                                                             scanner=scanner))
+    params = {'operation': 'bin_to_image', 'target_format': target_format.lower(), 'plan': asdict(plan)}
+    arguments = {'input_folder': input_folder, 'output_folder': output_folder, 'target_format': target_format,
+                 'workers': workers, 'incremental': incremental, 'bin_config': bin_config, 'include': include,
+                 'exclude': exclude, 'extensions': extensions}
+    # 内存映射与多帧文件只访问需要的页或逐帧读取，预读整个文件反而绕过内存映射并占用内存，此时不预读
+    prefetch = not (plan.use_mmap or plan.multi_frame)
+    with open_manifest(output_folder, params, incremental) as manifest, \
+            BatchJournal(output_folder, 'bins_to_images', arguments, resume) as journal:
+        for _ in batch_executor.map_batch(bin_to_image, tasks, workers=workers, error_label=error_label,
+                                          func_kwargs={'plan': plan, 'create_dirs': False},
+                                          manifest=manifest, journal=journal,
+                                          progress_callback=progress_callback, cancel_token=cancel_token,
+                                          prefetch=prefetch, scanner=scanner):
+            pass
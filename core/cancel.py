@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: cancel.py
+Update: 2026.10.18
+"""
+
+import contextlib
+import multiprocessing
+import threading
+
+_local = threading.local()
+
+
+class ConversionCancelled(BaseException):
+    """
+    转换任务被取消时抛出的异常。
+
+    继承 BaseException 而不是 Exception，单文件转换函数中 except Exception 的错误处理不会把取消当作转换失败，
+    atomic_output 等清理逻辑照常删除未写完的临时文件。
+    """
+
+
+class CancelToken:
+    """
+    转换任务的取消与暂停令牌，可在 GUI 线程中调用 cancel/pause/resume，转换代码在安全位置调用 check。
+
+    内部使用 spawn 上下文的进程间事件，由 map_batch 在创建进程池时传入子进程，
+    子进程中的转换在下一个检查点（每个文件开始前、视频与多帧 bin 的每一帧）即可响应。
+    """
+
+    def __init__(self):
+        context = multiprocessing.get_context('spawn')
+        self._cancel_event = context.Event()
+        self._running_event = context.Event()
+        self._running_event.set()
+
+    def cancel(self):
+        """
+        取消任务，同时唤醒暂停中的转换使其尽快退出。
+        """
+        self._cancel_event.set()
+        self._running_event.set()
+
+    def pause(self):
+        """
+        暂停任务，转换在下一个检查点阻塞，直到 resume 或 cancel。
+        """
+        if not self._cancel_event.is_set():
+            self._running_event.clear()
+
+    def resume(self):
+        """
+        继续暂停中的任务。
+        """
+        self._running_event.set()
+
+    @property
+    def cancelled(self):
+        """
+        任务是否已被取消。
+        """
+        return self._cancel_event.is_set()
+
+    @property
+    def paused(self):
+        """
+        任务是否处于暂停状态。
+        """
+        return not self._running_event.is_set()
+
+    def check(self):
+        """
+        检查点：暂停时阻塞等待，已取消时抛出 ConversionCancelled。
+
+        :raises ConversionCancelled: 如果任务已被取消。
+        """
+        self._running_event.wait()
+        if self._cancel_event.is_set():
+            raise ConversionCancelled()
+
+
+def current_token():
+    """
+    获取当前线程正在使用的取消令牌。
+
+    :return: CancelToken 对象，没有时返回 None。
+    """
+    return getattr(_local, 'token', None)
+
+
+def install_token(token):
+    """
+    设置当前线程使用的取消令牌，同时作为进程池的 initializer 在子进程中设置令牌。
+
+    :param token: CancelToken 对象或 None。
+    """
+    _local.token = token
+
+
+@contextlib.contextmanager
+def use_token(token):
+    """
+    在上下文内设置当前线程使用的取消令牌，退出时恢复原令牌。
+
+    :param token: CancelToken 对象或 None。
+    :return: 上下文管理器。
+    """
+    previous = current_token()
+    install_token(token)
+    try:
+        yield token
+    finally:
+        install_token(previous)
+
+
+def checkpoint():
+    """
+    转换代码中的检查点：当前线程设置了取消令牌时，暂停则等待，取消则抛出 ConversionCancelled。
+
+    :raises ConversionCancelled: 如果任务已被取消。
+    """
+    token = getattr(_local, 'token', None)
+    if token is not None:
+        token.check()
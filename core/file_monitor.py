@@ -0,0 +1,419 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: file_monitor.py
+Update: 2026.10.18
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from core.manifest import file_hash
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_ISDIR = 0x40000000
+IN_IGNORED = 0x00008000
+
+# 文件写入相关事件
+FILE_EVENTS = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class Inotify:
+    """
+    Linux inotify 的 ctypes 封装，不依赖第三方库。
+
+    Attributes:
+        fd (int): inotify 文件描述符。
+    """
+
+    def __init__(self):
+        """
+        创建 inotify 实例。
+
+        :raises OSError: 如果当前系统不支持 inotify。
+        """
+        if not sys.platform.startswith('linux'):
+            raise OSError(errno.ENOSYS, "当前系统不支持 inotify")
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path, mask=FILE_EVENTS):
+        """
+        监视文件或文件夹。
+
+        :param path: 文件或文件夹路径。
+        :param mask: 监视的事件掩码，默认为文件写入相关事件。
+        :return: 监视描述符。
+        :raises OSError: 如果添加监视失败。
+        """
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), ctypes.c_uint32(mask))
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def rm_watch(self, wd):
+        """
+        取消监视，监视对象已被删除时忽略错误。
+
+        :param wd: 监视描述符。
+        """
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self, timeout=None):
+        """
+        读取事件，没有事件时最多等待 timeout 秒。
+
+        :param timeout: 最长等待秒数，None 表示一直等待。
+        :return: 事件列表 [(监视描述符, 事件掩码, 文件名), ...]。
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            buffer = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        """
+        关闭 inotify 实例。
+        """
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_inotify():
+    """
+    创建 inotify 实例，当前系统不支持时返回 None，由调用方改用轮询。
+
+    :return: Inotify 对象或 None。
+    """
+    try:
+        return Inotify()
+    except (OSError, AttributeError):  # 非 Linux 或 libc 中没有 inotify 函数
+        return None
+
+
+class _PendingFile:
+    """
+    等待写入完成的文件状态。
+    """
+
+    def __init__(self, file_path, callback, deadline, expected_size, expected_sha256, now):
+        self.file_path = file_path
+        self.callback = callback
+        self.deadline = deadline
+        self.expected_size = expected_size
+        self.expected_sha256 = expected_sha256
+        self.signature = None  # (size, mtime_ns)，文件不存在时为 None
+        self.last_change = now
+        self.closed = False  # 是否收到写入方关闭文件的事件
+        self.hashed_signature = None  # 上次校验哈希时的文件签名，签名不变时不重复计算
+
+
+class FileReadyWatcher:
+    """
+    文件写入完成检测类。在后台线程中监视文件，写入完成（或超时）时调用回调函数。
+
+    Linux 下使用 inotify 监视文件所在文件夹：收到写入方关闭文件的事件时立即检查，
+    否则在文件大小与修改时间保持 stable_time 秒不变后视为写入完成；每轮同时检查文件状态，
+    网络挂载目录中其他主机的写入收不到 inotify 事件时仍能按轮询判断。
+    不支持 inotify 时以 poll_interval 为间隔轮询。
+
+    指定 expected_size 时文件大小必须一致；指定 expected_sha256 时在大小一致且写入完成后再校验哈希，哈希一致才视为完成。
+    检查文件状态与计算哈希均在锁外进行，watch、pending 与 close 不会等待哈希计算。
+
+    Attributes:
+        stable_time (float): 文件状态保持不变多少秒后视为写入完成。
+        poll_interval (float): 轮询间隔秒数。
+        uses_inotify (bool): 是否使用 inotify。
+    """
+
+    def __init__(self, stable_time=0.5, poll_interval=0.1, use_inotify=True):
+        """
+        初始化检测对象，首次 watch 时启动后台线程。
+
+        :param stable_time: 文件状态保持不变多少秒后视为写入完成，默认为 0.5。
+        :param poll_interval: 轮询间隔秒数，默认为 0.1。
+        :param use_inotify: 是否尝试使用 inotify，默认为 True。
+        """
+        self.stable_time = stable_time
+        self.poll_interval = poll_interval
+        self._inotify = create_inotify() if use_inotify else None
+        self.uses_inotify = self._inotify is not None
+        self._pending = {}
+        self._dir_watches = {}  # 文件夹路径 -> [监视描述符, 引用计数]
+        self._wd_dirs = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def watch(self, file_path, callback, timeout=60, expected_size=None, expected_sha256=None):
+        """
+        开始检测文件，写入完成或超时后调用 callback(file_path, ok)，回调在后台线程中执行。
+
+        同一文件重复 watch 时替换之前的回调与参数。
+
+        :param file_path: 文件路径，文件可以尚不存在。
+        :param callback: 回调函数，参数为文件路径与是否写入完成。
+        :param timeout: 最长等待秒数，None 表示不超时，默认为 60。
+        :param expected_size: 期望的文件大小（字节），默认为 None（不检查）。
+        :param expected_sha256: 期望的 SHA-256 十六进制字符串，默认为 None（不检查）。
+        """
+        file_path = os.path.abspath(file_path)
+        now = time.monotonic()
+        deadline = None if timeout is None else now + timeout
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("FileReadyWatcher 已关闭")
+            if file_path not in self._pending:
+                self._add_dir_watch(os.path.dirname(file_path))
+            self._pending[file_path] = _PendingFile(file_path, callback, deadline, expected_size, expected_sha256, now)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='FileReadyWatcher', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def unwatch(self, file_path):
+        """
+        取消检测文件，不调用回调。
+
+        :param file_path: 文件路径。
+        """
+        file_path = os.path.abspath(file_path)
+        with self._lock:
+            if self._pending.pop(file_path, None) is not None:
+                self._remove_dir_watch(os.path.dirname(file_path))
+
+    def wait(self, file_path, timeout=60, expected_size=None, expected_sha256=None):
+        """
+        阻塞等待文件写入完成。
+
+        :param file_path: 文件路径。
+        :param timeout: 最长等待秒数，None 表示不超时，默认为 60。
+        :param expected_size: 期望的文件大小（字节），默认为 None。
+        :param expected_sha256: 期望的 SHA-256 十六进制字符串，默认为 None。
+        :return: 写入完成返回 True，超时或检测对象被关闭时返回 False。
+        """
+        done = threading.Event()
+        result = []
+
+        def on_ready(_, ok):
+            result.append(ok)
+            done.set()
+
+        self.watch(file_path, on_ready, timeout, expected_size, expected_sha256)
+        done.wait()
+        return result[0]
+
+    @property
+    def pending(self):
+        """
+        正在检测的文件数。
+        """
+        return len(self._pending)
+
+    def close(self):
+        """
+        停止后台线程，未完成的文件以 callback(file_path, False) 通知，阻塞在 wait 中的线程随之返回。
+        """
+        with self._lock:
+            self._closed = True
+            remaining = list(self._pending.values())
+            self._pending.clear()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        for pending in remaining:
+            self._notify(pending, False)
+
+    def _add_dir_watch(self, dir_path):
+        """
+        为文件所在文件夹添加 inotify 监视（引用计数），文件夹不存在时只依靠轮询。
+
+        :param dir_path: 文件夹路径。
+        """
+        if self._inotify is None:
+            return
+        entry = self._dir_watches.get(dir_path)
+        if entry is not None:
+            entry[1] += 1
+            return
+        try:
+            wd = self._inotify.add_watch(dir_path)
+        except OSError:
+            return
+        self._dir_watches[dir_path] = [wd, 1]
+        self._wd_dirs[wd] = dir_path
+
+    def _remove_dir_watch(self, dir_path):
+        """
+        减少文件夹监视的引用计数，为 0 时取消监视。
+
+        :param dir_path: 文件夹路径。
+        """
+        entry = self._dir_watches.get(dir_path)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._dir_watches[dir_path]
+            self._wd_dirs.pop(entry[0], None)
+            self._inotify.rm_watch(entry[0])
+
+    def _run(self):
+        """
+        后台线程：等待事件或轮询间隔，更新文件状态并调用回调。
+        """
+        closed_files = set()
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                has_pending = bool(self._pending)
+            if not has_pending:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            # 先检查再等待，新加入的文件（如已写完）无需等待一个轮询间隔；
+            # 在锁外检查快照中的文件（可能计算哈希），期间被替换、取消或关闭的文件不再回调
+            with self._lock:
+                snapshot = list(self._pending.items())
+            now = time.monotonic()
+            checked = [(file_path, pending, self._check(pending, file_path in closed_files, now))
+                       for file_path, pending in snapshot]
+            ready = []
+            with self._lock:
+                for file_path, pending, ok in checked:
+                    if ok is None or self._pending.get(file_path) is not pending:
+                        continue
+                    del self._pending[file_path]
+                    self._remove_dir_watch(os.path.dirname(file_path))
+                    ready.append((pending, ok))
+
+            for pending, ok in ready:
+                self._notify(pending, ok)
+
+            closed_files = set()
+            if self._inotify is not None:
+                # 有事件时立即处理；网络挂载目录收不到事件，仍按 poll_interval 检查文件状态
+                for wd, mask, name in self._inotify.read_events(self.poll_interval):
+                    dir_path = self._wd_dirs.get(wd)
+                    if dir_path is not None and name and mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                        closed_files.add(os.path.join(dir_path, name))
+            else:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    @staticmethod
+    def _notify(pending, ok):
+        """
+        调用文件的回调函数，回调出错时只打印错误。
+
+        :param pending: 文件状态。
+        :param ok: 是否写入完成。
+        """
+        try:
+            pending.callback(pending.file_path, ok)
+        except Exception as e:
+            print(f"文件检测回调出错: {pending.file_path}, {e}")
+
+    def _check(self, pending, closed_event, now):
+        """
+        检查一个文件是否写入完成，在后台线程中不持有锁调用。大小一致且写入完成（收到关闭事件或状态保持稳定）后，
+        指定了期望哈希时再计算哈希，同一文件状态只计算一次，仍在增长的文件不会反复计算。
+
+        :param pending: 文件状态。
+        :param closed_event: 本轮是否收到写入方关闭文件的事件。
+        :param now: 当前时间。
+        :return: 写入完成返回 True，超时返回 False，仍需等待返回 None。
+        """
+        try:
+            stat = os.stat(pending.file_path)
+            signature = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            signature = None
+
+        if signature != pending.signature:
+            pending.signature = signature
+            pending.last_change = now
+            pending.closed = False
+        if closed_event:
+            pending.closed = True
+
+        if (signature is not None and (pending.expected_size is None or signature[0] == pending.expected_size)
+                and (pending.closed or now - pending.last_change >= self.stable_time)):
+            if pending.expected_sha256 is None:
+                return True
+            if signature != pending.hashed_signature:
+                pending.hashed_signature = signature
+                try:
+                    if file_hash(pending.file_path) == pending.expected_sha256:
+                        return True
+                except OSError:
+                    pass
+
+        if pending.deadline is not None and now >= pending.deadline:
+            return False
+        return None
+
+
+def wait_until_complete(file_path, timeout=60, stable_time=0.5, poll_interval=0.1, expected_size=None,
+                        expected_sha256=None):
+    """
+    等待文件写入完成：文件存在且大小、修改时间保持 stable_time 秒不变（Linux 下收到写入方关闭文件的事件时立即返回），
+    并满足期望的大小与哈希。
+
+    :param file_path: 文件路径，文件可以尚不存在。
+    :param timeout: 最长等待秒数，默认为 60。
+    :param stable_time: 文件状态保持不变多少秒后视为写入完成，默认为 0.5。
+    :param poll_interval: 轮询间隔秒数，默认为 0.1。
+    :param expected_size: 期望的文件大小（字节），默认为 None（不检查）。
+    :param expected_sha256: 期望的 SHA-256 十六进制字符串，默认为 None（不检查）。
+    :return: 写入完成返回 True，超时返回 False。
+    """
+    with FileReadyWatcher(stable_time, poll_interval) as watcher:
+        return watcher.wait(file_path, timeout, expected_size, expected_sha256)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: file_type.py
+Update: 2026.10.18
+"""
+
+import contextlib
+import io
+import os
+from dataclasses import dataclass
+
+IMAGE = 'image'
+VIDEO = 'video'
+BIN = 'bin'
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.jpe', '.png', '.bmp', '.dib', '.tif', '.tiff', '.gif', '.webp', '.ico',
+                    '.ppm', '.pgm', '.pbm', '.pnm', '.tga', '.psd', '.jp2', '.j2k', '.pcx')
+VIDEO_EXTENSIONS = ('.mp4', '.m4v', '.mov', '.3gp', '.3g2', '.avi', '.mkv', '.webm', '.flv', '.f4v', '.wmv',
+                    '.asf', '.mpg', '.mpeg', '.m2v', '.vob', '.ts', '.mts', '.m2ts', '.ogv', '.mxf', '.dv')
+BIN_EXTENSIONS = ('.bin',)
+
+KIND_EXTENSIONS = {
+    IMAGE: IMAGE_EXTENSIONS,
+    VIDEO: VIDEO_EXTENSIONS,
+    BIN: BIN_EXTENSIONS,
+}
+EXTENSION_KINDS = {ext: kind for kind, extensions in KIND_EXTENSIONS.items() for ext in extensions}
+
+# 识别文件类型读取的文件头字节数（MPEG-TS 需要第 0 与 188 字节的同步字节）
+SNIFF_BYTES = 512
+
+# (魔数, 类型, PIL 格式名)，均从文件开头匹配
+MAGIC_NUMBERS = (
+    (b'\xff\xd8\xff', IMAGE, 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', IMAGE, 'PNG'),
+    (b'GIF87a', IMAGE, 'GIF'),
+    (b'GIF89a', IMAGE, 'GIF'),
+    (b'II*\x00', IMAGE, 'TIFF'),
+    (b'MM\x00*', IMAGE, 'TIFF'),
+    (b'BM', IMAGE, 'BMP'),
+    (b'8BPS', IMAGE, 'PSD'),
+    (b'\x00\x00\x00\x0cjP  \r\n\x87\n', IMAGE, 'JPEG2000'),
+    (b'\xffO\xffQ', IMAGE, 'JPEG2000'),
+    (b'\x1aE\xdf\xa3', VIDEO, None),                  # Matroska / WebM
+    (b'FLV\x01', VIDEO, None),
+    (b'0&\xb2u\x8ef\xcf\x11', VIDEO, None),           # ASF / WMV
+    (b'\x00\x00\x01\xba', VIDEO, None),               # MPEG 程序流
+    (b'\x00\x00\x01\xb3', VIDEO, None),               # MPEG 视频序列头
+)
+
+# ISO 基础媒体文件中表示静态图像的 ftyp 品牌，其余品牌视为视频
+IMAGE_BRANDS = (b'heic', b'heix', b'heif', b'mif1', b'msf1', b'avif')
+
+
+@dataclass(frozen=True)
+class InputFile:
+    """
+    已识别类型的输入文件。
+
+    Attributes:
+        kind (str): 文件类型 IMAGE/VIDEO/BIN，无法识别时为 None。
+        format (str): 文件头识别出的 PIL 格式名，用于跳过 PIL 的逐个插件探测，未知时为 None。
+        stream (io.BufferedIOBase): 位于文件开头的二进制流，识别类型时读入的缓冲区由解码器继续使用。
+    """
+    kind: str
+    format: str
+    stream: io.BufferedIOBase
+
+
+def kind_from_extension(path):
+    """
+    按扩展名判断文件类型，不访问文件。
+
+    :param path: 文件路径或文件名。
+    :return: IMAGE/VIDEO/BIN，未知扩展名返回 None。
+    """
+    return EXTENSION_KINDS.get(os.path.splitext(path)[1].lower())
+
+
+def sniff(header):
+    """
+    按文件头的魔数判断文件类型。
+
+    :param header: 文件开头的字节，建议至少 SNIFF_BYTES 字节。
+    :return: (类型, PIL 格式名)，无法识别时为 (None, None)。
+    """
+    for magic, kind, fmt in MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return kind, fmt
+    if header[:4] == b'RIFF':
+        if header[8:12] == b'WEBP':
+            return IMAGE, 'WEBP'
+        if header[8:12] == b'AVI ':
+            return VIDEO, None
+    if header[4:8] == b'ftyp':
+        return (IMAGE if header[8:12] in IMAGE_BRANDS else VIDEO), None
+    if header[:4] == b'\x00\x00\x01\x00':
+        return IMAGE, 'ICO'
+    if len(header) > 188 and header[0] == 0x47 and header[188] == 0x47:
+        return VIDEO, None  # MPEG-TS
+    return None, None
+
+
+@contextlib.contextmanager
+def open_input(path, data=None):
+    """
+    打开输入文件并识别类型：只读取一次缓冲区，魔数从缓冲区中查看（不移动读取位置），同一个流直接交给解码器，
+    不再为类型检测单独打开文件。文件头无法识别时按扩展名判断，文件头与扩展名不一致时以文件头为准。
+
+    :param path: 输入文件路径。
+    :param data: 预读的文件内容，不为 None 时直接在内存中识别与解码，不访问文件。
+    :return: 上下文管理器，得到 InputFile，退出时关闭流。
+    """
+    if data is not None:
+        stream = io.BytesIO(data)
+        header = data[:SNIFF_BYTES]
+    else:
+        stream = open(path, 'rb')
+        header = stream.peek(SNIFF_BYTES)[:SNIFF_BYTES]
+    try:
+        kind, fmt = sniff(header)
+        yield InputFile(kind or kind_from_extension(path), fmt, stream)
+    finally:
+        stream.close()
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: frame_writer.py
+Update: 2026.10.18
+"""
+
+import os
+import queue
+import threading
+import time
+from functools import lru_cache
+
+import cv2
+from PIL import Image
+
+from core.journal import atomic_output
+
+
+# TIFF 压缩方式对应的 (cv2 压缩码, PIL compression 参数)
+TIFF_COMPRESSION_MAP = {
+    'none': (1, None),
+    'lzw': (5, 'tiff_lzw'),
+    'deflate': (8, 'tiff_adobe_deflate'),
+}
+
+
+@lru_cache(maxsize=None)
+def _cv2_can_write(ext):
+    """
+    判断 OpenCV 是否支持写入该扩展名，GIF 始终交给 PIL 处理。
+
+    :param ext: 小写扩展名，如 '.png'。
+    :return: 是否可以使用 cv2 编码。
+    """
+    return ext != '.gif' and cv2.haveImageWriter('frame' + ext)
+
+
+def _cv2_params(ext, encode_options):
+    """
+    生成 cv2.imencode 的格式参数。
+
+    :param ext: 小写扩展名。
+    :param encode_options: 编码参数字典（jpeg_quality、png_compression、tiff_compression）。
+    :return: cv2.imencode 参数列表。
+    """
+    if ext in ('.jpg', '.jpeg'):
+        return [cv2.IMWRITE_JPEG_QUALITY, int(encode_options.get('jpeg_quality', 75))]
+    if ext == '.png':
+        return [cv2.IMWRITE_PNG_COMPRESSION, int(encode_options.get('png_compression', 6))]
+    if ext in ('.tif', '.tiff'):
+        return [cv2.IMWRITE_TIFF_COMPRESSION, TIFF_COMPRESSION_MAP[encode_options.get('tiff_compression', 'none')][0]]
+    return []
+
+
+def _pil_params(ext, encode_options):
+    """
+    生成 PIL Image.save 的格式参数，与 cv2 参数含义一致。
+
+    :param ext: 小写扩展名。
+    :param encode_options: 编码参数字典（jpeg_quality、png_compression、tiff_compression）。
+    :return: Image.save 关键字参数字典。
+    """
+    if ext in ('.jpg', '.jpeg'):
+        return {'quality': int(encode_options.get('jpeg_quality', 75))}
+    if ext == '.png':
+        return {'compress_level': int(encode_options.get('png_compression', 6))}
+    if ext in ('.tif', '.tiff'):
+        return {'compression': TIFF_COMPRESSION_MAP[encode_options.get('tiff_compression', 'none')][1]}
+    return {}
+
+
+def save_frame(frame, filepath, backend='pil', encode_options=None):
+    """
+    保存一帧 BGR 图像。
+
+    cv2 后端直接对 BGR 数组编码，省去颜色转换与复制到 PIL 的开销；使用 imencode 加 tofile 写入，
+    以支持中文路径。OpenCV 不支持的格式自动回退到 PIL。
+
+    :param frame: BGR 图像数组。
+    :param filepath: 图像保存路径。
+    :param backend: 编码后端，'cv2' 或 'pil'，默认为 'pil'。
+    :param encode_options: 编码参数字典（jpeg_quality、png_compression、tiff_compression），默认为 None。
+    :raises ValueError: 如果编码后端或 TIFF 压缩方式不支持，或 cv2 编码失败。
+    """
+    encode_options = encode_options or {}
+    if encode_options.get('tiff_compression', 'none') not in TIFF_COMPRESSION_MAP:
+        raise ValueError(f"不支持的 TIFF 压缩方式: {encode_options['tiff_compression']}")
+    ext = os.path.splitext(filepath)[1].lower()
+
+    if backend not in ('cv2', 'pil'):
+        raise ValueError(f"不支持的编码后端: {backend}")
+
+    with atomic_output(filepath) as temp_path:
+        if backend == 'cv2' and _cv2_can_write(ext):
+            ret, buffer = cv2.imencode(ext, frame, _cv2_params(ext, encode_options))
+            if not ret:
+                raise ValueError(f"图像编码失败: {filepath}")
+            buffer.tofile(temp_path)
+        else:
+            image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            image.save(temp_path, **_pil_params(ext, encode_options))
+
+
+class FrameWriter:
+    """
+    异步帧写入类，解码线程将帧放入有界队列，由编码线程池完成颜色转换与保存，避免磁盘与编码延迟阻塞解码。
+
+    cv2 颜色转换与 PIL 编码器在执行时会释放 GIL，因此多个编码线程可以真正并行。
+
+    Attributes:
+        encoders (int): 编码线程数，0 表示在提交线程中同步写入。
+        queue_depth (int): 队列深度，队列满时提交会阻塞，从而限制内存占用。
+        backend (str): 编码后端，'cv2' 或 'pil'。
+        encode_options (dict): 编码参数字典（jpeg_quality、png_compression、tiff_compression）。
+        written (int): 已写入的帧数。
+    """
+
+    _STOP = object()
+
+    def __init__(self, encoders=2, queue_depth=8, backend='pil', encode_options=None):
+        """
+        初始化异步帧写入器并启动编码线程。
+
+        :param encoders: 编码线程数，0 表示同步写入，默认为 2。
+        :param queue_depth: 队列深度，默认为 8。
+        :param backend: 编码后端，'cv2' 或 'pil'，默认为 'pil'。
+        :param encode_options: 编码参数字典，默认为 None。
+        """
+        self.encoders = max(0, int(encoders))
+        self.queue_depth = max(1, int(queue_depth))
+        self.backend = backend
+        self.encode_options = dict(encode_options or {})
+        self.written = 0
+        self._queue = queue.Queue(maxsize=self.queue_depth)
+        self._lock = threading.Lock()
+        self._error = None
+        self._discard = False
+        self._first_start = None
+        self._last_end = None
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(self.encoders)]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self._discard = True  # 出错或取消时不再编码队列中剩余的帧，尽快退出
+        self.close(raise_error=exc_type is None)
+
+    def submit(self, frame, filepath):
+        """
+        提交一帧待写入的图像，队列满时阻塞。
+
+        :param frame: BGR 图像数组，提交后不应再被修改。
+        :param filepath: 图像保存路径。
+        :raises Exception: 如果编码线程中已发生错误。
+        """
+        if self._error is not None:
+            raise self._error
+        if not self.encoders:
+            self._write(frame, filepath)
+            return
+        self._queue.put((frame, filepath))
+
+    def close(self, raise_error=True):
+        """
+        等待队列中的帧全部写入并停止编码线程。
+
+        :param raise_error: 是否重新抛出编码线程中的错误，默认为 True。
+        :raises Exception: 如果编码线程中发生错误。
+        """
+        for _ in self._threads:
+            self._queue.put(self._STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if raise_error and self._error is not None:
+            raise self._error
+
+    @property
+    def encode_fps(self):
+        """
+        编码阶段吞吐（帧/秒），按第一帧开始编码到最后一帧写完的时间计算。
+        """
+        if not self.written or self._last_end is None or self._last_end <= self._first_start:
+            return 0.0
+        return self.written / (self._last_end - self._first_start)
+
+    def _write(self, frame, filepath):
+        """
+        写入一帧并记录编码时间。
+
+        :param frame: BGR 图像数组。
+        :param filepath: 图像保存路径。
+        """
+        start = time.perf_counter()
+        save_frame(frame, filepath, self.backend, self.encode_options)
+        end = time.perf_counter()
+        with self._lock:
+            self.written += 1
+            if self._first_start is None or start < self._first_start:
+                self._first_start = start
+            if self._last_end is None or end > self._last_end:
+                self._last_end = end
+
+    def _work(self):
+        """
+        编码线程主循环。
+        """
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+            if self._error is not None or self._discard:
+                continue  # 出错或放弃后只消费队列，避免提交线程阻塞
+            try:
+                self._write(*item)
+            except Exception as e:
+                self._error = e
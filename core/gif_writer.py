@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: gif_writer.py
+Update: 2026.10.18
+"""
+
+import contextlib
+import io
+import os
+import struct
+
+from core.journal import TEMP_PREFIX
+
+
+class GifStreamWriter:
+    """
+    流式 GIF 写入类，逐帧编码并直接追加到文件，内存占用与分段长度无关。
+
+    每帧先用 PIL 编码为单帧 GIF，再将其全局调色板改写为该帧的局部调色板后追加到输出文件，
+    因此任意时刻只保留当前一帧及其调色板。写入过程中使用临时文件，关闭时才重命名为目标文件，
+    出错时删除临时文件，不会留下不完整的 GIF。
+
+    Attributes:
+        file_path (str): 输出 GIF 文件路径。
+        duration (int): 每帧显示时长（毫秒）。
+        loop (int): 循环次数，0 表示无限循环。
+        frame_count (int): 已写入的帧数。
+    """
+
+    def __init__(self, file_path, duration, loop=0):
+        """
+        初始化流式 GIF 写入器。
+
+        :param file_path: 输出 GIF 文件路径。
+        :param duration: 每帧显示时长（毫秒）。
+        :param loop: 循环次数，0 表示无限循环，默认为 0。
+        """
+        self.file_path = file_path
+        self.duration = duration
+        self.loop = loop
+        self.frame_count = 0
+        self._file = None
+        self._size = None
+        directory, filename = os.path.split(file_path)
+        self._temp_path = os.path.join(directory, f"{TEMP_PREFIX}{os.getpid()}.{filename}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def add_frame(self, image):
+        """
+        追加一帧图像。
+
+        :param image: PIL 图像对象，所有帧尺寸必须一致。
+        :raises ValueError: 如果帧尺寸与第一帧不一致。
+        """
+        if self._size is None:
+            self._size = image.size
+            self._file = open(self._temp_path, 'wb')
+            self._write_header()
+        elif image.size != self._size:
+            raise ValueError(f"GIF 帧尺寸不一致: {image.size} != {self._size}")
+
+        buffer = io.BytesIO()
+        image.save(buffer, format='GIF', duration=self.duration)
+        self._file.write(_frame_blocks(buffer.getvalue()))
+        self.frame_count += 1
+
+    def close(self):
+        """
+        写入结束标记并关闭文件。
+        """
+        if self._file is not None:
+            self._file.write(b';')
+            self._file.close()
+            self._file = None
+            os.replace(self._temp_path, self.file_path)
+
+    def discard(self):
+        """
+        放弃已写入的帧并删除临时文件。
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            with contextlib.suppress(OSError):
+                os.remove(self._temp_path)
+
+    def _write_header(self):
+        """
+        写入文件头、逻辑屏幕描述符（不带全局调色板）与循环扩展块。
+        """
+        width, height = self._size
+        self._file.write(b'GIF89a' + struct.pack('<HHBBB', width, height, 0, 0, 0))
+        self._file.write(b'!\xff\x0bNETSCAPE2.0\x03\x01' + struct.pack('<H', self.loop) + b'\x00')
+
+
+def _skip_sub_blocks(data, pos):
+    """
+    跳过 GIF 数据子块序列。
+
+    :param data: GIF 字节数据。
+    :param pos: 第一个子块长度字节的位置。
+    :return: 子块序列结束后的位置。
+    """
+    while data[pos]:
+        pos += data[pos] + 1
+    return pos + 1
+
+
+def _frame_blocks(data):
+    """
+    从 PIL 生成的单帧 GIF 中取出帧数据块，并将全局调色板改写为局部调色板。
+
+    :param data: 单帧 GIF 字节数据。
+    :return: 可直接追加到多帧 GIF 的字节数据（图形控制扩展、图像描述符、调色板与图像数据）。
+    """
+    screen_flags = data[10]
+    pos = 13
+    global_table = b''
+    if screen_flags & 0x80:
+        table_size = 3 * (2 << (screen_flags & 0x07))
+        global_table = data[pos:pos + table_size]
+        pos += table_size
+
+    blocks = []
+    while pos < len(data):
+        introducer = data[pos]
+        if introducer == 0x21:  # 扩展块，仅保留图形控制扩展（帧时长）
+            label = data[pos + 1]
+            end = _skip_sub_blocks(data, pos + 2)
+            if label == 0xF9:
+                blocks.append(data[pos:end])
+            pos = end
+        elif introducer == 0x2C:  # 图像描述符
+            flags = data[pos + 9]
+            descriptor = data[pos:pos + 9]
+            pos += 10
+            if flags & 0x80:
+                table_size = 3 * (2 << (flags & 0x07))
+                blocks.append(descriptor + bytes([flags]) + data[pos:pos + table_size])
+                pos += table_size
+            elif global_table:
+                flags = (flags & 0x78) | 0x80 | (screen_flags & 0x07)
+                blocks.append(descriptor + bytes([flags]) + global_table)
+            else:
+                blocks.append(descriptor + bytes([flags]))
+            end = _skip_sub_blocks(data, pos + 1)  # LZW 最小码长 + 图像数据子块
+            blocks.append(data[pos:end])
+            pos = end
+        else:  # 0x3B 结束标记
+            break
+    return b''.join(blocks)
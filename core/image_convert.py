@@ -4,51 +4,88 @@ Project Name: format_conversion
 File Created: 2024.06.13
 Author: ZhangYuetao
 File Name: image_convert.py
-Update: 2025.06.24
+Update: 2026.10.18
 """
 
 import os
 
 from PIL import Image
-import zyt_validation_utils
 
+from core import batch_executor
+from core.file_type import IMAGE, open_input
+from core.journal import BatchJournal, atomic_output
+from core.manifest import open_manifest
 
-def convert_image(input_path, output_path, target_format):
+
+def convert_image(input_path, output_path, target_format, error_label=None, data=None, create_dirs=True):
     """
     图像格式转化。
 
     :param input_path: 输入图像地址。
     :param output_path: 转换后图像保存地址。
     :param target_format: 目标格式，如 "jpeg"、"png"等。
+    :param error_label: 错误信息信号，用于在 GUI 中显示错误信息，默认为 None。
+    :param data: 预读的输入文件内容，为 None 时从 input_path 读取。
+    :param create_dirs: 是否创建输出文件夹，默认为 True。批量转换时输出目录已由 OutputPlan 预先创建，传入 False。
+    :return: 输出图像路径，失败时返回 None。
     """
-    if not zyt_validation_utils.is_image(input_path, speed="fast"):
-        raise ValueError("不支持的图像格式")
+    try:
+        with open_input(input_path, data) as source:
+            if source.kind != IMAGE:
+                raise ValueError("不支持的图像格式")
+            img = Image.open(source.stream, formats=[source.format] if source.format else None)
+
+            if create_dirs:
+                os.makedirs(output_path, exist_ok=True)
 
-    with Image.open(input_path) as img:
-        # 根据目标格式进行必要的模式转换
-        if not os.path.exists(output_path):
-            os.makedirs(output_path)
+            # 根据目标格式进行必要的模式转换
+            if target_format.upper() == 'JPEG' and img.mode in ("RGBA", "P"):
+                img = img.convert("RGB")
+            elif target_format.upper() == 'GIF' and img.mode not in ("P", "L"):
+                img = img.convert("P")
 
-        if target_format.upper() == 'JPEG' and img.mode in ("RGBA", "P"):
-            img = img.convert("RGB")
-        elif target_format.upper() == 'GIF' and img.mode not in ("P", "L"):
-            img = img.convert("P")
+            filename = os.path.basename(input_path)
+            output_file_path = os.path.join(output_path, os.path.splitext(filename)[0] + '.' + target_format.lower())
+            with atomic_output(output_file_path) as temp_path:
+                img.save(temp_path, target_format.upper())
+        return output_file_path
 
-        filename = os.path.basename(input_path)
-        output_file_path = os.path.join(output_path, os.path.splitext(filename)[0] + '.' + target_format.lower())
-        img.save(output_file_path, target_format.upper())
+    except Exception as e:
+        if error_label:
+            error_label.emit(f"错误: {str(e)}")
 
 
-def convert_images(input_folder, output_folder, target_format):
+def convert_images(input_folder, output_folder, target_format, error_label=None, workers=None, incremental=None,
+                   resume=False, progress_callback=None, cancel_token=None, include=None, exclude=None,
+                   extensions=None):
     """
     批量图像格式转化。
 
     :param input_folder: 输入图像文件夹地址。
     :param output_folder: 转换后图像保存文件夹地址。
     :param target_format: 目标格式，如 "jpeg"、"png"等。
+    :param error_label: 错误信息信号，用于在 GUI 中显示错误信息，默认为 None。
+    :param workers: 进程数，None 表示读取配置，0 表示自动使用全部 CPU 核心。
+    :param incremental: 是否跳过输入与参数均未变化的文件，None 表示读取配置。
+    :param resume: 是否从输出文件夹中的检查点继续未完成的任务，默认为 False。
+    :param progress_callback: 进度回调函数，接收 map_batch 定义的进度事件字典，默认为 None。
+    :param cancel_token: 取消与暂停令牌 CancelToken，默认为 None。取消时已完成的文件记入检查点，可继续执行。
+    :param include: 只转换匹配任一通配符的文件（匹配文件名或相对路径），None 表示读取配置。
+    :param exclude: 跳过匹配任一通配符的文件与子目录，None 表示读取配置。
+    :param extensions: 处理的扩展名列表，None 表示读取配置，配置为空时使用内置扩展名。
     """
-    for root, _, files in os.walk(input_folder):
-        for file in files:
-            input_path = os.path.join(root, file)
-            output_path = root.replace(input_folder, output_folder)
-            convert_image(input_path, output_path, target_format)
+    scanner = batch_executor.scan_folder(input_folder, IMAGE, include, exclude, extensions, output_folder)
+    tasks = ((input_path, output_path, target_format)
+             for input_path, output_path in batch_executor.iter_folder_tasks(input_folder, output_folder,
+                                                                             scanner=scanner))
+    params = {'operation': 'convert_image', 'target_format': target_format.lower()}
+    arguments = {'input_folder': input_folder, 'output_folder': output_folder, 'target_format': target_format,
+                 'workers': workers, 'incremental': incremental, 'include': include, 'exclude': exclude,
+                 'extensions': extensions}
+    with open_manifest(output_folder, params, incremental) as manifest, \
+            BatchJournal(output_folder, 'convert_images', arguments, resume) as journal:
+        for _ in batch_executor.map_batch(convert_image, tasks, workers=workers, error_label=error_label,
+                                          func_kwargs={'create_dirs': False}, manifest=manifest, journal=journal,
+                                          progress_callback=progress_callback, cancel_token=cancel_token,
+                                          prefetch=True, scanner=scanner):
+            pass
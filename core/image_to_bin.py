@@ -4,69 +4,123 @@ Project Name: format_conversion
 File Created: 2024.10.29
 Author: ZhangYuetao
 File Name: image_to_bin.py
-Update: 2025.06.24
+Update: 2026.10.18
 """
 
 import os
 import numpy as np
 
 from PIL import Image
-import zyt_validation_utils
 
+from core import batch_executor
+from core.file_type import IMAGE, open_input
+from core.journal import BatchJournal, atomic_output
+from core.manifest import open_manifest
 
-def image_to_bin(input_path, output_path, error_label=None):
+
+# 位深度固定的图像模式对应的数据类型，PIL 原始缓冲区与该类型的内存排列一致，可直接写入
+MODE_DTYPE_MAP = {
+    'L': np.uint8,
+    'RGB': np.uint8,
+    'RGBA': np.uint8,
+    'I;16': np.dtype('<u2'),
+    'I;16L': np.dtype('<u2'),
+    'I;16B': np.dtype('>u2'),
+    'F': np.float32,
+}
+
+
+def image_dtype(img):
+    """
+    根据图像模式确定写入 bin 文件的数据类型。
+
+    8 位模式与 16 位、浮点模式的位深度由模式本身决定，无需遍历像素；
+    只有 32 位整型模式 'I' 需要一次 getextrema 遍历，按取值范围收窄为 uint8、uint16 或 int32。
+
+    :param img: PIL 图像对象。
+    :return: numpy 数据类型。
+    :raises ValueError: 如果图像模式不支持。
+    """
+    if img.mode in MODE_DTYPE_MAP:
+        return np.dtype(MODE_DTYPE_MAP[img.mode])
+    if img.mode == 'I':
+        min_val, max_val = img.getextrema()
+        if min_val >= 0 and max_val < 256:
+            return np.dtype(np.uint8)
+        if min_val >= 0 and max_val < 65536:
+            return np.dtype(np.uint16)
+        return np.dtype(np.int32)
+    raise ValueError(f"不支持的图像模式: {img.mode}")
+
+
+def image_to_bin(input_path, output_path, error_label=None, data=None, create_dirs=True):
     """
     图像转换为bin文件。
 
     :param input_path: 输入图像地址。
     :param output_path: 转换后bin文件保存地址。
     :param error_label: 错误信息信号，用于在 GUI 中显示错误信息，默认为 None。
+    :param data: 预读的输入文件内容，为 None 时从 input_path 读取。
+    :param create_dirs: 是否创建输出文件夹，默认为 True。批量转换时输出目录已由 OutputPlan 预先创建，传入 False。
+    :return: 输出 bin 文件路径，失败时返回 None。
     """
     try:
-        if not zyt_validation_utils.is_image(input_path, speed="fast"):
-            raise ValueError("不支持的图像格式")
+        with open_input(input_path, data) as source:
+            if source.kind != IMAGE:
+                raise ValueError("不支持的图像格式")
+            img = Image.open(source.stream, formats=[source.format] if source.format else None)
 
-        # 打开图片并转换为指定通道数
-        with Image.open(input_path) as img:
             # 根据模式和位深度确定数据类型
-            if img.mode == 'L':
-                max_val = img.getextrema()[1]  # 灰度图的最大值
-                dtype = np.uint8 if max_val < 256 else np.uint16
-            elif img.mode == 'RGB':
-                max_val = max(img.getextrema()[0][1], img.getextrema()[1][1], img.getextrema()[2][1])  # RGB的最大值
-                dtype = np.uint8 if max_val < 256 else np.uint16
-            elif img.mode == 'RGBA':
-                max_val = max(img.getextrema()[0][1], img.getextrema()[1][1], img.getextrema()[2][1], img.getextrema()[3][1])  # RGBA的最大值
-                dtype = np.uint8 if max_val < 256 else np.uint16
-            else:
-                raise ValueError(f"不支持的图像模式: {img.mode}")
-
-            # 转换图片为数组，并转换为指定数据类型
-            img_array = np.array(img, dtype=dtype)
-
-            if not os.path.exists(output_path):
-                os.makedirs(output_path)
+            dtype = image_dtype(img)
+
+            if create_dirs:
+                os.makedirs(output_path, exist_ok=True)
 
             filename = os.path.basename(input_path)
             output_file_path = os.path.join(output_path, os.path.splitext(filename)[0] + '.bin')
 
-            img_array.tofile(output_file_path)
+            with atomic_output(output_file_path) as temp_path:
+                if img.mode in MODE_DTYPE_MAP and dtype.byteorder != '>':
+                    # 原始缓冲区即目标数据，直接写入，不经过 numpy 复制
+                    with open(temp_path, 'wb') as f:
+                        f.write(img.tobytes())
+                else:
+                    # 大端 16 位统一转为小端，32 位整型按收窄后的类型转换
+                    img_array = np.asarray(img).astype(dtype.newbyteorder('<'), copy=False)
+                    img_array.tofile(temp_path)
+
+        return output_file_path
 
     except Exception as e:
         if error_label:
             error_label.emit(f"错误: {str(e)}")
 
 
-def images_to_bins(input_folder, output_folder, error_label=None):
+def images_to_bins(input_folder, output_folder, error_label=None, workers=None, incremental=None, resume=False,
+                   progress_callback=None, cancel_token=None, include=None, exclude=None, extensions=None):
     """
     图像批量转换为bin文件。
 
     :param input_folder: 输入图像文件夹地址。
     :param output_folder: 转换后bin文件保存地址。
     :param error_label: 错误信息信号，用于在 GUI 中显示错误信息，默认为 None。
+    :param workers: 进程数，None 表示读取配置，0 表示自动使用全部 CPU 核心。
+    :param incremental: 是否跳过输入未变化的文件，None 表示读取配置。
+    :param resume: 是否从输出文件夹中的检查点继续未完成的任务，默认为 False。
+    :param progress_callback: 进度回调函数，接收 map_batch 定义的进度事件字典，默认为 None。
+    :param cancel_token: 取消与暂停令牌 CancelToken，默认为 None。取消时已完成的文件记入检查点，可继续执行。
+    :param include: 只转换匹配任一通配符的文件（匹配文件名或相对路径），None 表示读取配置。
+    :param exclude: 跳过匹配任一通配符的文件与子目录，None 表示读取配置。
+    :param extensions: 处理的扩展名列表，None 表示读取配置，配置为空时使用内置扩展名。
     """
-    for root, _, files in os.walk(input_folder):
-        for file in files:
-            input_path = os.path.join(root, file)
-            output_path = root.replace(input_folder, output_folder)
-            image_to_bin(input_path, output_path, error_label)
+    scanner = batch_executor.scan_folder(input_folder, IMAGE, include, exclude, extensions, output_folder)
+    tasks = batch_executor.iter_folder_tasks(input_folder, output_folder, scanner=scanner)
+    arguments = {'input_folder': input_folder, 'output_folder': output_folder, 'workers': workers,
+                 'incremental': incremental, 'include': include, 'exclude': exclude, 'extensions': extensions}
+    with open_manifest(output_folder, {'operation': 'image_to_bin'}, incremental) as manifest, \
+            BatchJournal(output_folder, 'images_to_bins', arguments, resume) as journal:
+        for _ in batch_executor.map_batch(image_to_bin, tasks, workers=workers, error_label=error_label,
+                                          func_kwargs={'create_dirs': False}, manifest=manifest, journal=journal,
+                                          progress_callback=progress_callback, cancel_token=cancel_token,
+                                          prefetch=True, scanner=scanner):
+            pass
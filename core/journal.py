@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: journal.py
+Update: 2026.10.18
+"""
+
+import contextlib
+import json
+import os
+import time
+
+import config
+
+JOB_FILENAME = '.conversion_job.json'
+DONE_FILENAME = '.conversion_done.log'
+TEMP_PREFIX = '.~'
+
+
+@contextlib.contextmanager
+def atomic_output(file_path):
+    """
+    原子写入输出文件：先写入同目录下的临时文件，成功后再重命名为目标文件，中途出错或被终止时不会留下不完整的输出。
+
+    临时文件保留原扩展名，PIL 与 cv2 可以照常按扩展名判断格式。
+
+    :param file_path: 目标文件路径。
+    :return: 上下文管理器，得到临时文件路径。
+    """
+    directory, filename = os.path.split(file_path)
+    temp_path = os.path.join(directory, f"{TEMP_PREFIX}{os.getpid()}.{filename}")
+    try:
+        yield temp_path
+        os.replace(temp_path, file_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+
+def save_last_job(output_folder):
+    """
+    记录最近一次批量任务的输出文件夹，供“继续上次任务”使用。
+
+    :param output_folder: 输出文件夹地址。
+    """
+    with contextlib.suppress(OSError):  # 不在软件目录下调用时没有 settings 文件夹，不影响转换本身
+        config.save_config(config.LAST_JOB_FILE, {'output_folder': os.path.abspath(output_folder)})
+
+
+def load_last_job():
+    """
+    读取最近一次批量任务的输出文件夹。
+
+    :return: 输出文件夹地址，没有记录时返回 None。
+    """
+    return config.load_config(config.LAST_JOB_FILE, config.LAST_JOB_DEFAULT_CONFIG)['output_folder'] or None
+
+
+def load_job(output_folder):
+    """
+    读取输出文件夹中的批量任务描述。
+
+    :param output_folder: 输出文件夹地址。
+    :return: 任务描述字典，不存在（没有任务或任务已完成）时返回 None。
+    """
+    job_path = os.path.join(output_folder, JOB_FILENAME)
+    if not os.path.exists(job_path):
+        return None
+    with open(job_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class BatchJournal:
+    """
+    批量任务检查点日志。任务描述保存为输出文件夹中的 JSON 文件，已完成的源文件逐行追加到完成日志，任务全部完成后两者均删除；
+    崩溃、取消或被终止后可从检查点继续，跳过已完成的文件。
+
+    完成日志带缓冲追加写入，按条数或时间间隔刷新，不对每个文件做同步写盘；
+    由于输出文件均为原子写入，最后一次刷新后完成的少量文件在继续时会重新转换，不会留下损坏的输出。
+
+    Attributes:
+        output_folder (str): 输出文件夹地址。
+        job (dict): 任务描述，包括操作名称与调用参数。
+        done (set): 已完成的源文件路径集合。
+        resumed (int): 本次从检查点跳过的文件数。
+    """
+
+    def __init__(self, output_folder, operation, arguments, resume=False, flush_every=256, flush_interval=1.0):
+        """
+        创建或继续批量任务检查点。
+
+        :param output_folder: 输出文件夹地址。
+        :param operation: 批量转换函数名，如 "convert_images"。
+        :param arguments: 批量转换函数的关键字参数，必须可 JSON 序列化。
+        :param resume: 是否从已有检查点继续，False 时清空旧的完成日志，默认为 False。
+        :param flush_every: 累积多少条记录刷新一次，默认为 256。
+        :param flush_interval: 距上次刷新超过多少秒时刷新，默认为 1.0。
+        """
+        os.makedirs(output_folder, exist_ok=True)
+        self.output_folder = output_folder
+        self.job = {'operation': operation, 'arguments': arguments, 'status': 'running'}
+        self.done = set()
+        self.resumed = 0
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+        done_path = os.path.join(output_folder, DONE_FILENAME)
+        if resume and os.path.exists(done_path):
+            with open(done_path, 'r', encoding='utf-8') as f:
+                self.done = {line.rstrip('\n') for line in f if line.endswith('\n')}  # 忽略最后一行不完整的记录
+        self._write_job()
+        self._file = open(done_path, 'a' if resume else 'w', encoding='utf-8')
+        save_last_job(output_folder)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close(completed=exc_type is None)
+
+    def filter_tasks(self, tasks):
+        """
+        过滤掉已完成的任务。按需逐个过滤，可以接在边扫描边生成的任务流之后。
+
+        :param tasks: 任务参数元组的可迭代对象，第一个元素为源文件路径。
+        :return: 未完成的任务生成器。
+        """
+        for args in tasks:
+            if args[0] in self.done:
+                self.resumed += 1
+            else:
+                yield args
+
+    def record_result(self, args, result):
+        """
+        记录一个完成的任务。
+
+        :param args: 任务参数元组，第一个元素为源文件路径。
+        :param result: 转换函数的返回值，未使用。
+        """
+        self._file.write(args[0] + '\n')
+        self._pending += 1
+        if self._pending >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        将缓冲的完成记录写入文件。
+        """
+        self._file.flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def close(self, completed=False):
+        """
+        刷新并关闭完成日志。任务全部完成时删除任务描述与完成日志，不在用户的输出文件夹中留下检查点文件。
+
+        :param completed: 任务是否全部完成，默认为 False。
+        """
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if completed:
+            self.job['status'] = 'completed'
+            for filename in (JOB_FILENAME, DONE_FILENAME):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.output_folder, filename))
+
+    def _write_job(self):
+        """
+        原子写入任务描述文件。
+        """
+        with atomic_output(os.path.join(self.output_folder, JOB_FILENAME)) as temp_path:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.job, f, ensure_ascii=False, indent=2)
+
+
+def resume_batch(output_folder=None, error_label=None, progress_callback=None, cancel_token=None):
+    """
+    从检查点继续未完成的批量任务。
+
+    :param output_folder: 任务输出文件夹地址，None 表示最近一次批量任务。
+    :param error_label: 错误信息信号，用于在 GUI 中显示错误信息，默认为 None。
+    :param progress_callback: 进度回调函数，默认为 None。
+    :param cancel_token: 取消与暂停令牌 CancelToken，默认为 None。
+    :return: 继续执行的批量转换函数名。
+    :raises ValueError: 如果没有可继续的任务。
+    """
+    # 批量转换模块依赖本模块，在函数内导入以避免循环导入
+    from core.bin_to_image import bins_to_images
+    from core.image_convert import convert_images
+    from core.image_to_bin import images_to_bins
+    from core.video_to_image import videos_to_images
+
+    operations = {
+        'convert_images': convert_images,
+        'bins_to_images': bins_to_images,
+        'images_to_bins': images_to_bins,
+        'videos_to_images': videos_to_images,
+    }
+
+    output_folder = output_folder or load_last_job()
+    job = load_job(output_folder) if output_folder else None
+    if job is None or job['status'] == 'completed':
+        raise ValueError("没有可继续的任务")
+
+    func = operations[job['operation']]
+    func(error_label=error_label, resume=True, progress_callback=progress_callback, cancel_token=cancel_token,
+         **job['arguments'])
+    return job['operation']
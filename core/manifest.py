@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: manifest.py
+Update: 2026.10.18
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import config
+
+MANIFEST_FILENAME = '.conversion_manifest.sqlite'
+MANIFEST_VERSION = 1
+
+
+def params_hash(params):
+    """
+    计算转换参数的哈希值，参数变化时所有文件都需要重新转换。
+
+    :param params: 可 JSON 序列化的转换参数字典。
+    :return: 十六进制哈希字符串。
+    """
+    text = json.dumps({'version': MANIFEST_VERSION, **params}, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def file_hash(file_path, block_size=1 << 20):
+    """
+    计算文件内容的 SHA-256 哈希值。
+
+    :param file_path: 文件路径。
+    :param block_size: 每次读取的字节数，默认为 1 MB。
+    :return: 十六进制哈希字符串。
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def open_manifest(output_folder, params, incremental=None):
+    """
+    按配置打开转换清单。
+
+    :param output_folder: 输出文件夹地址。
+    :param params: 可 JSON 序列化的转换参数字典。
+    :param incremental: 是否启用增量转换，None 表示读取配置。
+    :return: 上下文管理器，启用增量转换时得到 ConversionManifest，否则得到 None。
+    """
+    batch_config = config.load_config(config.BATCH_SETTING_FILE, config.BATCH_SETTING_DEFAULT_CONFIG)
+    if incremental is None:
+        incremental = batch_config['incremental']
+    if not incremental:
+        return contextlib.nullcontext()
+    return ConversionManifest(output_folder, params, use_hash=batch_config['hash_content'])
+
+
+class ConversionManifest:
+    """
+    增量转换清单，以 SQLite 数据库保存在输出文件夹中，记录每个源文件的大小、修改时间、
+    可选的内容哈希、转换参数哈希与输出文件路径，再次转换时跳过输入与参数均未变化的文件。
+
+    按主键逐条查询，无需在启动时加载全部记录；写入按批提交事务，中途退出时已提交的记录仍然有效。
+
+    Attributes:
+        db_path (str): 清单数据库路径。
+        params_hash (str): 本次转换参数的哈希值。
+        use_hash (bool): 修改时间变化时是否比较内容哈希，避免复制或 touch 后重复转换。
+        skipped (int): 本次跳过的文件数。
+        recorded (int): 本次新记录的文件数。
+    """
+
+    def __init__(self, output_folder, params, use_hash=False, commit_every=500, commit_interval=1.0):
+        """
+        打开或创建输出文件夹中的转换清单。
+
+        :param output_folder: 输出文件夹地址。
+        :param params: 可 JSON 序列化的转换参数字典。
+        :param use_hash: 修改时间变化时是否比较内容哈希，默认为 False。
+        :param commit_every: 累积多少条记录提交一次事务，默认为 500。
+        :param commit_interval: 距上次提交超过多少秒时提交事务，默认为 1.0。
+        """
+        os.makedirs(output_folder, exist_ok=True)
+        self.db_path = os.path.join(output_folder, MANIFEST_FILENAME)
+        self.params_hash = params_hash(params)
+        self.use_hash = use_hash
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self.skipped = 0
+        self.recorded = 0
+        self._signatures = {}
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'source TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, content_hash TEXT, '
+            'params_hash TEXT, outputs TEXT)'
+        )
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def _key(input_path):
+        """
+        生成源文件的记录键。
+
+        :param input_path: 源文件路径。
+        :return: 规范化的绝对路径。
+        """
+        return os.path.normcase(os.path.abspath(input_path))
+
+    def check(self, input_path):
+        """
+        检查源文件是否需要转换。新文件的内容哈希推迟到转换成功后由 record 计算，不在这里逐个读取文件。
+
+        :param input_path: 源文件路径。
+        :return: 需要转换时返回文件签名 (size, mtime_ns, content_hash)，供转换成功后 record 使用，
+                 content_hash 未计算时为 None；文件无法访问（如扫描后被删除）时返回 (None, None, None)，
+                 由转换函数报告该文件的错误；输入、参数与输出均未变化时返回 None。
+        """
+        try:
+            stat = os.stat(input_path)
+        except OSError:
+            return None, None, None
+        row = self._conn.execute(
+            'SELECT size, mtime_ns, content_hash, params_hash, outputs FROM entries WHERE source = ?',
+            (self._key(input_path),)
+        ).fetchone()
+
+        content_hash = None
+        if row is not None and row[3] == self.params_hash and row[0] == stat.st_size:
+            outputs_exist = all(os.path.exists(path) for path in json.loads(row[4]))
+            if outputs_exist and row[1] == stat.st_mtime_ns:
+                self.skipped += 1
+                return None
+            if outputs_exist and self.use_hash and row[2]:
+                try:
+                    content_hash = file_hash(input_path)
+                except OSError:
+                    return None, None, None
+                if content_hash == row[2]:
+                    # 内容未变，仅更新修改时间
+                    self._conn.execute('UPDATE entries SET mtime_ns = ? WHERE source = ?',
+                                       (stat.st_mtime_ns, self._key(input_path)))
+                    self._mark_dirty()
+                    self.skipped += 1
+                    return None
+
+        return stat.st_size, stat.st_mtime_ns, content_hash
+
+    def record(self, input_path, signature, outputs):
+        """
+        记录一个转换成功的源文件。比较内容哈希时在这里补算签名中缺少的哈希，
+        文件在转换期间被修改（大小或修改时间与签名不一致）时不记录哈希，下次按修改时间重新转换。
+
+        :param input_path: 源文件路径。
+        :param signature: check 返回的文件签名。
+        :param outputs: 输出文件路径或路径列表。
+        """
+        if isinstance(outputs, str):
+            outputs = [outputs]
+        size, mtime_ns, content_hash = signature
+        if self.use_hash and content_hash is None:
+            try:
+                stat = os.stat(input_path)
+                if (stat.st_size, stat.st_mtime_ns) == (size, mtime_ns):
+                    content_hash = file_hash(input_path)
+            except OSError:
+                pass
+        self._conn.execute(
+            'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)',
+            (self._key(input_path), size, mtime_ns, content_hash, self.params_hash, json.dumps(list(outputs)))
+        )
+        self.recorded += 1
+        self._mark_dirty()
+
+    def filter_tasks(self, tasks):
+        """
+        过滤掉无需转换的任务。按需逐个过滤，可以接在边扫描边生成的任务流之后。
+
+        :param tasks: 任务参数元组的可迭代对象，第一个元素为源文件路径。
+        :return: 需要转换的任务生成器，其文件签名保存到转换成功后 record_result 使用。
+        """
+        for args in tasks:
+            signature = self.check(args[0])
+            if signature is not None:
+                self._signatures[args[0]] = signature
+                yield args
+
+    def record_result(self, args, result):
+        """
+        记录 filter_tasks 返回的一个转换成功的任务。
+
+        :param args: 任务参数元组，第一个元素为源文件路径。
+        :param result: 转换函数返回的输出文件路径或路径列表。
+        """
+        self.record(args[0], self._signatures.pop(args[0]), result)
+
+    def commit(self):
+        """
+        提交未提交的记录。
+        """
+        self._conn.commit()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    def close(self):
+        """
+        提交剩余记录并关闭数据库。
+        """
+        if self._conn is not None:
+            self.commit()
+            self._conn.close()
+            self._conn = None
+
+    def _mark_dirty(self):
+        """
+        累计未提交的修改，达到条数或时间阈值时提交事务。
+        """
+        self._uncommitted += 1
+        if (self._uncommitted >= self.commit_every
+                or time.monotonic() - self._last_commit >= self.commit_interval):
+            self.commit()
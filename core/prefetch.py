@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: prefetch.py
+Update: 2026.10.18
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Prefetcher:
+    """
+    输入文件预读类。用线程池提前读取后续若干文件的全部内容，使网络共享目录上的读取等待与前面文件的解码、编码重叠。
+
+    预读窗口同时受文件数与字节数限制：窗口中已读取但尚未交给转换函数的数据不超过 max_bytes，
+    超过 max_bytes 的单个文件不预读，由转换函数自行读取。字节预算按任务顺序分配，靠前的文件不会因后面的文件占满预算而等待。
+
+    可以序列化传入子进程，子进程中得到文件数、字节数上限相同且统计清零的新预读器。
+
+    Attributes:
+        max_files (int): 预读窗口的文件数上限。
+        max_bytes (int): 预读窗口的字节数上限。
+        threads (int): 读取线程数。
+        files (int): 已预读的文件数。
+        bytes (int): 已预读的字节数。
+        skipped (int): 超过字节上限或读取失败而未预读的文件数。
+        read_seconds (float): 各读取线程打开与读取文件的累计耗时。
+        wait_seconds (float): 使用方等待预读结果的累计耗时，即未被隐藏的读取等待。
+    """
+
+    def __init__(self, max_files=16, max_bytes=256 << 20, threads=4):
+        """
+        初始化预读器。
+
+        :param max_files: 预读窗口的文件数上限，默认为 16。
+        :param max_bytes: 预读窗口的字节数上限，默认为 256 MB。
+        :param threads: 读取线程数，默认为 4。
+        """
+        self.max_files = max(1, int(max_files))
+        self.max_bytes = max(1, int(max_bytes))
+        self.threads = max(1, int(threads))
+        self.files = self.bytes = self.skipped = 0
+        self.read_seconds = self.wait_seconds = 0.0
+        self._cond = threading.Condition()
+        self._used = 0
+        self._next_grant = 0
+        self._closed = False
+
+    @classmethod
+    def from_config(cls, batch_config):
+        """
+        按批处理配置创建预读器。
+
+        :param batch_config: 批处理配置字典。
+        :return: Prefetcher 对象，prefetch_files 为 0 时返回 None（不预读）。
+        """
+        if int(batch_config['prefetch_files']) <= 0:
+            return None
+        return cls(batch_config['prefetch_files'], float(batch_config['prefetch_mb']) * (1 << 20),
+                   batch_config['prefetch_threads'])
+
+    def __getstate__(self):
+        """
+        序列化时只保留预读参数，锁与统计不传入子进程。
+
+        :return: (max_files, max_bytes, threads)。
+        """
+        return self.max_files, self.max_bytes, self.threads
+
+    def __setstate__(self, state):
+        """
+        按预读参数重新初始化。
+
+        :param state: __getstate__ 返回的预读参数。
+        """
+        self.__init__(*state)
+
+    def split(self, parts):
+        """
+        将文件数、字节数上限与读取线程平均分给多个同时运行的预读器，各预读器的内存合计不超过 max_bytes；
+        文件数与线程数每个预读器至少为 1，预读器数量多于 max_files 或 threads 时合计会超过原上限。
+
+        :param parts: 预读器数量，如进程数。
+        :return: 新的 Prefetcher 对象。
+        """
+        parts = max(1, int(parts))
+        return Prefetcher(self.max_files // parts, self.max_bytes // parts, self.threads // parts)
+
+    def merge_stats(self, stats):
+        """
+        累加其他预读器（如子进程中的预读器）的统计。
+
+        :param stats: stats 返回的统计字典。
+        """
+        with self._cond:
+            self.files += stats['files']
+            self.bytes += stats['bytes']
+            self.skipped += stats['skipped']
+            self.read_seconds += stats['read_seconds']
+            self.wait_seconds += stats['wait_seconds']
+
+    def iter(self, tasks):
+        """
+        按顺序返回任务与预读到的文件内容。
+
+        :param tasks: 任务参数元组的可迭代对象，第一个元素为输入文件路径。
+        :return: (args, data) 生成器，data 为文件内容 bytes，未预读时为 None。
+        """
+        tasks = iter(tasks)
+        window = deque()
+        executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='prefetch')
+        with self._cond:
+            self._used = 0
+            self._next_grant = 0
+            self._closed = False
+        try:
+            ticket = 0
+            while True:
+                while len(window) < self.max_files:
+                    args = next(tasks, None)
+                    if args is None:
+                        break
+                    window.append((args, executor.submit(self._read, args[0], ticket)))
+                    ticket += 1
+                if not window:
+                    return
+
+                args, future = window.popleft()
+                start = time.perf_counter()
+                data = future.result()
+                self.wait_seconds += time.perf_counter() - start
+                if data is not None:
+                    with self._cond:
+                        self._used -= len(data)
+                        self._cond.notify_all()
+                yield args, data
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self):
+        """
+        获取预读统计。
+
+        :return: 统计字典 {'files', 'bytes', 'skipped', 'read_seconds', 'wait_seconds', 'hidden_seconds'}，
+                 hidden_seconds 为被解码与编码重叠而隐藏的读取等待秒数。
+        """
+        return {
+            'files': self.files,
+            'bytes': self.bytes,
+            'skipped': self.skipped,
+            'read_seconds': self.read_seconds,
+            'wait_seconds': self.wait_seconds,
+            'hidden_seconds': max(0.0, self.read_seconds - self.wait_seconds),
+        }
+
+    def _read(self, path, ticket):
+        """
+        在读取线程中按顺序申请字节预算并读取整个文件。
+
+        :param path: 输入文件路径。
+        :param ticket: 任务序号，字节预算按序号依次分配。
+        :return: 文件内容 bytes，超过字节上限、读取失败或预读已停止时返回 None。
+        """
+        start = time.perf_counter()
+        read_seconds = 0.0
+        data = None
+        try:
+            with open(path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                read_seconds += time.perf_counter() - start
+                if self._acquire(ticket, size):  # 等待预算的时间不计入读取耗时
+                    start = time.perf_counter()
+                    try:
+                        data = f.read()
+                    finally:
+                        read_seconds += time.perf_counter() - start
+                        if data is None or len(data) != size:
+                            self._release(size)
+                    if len(data) != size:  # 读取期间文件大小发生变化，交给转换函数重新读取
+                        data = None
+        except OSError:
+            self._skip(ticket)
+        with self._cond:
+            self.read_seconds += read_seconds
+            if data is None:
+                self.skipped += 1
+            else:
+                self.files += 1
+                self.bytes += len(data)
+        return data
+
+    def _acquire(self, ticket, size):
+        """
+        按任务顺序申请字节预算，窗口为空时总能申请到（单个文件不超过上限的前提下）。
+
+        :param ticket: 任务序号。
+        :param size: 需要的字节数。
+        :return: 是否申请成功，文件超过字节上限或预读已停止时返回 False。
+        """
+        with self._cond:
+            while not self._closed and (self._next_grant != ticket or (
+                    size <= self.max_bytes and self._used and self._used + size > self.max_bytes)):
+                self._cond.wait()
+            self._next_grant = max(self._next_grant, ticket + 1)
+            self._cond.notify_all()
+            if self._closed or size > self.max_bytes:
+                return False
+            self._used += size
+            return True
+
+    def _release(self, size):
+        """
+        归还字节预算。
+
+        :param size: 字节数。
+        """
+        with self._cond:
+            self._used -= size
+            self._cond.notify_all()
+
+    def _skip(self, ticket):
+        """
+        打开文件失败时跳过该序号，保证后面的文件可以继续申请预算。
+
+        :param ticket: 任务序号。
+        """
+        with self._cond:
+            while not self._closed and self._next_grant < ticket:
+                self._cond.wait()
+            self._next_grant = max(self._next_grant, ticket + 1)
+            self._cond.notify_all()
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: progress.py
+Update: 2026.10.18
+"""
+
+import os
+import threading
+import time
+
+
+def output_bytes(result):
+    """
+    统计转换结果的输出字节数。
+
+    :param result: 转换函数的返回值，输出文件路径或路径列表时统计文件大小，其他返回值记为 0。
+    :return: 字节数。
+    """
+    if isinstance(result, str):
+        result = [result]
+    if not isinstance(result, (list, tuple)):
+        return 0
+    total = 0
+    for path in result:
+        try:
+            total += os.path.getsize(path)
+        except (OSError, TypeError, ValueError):
+            pass
+    return total
+
+
+class ProgressTracker:
+    """
+    批量转换进度统计类，可直接作为 map_batch 的 progress_callback 使用。
+
+    累计 map_batch 的进度事件，计算文件数、输入输出字节数、吞吐与剩余时间，
+    并以不高于 min_interval 的频率把进度快照交给回调函数，避免大量小文件时频繁刷新界面。
+
+    Attributes:
+        done (int): 已处理的文件数（含失败）。
+        total (int): 需要处理的文件数（不含跳过的文件），扫描输入文件夹期间为估计值。
+        failed (int): 失败的文件数。
+        skipped (int): 增量转换或继续任务时跳过的文件数。
+        bytes_in (int): 已处理的输入字节数。
+        bytes_out (int): 已写入的输出字节数。
+        bytes_total (int): 需要处理的输入总字节数，扫描输入文件夹期间为估计值。
+        scanning (bool): 输入文件夹是否仍在扫描，扫描期间总数还会增加，不估计剩余时间。
+        cancelled (bool): 任务是否被取消。
+        prefetch (dict): 输入文件预读统计（见 Prefetcher.stats），未预读时为 None。
+    """
+
+    def __init__(self, callback=None, min_interval=0.2):
+        """
+        初始化进度统计。
+
+        :param callback: 接收进度快照字典的函数，如 pyqtSignal.emit，默认为 None（只统计不回调）。
+        :param min_interval: 两次 'progress' 回调的最小间隔秒数，'start' 与 'end' 总是立即回调，默认为 0.2。
+        """
+        self.callback = callback
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        清空统计，准备开始新的任务。
+        """
+        self.done = self.total = self.failed = self.skipped = 0
+        self.bytes_in = self.bytes_out = self.bytes_total = 0
+        self.current = None
+        self.scanning = False
+        self.cancelled = False
+        self.prefetch = None
+        self._start = None
+        self._elapsed = None
+        self._last_emit = 0.0
+
+    def __call__(self, event):
+        """
+        接收一个 map_batch 进度事件并按需回调进度快照。
+
+        :param event: 进度事件字典。
+        """
+        kind = event.get('event')
+        with self._lock:
+            if kind == 'start':
+                self.reset()
+                self._start = time.perf_counter()
+                self.total = event.get('total', 0)
+                self.skipped = event.get('skipped', 0)
+                self.bytes_total = event.get('bytes_total', 0)
+                self.scanning = event.get('scanning', False)
+            elif kind == 'file':
+                if self._start is None:
+                    self._start = time.perf_counter()
+                self.done = event.get('done', self.done + 1)
+                # 流式扫描时总数是估计值，随事件更新，可能增加也可能因跳过的文件而减少
+                self.total = max(event.get('total', self.total), self.done)
+                self.skipped = event.get('skipped', self.skipped)
+                self.bytes_total = event.get('bytes_total', self.bytes_total)
+                self.scanning = event.get('scanning', False)
+                self.failed += not event.get('ok', True)
+                self.bytes_in += event.get('bytes_in', 0)
+                self.bytes_out += event.get('bytes_out', 0)
+                self.current = event.get('input')
+                now = time.perf_counter()
+                if self.done < self.total and now - self._last_emit < self.min_interval:
+                    return
+                self._last_emit = now
+            elif kind == 'end':
+                self._elapsed = event.get('elapsed', self.elapsed)
+                self.failed = max(self.failed, event.get('failed', 0))
+                self.skipped = event.get('skipped', self.skipped)
+                if not event.get('cancelled', False):
+                    self.total = self.done  # 完成时估计的总数修正为实际处理的文件数
+                self.scanning = False
+                self.cancelled = event.get('cancelled', False)
+                self.prefetch = event.get('prefetch')
+            else:
+                return
+            snapshot = self._snapshot('progress' if kind == 'file' else kind)
+
+        if self.callback is not None:
+            self.callback(snapshot)
+
+    @property
+    def elapsed(self):
+        """
+        已用时间（秒），任务结束后固定为任务总耗时。
+        """
+        if self._elapsed is not None:
+            return self._elapsed
+        return time.perf_counter() - self._start if self._start is not None else 0.0
+
+    def snapshot(self):
+        """
+        获取当前进度快照。
+
+        :return: 进度快照字典，字段见 _snapshot。
+        """
+        with self._lock:
+            return self._snapshot('progress')
+
+    def _snapshot(self, kind):
+        """
+        生成进度快照，调用方需持有锁。
+
+        :param kind: 快照类型，'start'、'progress' 或 'end'。
+        :return: 进度快照字典 {'event', 'done', 'total', 'failed', 'skipped', 'bytes_in', 'bytes_out', 'bytes_total',
+                 'files_per_sec', 'mb_per_sec', 'eta', 'elapsed', 'current', 'scanning', 'cancelled', 'prefetch'}，
+                 eta 为预计剩余秒数，无法估计（如仍在扫描输入文件夹）时为 None。
+        """
+        elapsed = self.elapsed
+        files_per_sec = self.done / elapsed if elapsed > 0 else 0.0
+        bytes_per_sec = self.bytes_in / elapsed if elapsed > 0 else 0.0
+
+        eta = None
+        if kind == 'end' or (self.done >= self.total and not self.scanning):
+            eta = 0.0
+        elif self.scanning:
+            eta = None
+        elif self.bytes_total and bytes_per_sec > 0:
+            # 文件大小差异较大时按字节估计更准确
+            eta = max(0, self.bytes_total - self.bytes_in) / bytes_per_sec
+        elif files_per_sec > 0:
+            eta = (self.total - self.done) / files_per_sec
+
+        return {
+            'event': kind,
+            'done': self.done,
+            'total': self.total,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'bytes_total': self.bytes_total,
+            'files_per_sec': files_per_sec,
+            'mb_per_sec': bytes_per_sec / (1 << 20),
+            'eta': eta,
+            'elapsed': elapsed,
+            'current': self.current,
+            'scanning': self.scanning,
+            'cancelled': self.cancelled,
+            'prefetch': self.prefetch,
+        }
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: scanner.py
+Update: 2026.10.18
+"""
+
+import fnmatch
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def compile_globs(patterns):
+    """
+    将多个通配符模式编译为一个正则表达式，大小写规则与 fnmatch.fnmatch 一致（Windows 不区分大小写）。
+
+    :param patterns: 通配符模式列表，如 ['*.png', 'raw/*']。
+    :return: 编译后的正则表达式，模式列表为空时返回 None。
+    """
+    patterns = [os.path.normcase(pattern) for pattern in patterns or () if pattern]
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{fnmatch.translate(pattern)})' for pattern in patterns))
+
+
+def normalize_extensions(extensions):
+    """
+    统一扩展名写法为小写并带前导点，如 'PNG' -> '.png'。
+
+    :param extensions: 扩展名列表。
+    :return: 扩展名集合，列表为空或为 None 时返回 None（不按扩展名过滤）。
+    """
+    if not extensions:
+        return None
+    return {ext.lower() if ext.startswith('.') else '.' + ext.lower() for ext in extensions}
+
+
+class FolderScanner:
+    """
+    并行目录扫描类。多个线程同时对不同子目录调用 os.scandir，扫描到的文件以流的形式返回，
+    转换可以在整个目录树扫描完成前开始；扩展名与通配符过滤只使用目录项中的文件名，不访问文件本身。
+
+    通配符同时匹配文件名与相对输入文件夹的路径（以 / 分隔），例如 '*.png'、'thumbs'、'raw/*.bin'；
+    匹配排除模式的子目录整个跳过，不再扫描。与 os.walk 相同，不进入指向目录的符号链接，无法读取的目录跳过。
+
+    Attributes:
+        input_folder (str): 输入文件夹。
+        extensions (set): 允许的扩展名集合，None 表示不限。
+        threads (int): 扫描线程数。
+        found (int): 已扫描到的符合条件的文件数。
+        dirs (int): 已扫描的目录数。
+        errors (int): 无法读取的目录数。
+        finished (bool): 整个目录树是否已扫描完成。
+    """
+
+    def __init__(self, input_folder, extensions=None, include=None, exclude=None, threads=8, skip_prefixes=(),
+                 skip_dirs=()):
+        """
+        初始化目录扫描器。
+
+        :param input_folder: 输入文件夹。
+        :param extensions: 允许的扩展名列表，如 ['.png', '.jpg']，默认为 None（不限）。
+        :param include: 包含的通配符模式列表，不为空时只返回匹配任一模式的文件，默认为 None。
+        :param exclude: 排除的通配符模式列表，匹配的文件与子目录均跳过，默认为 None。
+        :param threads: 扫描线程数，默认为 8。
+        :param skip_prefixes: 跳过以这些前缀开头的文件名，如批处理自身的清单与临时文件，默认为空。
+        :param skip_dirs: 不扫描的目录路径，如位于输入文件夹内、转换过程中正在写入的输出文件夹，默认为空。
+        """
+        self.input_folder = input_folder
+        self.extensions = normalize_extensions(extensions)
+        self.threads = max(1, int(threads))
+        self._include = compile_globs(include)
+        self._exclude = compile_globs(exclude)
+        self._skip_prefixes = tuple(skip_prefixes)
+        self._skip_dirs = {os.path.normcase(os.path.abspath(path)) for path in skip_dirs if path}
+        self._lock = threading.Lock()
+        self.found = self.dirs = self.errors = 0
+        self.finished = False
+
+    def __iter__(self):
+        """
+        扫描目录树，按扫描顺序返回文件。提前结束迭代时停止扫描线程。
+
+        :return: (所在目录, 文件名) 生成器，所在目录与 os.walk 返回的 root 一致。
+        """
+        results = queue.Queue()
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='scan')
+        pending = 0
+        with self._lock:
+            self.found = self.dirs = self.errors = 0
+            self.finished = False
+
+        def submit(directory, relative):
+            nonlocal pending
+            with self._lock:
+                pending += 1
+            try:
+                executor.submit(scan, directory, relative)
+            except RuntimeError:  # 扫描已停止，线程池不再接受任务
+                finished()
+
+        def finished():
+            nonlocal pending
+            with self._lock:
+                pending -= 1
+                if pending:
+                    return
+                self.finished = True
+            results.put(None)
+
+        def scan(directory, relative):
+            try:
+                if not stop.is_set():
+                    files = self._scan_directory(directory, relative, submit)
+                    if files:
+                        results.put((directory, files))
+            finally:
+                finished()
+
+        submit(self.input_folder, '')
+        try:
+            while True:
+                item = results.get()
+                if item is None:
+                    return
+                directory, files = item
+                for file in files:
+                    yield directory, file
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _scan_directory(self, directory, relative, submit):
+        """
+        在扫描线程中读取一个目录：子目录提交给线程池继续扫描，文件按条件过滤。
+
+        :param directory: 目录路径。
+        :param relative: 目录相对输入文件夹的路径前缀，根目录为空字符串，其他以 / 结尾。
+        :param submit: 提交子目录扫描的函数，参数为 (目录路径, 相对路径前缀)。
+        :return: 目录中符合条件的文件名列表。
+        """
+        files = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    name = entry.name
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if not entry.is_symlink() and not self._match(self._exclude, name, relative) and not (
+                                self._skip_dirs and os.path.normcase(os.path.abspath(entry.path)) in self._skip_dirs):
+                            submit(entry.path, relative + name + '/')
+                    elif self._accept(name, relative):
+                        files.append(name)
+        except OSError:
+            with self._lock:
+                self.errors += 1
+
+        with self._lock:
+            self.dirs += 1
+            self.found += len(files)
+        return files
+
+    def _accept(self, name, relative):
+        """
+        判断文件是否符合扩展名与通配符条件。
+
+        :param name: 文件名。
+        :param relative: 所在目录相对输入文件夹的路径前缀。
+        :return: 是否返回该文件。
+        """
+        if self._skip_prefixes and name.startswith(self._skip_prefixes):
+            return False
+        if self.extensions is not None and os.path.splitext(name)[1].lower() not in self.extensions:
+            return False
+        if self._include is not None and not self._match(self._include, name, relative):
+            return False
+        return not self._match(self._exclude, name, relative)
+
+    @staticmethod
+    def _match(pattern, name, relative):
+        """
+        判断文件名或相对路径是否匹配通配符。
+
+        :param pattern: compile_globs 编译得到的正则表达式，None 表示没有模式。
+        :param name: 文件或目录名。
+        :param relative: 所在目录相对输入文件夹的路径前缀。
+        :return: 是否匹配。
+        """
+        if pattern is None:
+            return False
+        return bool(pattern.match(os.path.normcase(name)) or pattern.match(os.path.normcase(relative + name)))
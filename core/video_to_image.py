@@ -4,14 +4,22 @@ Project Name: format_conversion
 File Created: 2024.06.14
 Author: ZhangYuetao
 File Name: video_to_image.py
-Update: 2025.06.24
+Update: 2026.10.18
 """
 
 import os
+import time
 
 import cv2
 from PIL import Image
-import zyt_validation_utils
+
+import config
+from core import batch_executor
+from core.cancel import checkpoint
+from core.file_type import VIDEO, kind_from_extension
+from core.frame_writer import FrameWriter
+from core.gif_writer import GifStreamWriter
+from core.journal import BatchJournal
 
 
 def get_video_fps(video_path):
@@ -30,7 +38,227 @@ def get_video_fps(video_path):
     return fps
 
 
-def video_to_images(input_path, output_path, nums, target_format, error_label=None):
+def load_video_config():
+    """
+    加载视频抽帧配置。
+
+    :return: 视频抽帧配置字典。
+    """
+    return config.load_config(config.VIDEO_SETTING_FILE, config.VIDEO_SETTING_DEFAULT_CONFIG)
+
+
+def frame_writer_options(video_config=None):
+    """
+    从视频抽帧配置中取出帧写入器参数。
+
+    :param video_config: 视频抽帧配置字典，None 表示读取配置。
+    :return: FrameWriter 关键字参数字典。
+    """
+    if video_config is None:
+        video_config = load_video_config()
+    return {
+        'encoders': int(video_config['encode_threads']),
+        'queue_depth': int(video_config['encode_queue_depth']),
+        'backend': video_config['encode_backend'].lower(),
+        'encode_options': {
+            'jpeg_quality': int(video_config['jpeg_quality']),
+            'png_compression': int(video_config['png_compression']),
+            'tiff_compression': video_config['tiff_compression'].lower(),
+        },
+    }
+
+
+def sample_frame_indices(fps, nums, total_frames):
+    """
+    按时间累积器计算需要保留的帧序号，与逐帧读取时的抽帧结果一致。
+
+    :param fps: 视频帧率。
+    :param nums: 每秒提取的帧数。
+    :param total_frames: 视频总帧数。
+    :return: 需要保留的帧序号列表（从 0 开始）。
+    """
+    time_interval = 1.0 / nums  # 每帧的时间间隔
+    current_time = 0.0
+    indices = []
+    for index in range(total_frames):
+        current_time += 1.0 / fps  # 当前时间累积
+        if current_time >= time_interval:
+            current_time -= time_interval  # 重置当前时间
+            indices.append(index)
+    return indices
+
+
+def _iter_grabbed_frames(video, fps, nums, stats):
+    """
+    顺序抽帧：所有帧只 grab，只有需要保留的帧才 retrieve 解码与转换。
+
+    :param video: 已打开的 cv2.VideoCapture 对象。
+    :param fps: 视频帧率。
+    :param nums: 每秒提取的帧数。
+    :param stats: 统计字典，会累加 grabbed/retrieved 计数。
+    :return: 保留帧的 BGR 数组生成器。
+    """
+    time_interval = 1.0 / nums
+    current_time = 0.0
+    while video.grab():
+        checkpoint()
+        stats['grabbed'] += 1
+        current_time += 1.0 / fps
+        if current_time >= time_interval:
+            current_time -= time_interval
+            ret, frame = video.retrieve()
+            if not ret:
+                break
+            stats['retrieved'] += 1
+            yield frame
+
+
+def _iter_frames_at(video, indices, seek_min_stride, stats):
+    """
+    定位抽帧：间隔较大时通过 CAP_PROP_POS_FRAMES 直接定位，间隔较小时 grab 跳过中间帧。
+
+    :param video: 已打开的 cv2.VideoCapture 对象。
+    :param indices: 需要保留的帧序号列表（升序）。
+    :param seek_min_stride: 两帧间隔超过该帧数时使用定位读取。
+    :param stats: 统计字典，会累加 grabbed/retrieved/seeks 计数。
+    :return: 保留帧的 BGR 数组生成器。
+    """
+    position = int(video.get(cv2.CAP_PROP_POS_FRAMES))  # 下一次 grab 将读取的帧序号
+    for index in indices:
+        checkpoint()
+        if index - position > seek_min_stride:
+            video.set(cv2.CAP_PROP_POS_FRAMES, index)
+            stats['seeks'] += 1
+            position = index
+        while position < index:
+            if not video.grab():
+                return
+            stats['grabbed'] += 1
+            position += 1
+        if not video.grab():
+            return
+        stats['grabbed'] += 1
+        position += 1
+        ret, frame = video.retrieve()
+        if not ret:
+            return
+        stats['retrieved'] += 1
+        yield frame
+
+
+def _frame_path(output_path, old_filename, number, target_format):
+    """
+    生成抽帧图像的保存路径。
+
+    :param output_path: 输出文件夹路径。
+    :param old_filename: 视频文件名。
+    :param number: 全局帧编号。
+    :param target_format: 目标格式。
+    :return: 图像保存路径。
+    """
+    filepath = os.path.join(output_path, f"{old_filename}_{number:04d}.{target_format.lower()}")
+    return filepath.replace('\\', '/')
+
+
+def _write_frames(frames, output_path, old_filename, first_number, target_format, stats, writer_options):
+    """
+    解码与编码解耦：当前线程只负责解码并将帧放入有界队列，由编码线程池并行转换与保存。
+
+    :param frames: 保留帧的 BGR 数组生成器。
+    :param output_path: 输出文件夹路径。
+    :param old_filename: 视频文件名。
+    :param first_number: 第一帧的全局编号。
+    :param target_format: 目标格式。
+    :param stats: 统计字典，会累加 kept 并写入 decode_seconds/decode_fps/encode_fps。
+    :param writer_options: FrameWriter 关键字参数字典（编码线程数、队列深度、编码后端与编码参数）。
+    :return: 保存的图像路径列表。
+    """
+    outputs = []
+    decode_seconds = 0.0
+    with FrameWriter(**writer_options) as writer:
+        frames = iter(frames)
+        while True:
+            start = time.perf_counter()
+            frame = next(frames, None)
+            decode_seconds += time.perf_counter() - start
+            if frame is None:
+                break
+            outputs.append(_frame_path(output_path, old_filename, first_number + stats['kept'], target_format))
+            writer.submit(frame, outputs[-1])
+            stats['kept'] += 1
+    stats['decode_seconds'] = decode_seconds
+    stats['decode_fps'] = stats['kept'] / decode_seconds if decode_seconds else 0.0
+    stats['encode_fps'] = writer.encode_fps
+    return outputs
+
+
+def extract_frame_range(input_path, output_path, target_format, old_filename, indices, first_number,
+                        seek_min_stride, writer_options=None):
+    """
+    独立打开视频，定位到范围起点并提取该时间范围内的帧，供进程池并行调用。
+
+    :param input_path: 输入视频文件的路径。
+    :param output_path: 输出图像的保存路径。
+    :param target_format: 目标格式。
+    :param old_filename: 视频文件名。
+    :param indices: 该范围内需要保留的帧序号列表（升序）。
+    :param first_number: 该范围第一帧的全局编号，保证合并后编号连续。
+    :param seek_min_stride: 两帧间隔超过该帧数时使用定位读取。
+    :param writer_options: FrameWriter 关键字参数字典，None 表示在当前线程中用 PIL 同步写入。
+    :return: (保存的图像路径列表, 该范围的抽帧统计字典)。
+    :raises ValueError: 如果无法打开视频。
+    """
+    stats = {'grabbed': 0, 'retrieved': 0, 'seeks': 0, 'kept': 0}
+    if not indices:
+        return [], stats
+
+    video = cv2.VideoCapture(input_path)
+    if not video.isOpened():
+        raise ValueError("Error: Could not open video.")
+
+    try:
+        video.set(cv2.CAP_PROP_POS_FRAMES, indices[0])
+        stats['seeks'] += 1
+        frames = _iter_frames_at(video, indices, seek_min_stride, stats)
+        outputs = _write_frames(frames, output_path, old_filename, first_number, target_format, stats,
+                                writer_options or {'encoders': 0})
+    finally:
+        video.release()
+    return outputs, stats
+
+
+def _extract_ranges_parallel(input_path, output_path, target_format, old_filename, indices, total_frames, segments,
+                             seek_min_stride, writer_options):
+    """
+    将视频按帧范围均分为若干段，分发到进程池并行提取。
+
+    :param input_path: 输入视频文件的路径。
+    :param output_path: 输出图像的保存路径。
+    :param target_format: 目标格式。
+    :param old_filename: 视频文件名。
+    :param indices: 整个视频需要保留的帧序号列表（升序）。
+    :param total_frames: 视频总帧数。
+    :param segments: 分段数量，同时也是进程数。
+    :param seek_min_stride: 两帧间隔超过该帧数时使用定位读取。
+    :param writer_options: 每段使用的 FrameWriter 关键字参数字典。
+    :return: 各段 (保存的图像路径列表, 抽帧统计字典) 的生成器。
+    """
+    tasks = []
+    position = 0
+    for segment in range(segments):
+        range_end = total_frames * (segment + 1) // segments
+        first_number = position
+        while position < len(indices) and indices[position] < range_end:
+            position += 1
+        tasks.append((input_path, output_path, target_format, old_filename, indices[first_number:position],
+                      first_number, seek_min_stride, writer_options))
+
+    for _, range_result in batch_executor.map_batch(extract_frame_range, tasks, workers=segments, chunk_size=1):
+        yield range_result
+
+
+def video_to_images(input_path, output_path, nums, target_format, error_label=None, sample_mode=None,
+                    gif_scale=None, gif_frame_step=None, segments=None, create_dirs=True, progress_callback=None):
     """
     将视频文件转换为图像或 GIF 文件。
 
@@ -39,15 +267,25 @@ def video_to_images(input_path, output_path, nums, target_format, error_label=No
     :param nums: 控制提取帧的间隔或 GIF 的分段数量。
     :param target_format: 目标格式，如 "jpeg"、"png" 或 "gif"。
     :param error_label: 错误信息信号，用于在 GUI 中显示错误信息，默认为 None。
+    :param sample_mode: 抽帧方式，'grab' 顺序跳帧、'seek' 定位读取、'auto' 按抽帧间隔自动选择，None 表示读取配置。
+    :param gif_scale: GIF 帧缩放比例，None 表示读取配置。
+    :param gif_frame_step: GIF 抽帧间隔，每隔多少帧保留一帧，None 表示读取配置。
+    :param segments: 单个视频按时间范围拆分的段数，大于 1 时各段在独立进程中并行抽帧，None 表示读取配置。
+    :param create_dirs: 是否创建输出文件夹，默认为 True。批量转换时输出目录已由 OutputPlan 预先创建，传入 False。
+    :param progress_callback: 进度回调函数，完成后接收抽帧统计事件 {'event': 'video', 'input', 'grabbed' 读取帧数,
+                              'retrieved' 解码帧数, 'seeks' 定位次数, 'kept' 保存数量}，图像格式还包括
+                              decode_fps 解码吞吐与 encode_fps 编码吞吐，默认为 None。
+    :return: 保存的 GIF 文件或图像路径列表，失败时返回 None。
     """
+    video = None
     try:
-        # 检查输入文件是否为视频
-        if not zyt_validation_utils.is_video(input_path, speed="fast"):
+        # 按扩展名检查输入文件是否为视频，OpenCV 只接受路径，在这里读取文件头会多打开一次文件
+        if kind_from_extension(input_path) != VIDEO:
             raise ValueError("不支持的视频格式")
 
         # 如果输出路径不存在，则创建
-        if not os.path.exists(output_path):
-            os.makedirs(output_path)
+        if create_dirs:
+            os.makedirs(output_path, exist_ok=True)
 
         # 打开视频文件
         video = cv2.VideoCapture(input_path)
@@ -59,65 +297,104 @@ def video_to_images(input_path, output_path, nums, target_format, error_label=No
         total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))  # 获取总帧数
 
         old_filename = input_path.split('/')[-1]  # 获取视频文件名
+        stats = {'grabbed': 0, 'retrieved': 0, 'seeks': 0, 'kept': 0}
+        outputs = []
 
         if target_format.lower() == "gif":
-            # 处理 GIF 格式
+            # 处理 GIF 格式，逐帧流式写入，内存只保留当前一帧
+            video_config = load_video_config()
+            gif_scale = float(gif_scale or video_config['gif_scale'])
+            gif_frame_step = max(1, int(gif_frame_step or video_config['gif_frame_step']))
             nums = int(nums)
             segment_frames = total_frames // nums  # 每段 GIF 的帧数
-            frame_count = 0
+            duration = int(1000 / fps * gif_frame_step)
             extracted_count = 0
 
             for i in range(nums):
-                frames = []
-                for j in range(segment_frames):
-                    ret, frame = video.read()
-                    if not ret:
-                        break
-                    frames.append(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
-                    frame_count += 1
-
-                if frames:
-                    # 保存 GIF 文件
-                    gif_path = os.path.join(output_path, f"{old_filename}_{i + 1:02d}.gif")
-                    frames[0].save(gif_path, save_all=True, append_images=frames[1:], loop=0, duration=int(1000 / fps))
+                gif_path = os.path.join(output_path, f"{old_filename}_{i + 1:02d}.gif")
+                with GifStreamWriter(gif_path, duration) as writer:
+                    for j in range(segment_frames):
+                        checkpoint()
+                        if not video.grab():
+                            break
+                        stats['grabbed'] += 1
+                        if j % gif_frame_step:
+                            continue
+                        ret, frame = video.retrieve()
+                        if not ret:
+                            break
+                        stats['retrieved'] += 1
+                        if gif_scale != 1.0:
+                            frame = cv2.resize(frame, None, fx=gif_scale, fy=gif_scale, interpolation=cv2.INTER_AREA)
+                        writer.add_frame(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+
+                if writer.frame_count:
                     extracted_count += 1
+                    outputs.append(gif_path)
 
-            video.release()
+            stats['kept'] = extracted_count
             print(f"Extracted {extracted_count} GIFs from the video {input_path}.")
 
         else:
             # 处理图像格式
-            time_interval = 1.0 / nums  # 每帧的时间间隔
-            current_time = 0.0
-            extracted_count = 0
+            video_config = load_video_config()
+            sample_mode = (sample_mode or video_config['sample_mode']).lower()
+            seek_min_stride = int(video_config['seek_min_stride'])
+            writer_options = frame_writer_options(video_config)
+            if sample_mode == 'auto':
+                sample_mode = 'seek' if total_frames > 0 and fps / nums > seek_min_stride else 'grab'
 
-            while True:
-                ret, frame = video.read()
-                if not ret:
-                    break
+            segments = max(1, int(segments or video_config['segments']))
 
-                current_time += 1.0 / fps  # 当前时间累积
+            if segments > 1 and total_frames > 0:
+                # 按时间范围拆分，各子进程独立打开视频并行抽帧，先释放当前进程打开的视频
+                video.release()
+                indices = sample_frame_indices(fps, nums, total_frames)
+                start = time.perf_counter()
+                decode_seconds = 0.0
+                for range_outputs, range_stats in _extract_ranges_parallel(input_path, output_path, target_format,
+                                                                           old_filename, indices, total_frames,
+                                                                           segments, seek_min_stride, writer_options):
+                    outputs.extend(range_outputs)
+                    for key in stats:
+                        stats[key] += range_stats[key]
+                    decode_seconds = max(decode_seconds, range_stats.get('decode_seconds', 0.0))
+                elapsed = time.perf_counter() - start
+                # 各段并行执行，按最慢一段的解码时间与整体耗时估算吞吐
+                stats['decode_fps'] = stats['kept'] / decode_seconds if decode_seconds else 0.0
+                stats['encode_fps'] = stats['kept'] / elapsed if elapsed else 0.0
+            else:
+                if sample_mode == 'seek' and total_frames > 0:
+                    indices = sample_frame_indices(fps, nums, total_frames)
+                    frames = _iter_frames_at(video, indices, seek_min_stride, stats)
+                else:
+                    frames = _iter_grabbed_frames(video, fps, nums, stats)
 
-                if current_time >= time_interval:
-                    current_time -= time_interval  # 重置当前时间
-                    # 保存图像文件
-                    filepath = os.path.join(output_path, f"{old_filename}_{extracted_count:04d}.{target_format.lower()}")
-                    filepath = filepath.replace('\\', '/')
-                    image = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-                    image.save(filepath)
-                    extracted_count += 1
+                outputs = _write_frames(frames, output_path, old_filename, 0, target_format, stats, writer_options)
+                del stats['decode_seconds']
 
-            video.release()
-            print(f"Extracted {extracted_count} frames from the video {input_path}.")
+            print(f"Extracted {stats['kept']} frames from the video {input_path} "
+                  f"(grabbed {stats['grabbed']}, decoded {stats['retrieved']}, seeks {stats['seeks']}, "
+                  f"kept/grabbed {stats['kept'] / max(stats['grabbed'], 1):.1%}, "
+                  f"decode {stats['decode_fps']:.1f} fps, encode {stats['encode_fps']:.1f} fps).")
+        if progress_callback is not None:
+            progress_callback({'event': 'video', 'input': input_path, **stats})
+        return outputs
     except Exception as e:
         # 捕获异常并处理错误信息
         if error_label:
             error_label.emit(f"错误: {str(e)}")
         else:
             print(f"Error: {str(e)}")
+    finally:
+        # 出错或被取消（ConversionCancelled 不被 except Exception 捕获）时同样释放视频
+        if video is not None:
+            video.release()
 
 
-def videos_to_images(input_folder, output_folder, nums, target_format, error_label=None):
+def videos_to_images(input_folder, output_folder, nums, target_format, error_label=None, workers=None,
+                     gif_scale=None, gif_frame_step=None, resume=False, progress_callback=None, cancel_token=None,
+                     include=None, exclude=None, extensions=None, segments=None):
     """
     将文件夹中的所有视频文件转换为图像或 GIF 文件。
 
@@ -126,12 +403,28 @@ def videos_to_images(input_folder, output_folder, nums, target_format, error_lab
     :param nums: 控制提取帧的间隔或 GIF 的分段数量。
     :param target_format: 目标格式，如 "jpeg"、"png" 或 "gif"。
     :param error_label: 错误信息信号，用于在 GUI 中显示错误信息，默认为 None。
+    :param workers: 进程数，None 表示读取配置，0 表示自动使用全部 CPU 核心。
+    :param gif_scale: GIF 帧缩放比例，None 表示读取配置。
+    :param gif_frame_step: GIF 抽帧间隔，每隔多少帧保留一帧，None 表示读取配置。
+    :param resume: 是否从输出文件夹中的检查点继续未完成的任务，默认为 False。
+    :param progress_callback: 进度回调函数，接收 map_batch 定义的进度事件字典，默认为 None。
+    :param cancel_token: 取消与暂停令牌 CancelToken，默认为 None。取消时已完成的文件记入检查点，可继续执行。
+    :param include: 只转换匹配任一通配符的文件（匹配文件名或相对路径），None 表示读取配置。
+    :param exclude: 跳过匹配任一通配符的文件与子目录，None 表示读取配置。
+    :param extensions: 处理的扩展名列表，None 表示读取配置，配置为空时使用内置扩展名。
+    :param segments: 单个视频按时间范围拆分的段数，大于 1 时每个视频的各段在独立进程中并行抽帧，None 表示读取配置。
     """
-    for root, _, files in os.walk(input_folder):
-        for file in files:
-            input_path = os.path.join(root, file).replace('\\', '/')
-            output_path = root.replace(input_folder, output_folder).replace('\\', '/')
-            # 创建输出路径的目录
-            if not os.path.exists(output_path):
-                os.makedirs(output_path)
-            video_to_images(input_path, output_path, nums, target_format, error_label)
+    scanner = batch_executor.scan_folder(input_folder, VIDEO, include, exclude, extensions, output_folder)
+    tasks = ((input_path.replace('\\', '/'), output_path.replace('\\', '/'), nums, target_format)
+             for input_path, output_path in batch_executor.iter_folder_tasks(input_folder, output_folder,
+                                                                             scanner=scanner))
+    func_kwargs = {'gif_scale': gif_scale, 'gif_frame_step': gif_frame_step, 'segments': segments}
+    arguments = {'input_folder': input_folder, 'output_folder': output_folder, 'nums': nums,
+                 'target_format': target_format, 'workers': workers, 'include': include, 'exclude': exclude,
+                 'extensions': extensions, **func_kwargs}
+    with BatchJournal(output_folder, 'videos_to_images', arguments, resume) as journal:
+        for _ in batch_executor.map_batch(video_to_images, tasks, workers=workers, error_label=error_label,
+                                          func_kwargs={**func_kwargs, 'create_dirs': False}, journal=journal,
+                                          progress_callback=progress_callback, cancel_token=cancel_token,
+                                          scanner=scanner):
+            pass
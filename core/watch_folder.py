@@ -0,0 +1,472 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: watch_folder.py
+Update: 2026.10.18
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict
+
+import config
+from core import batch_executor
+from core.bin_to_image import bin_to_image, compile_bin_plan
+from core.file_monitor import (FileReadyWatcher, IN_CLOSE_WRITE, IN_CREATE, IN_ISDIR, IN_MOVED_TO,
+                               create_inotify)
+from core.file_type import BIN_EXTENSIONS, IMAGE_EXTENSIONS, VIDEO_EXTENSIONS
+from core.image_convert import convert_image
+from core.manifest import ConversionManifest
+from core.video_to_image import video_to_images
+
+IN_Q_OVERFLOW = 0x00004000
+DIR_EVENTS = IN_CREATE | IN_MOVED_TO | IN_CLOSE_WRITE
+
+# 保留最近多少个文件的延迟用于计算分位数
+LATENCY_WINDOW = 1000
+
+
+def load_watch_config():
+    """
+    加载监视模式配置。
+
+    :return: 监视模式配置字典。
+    """
+    return config.load_config(config.WATCH_SETTING_FILE, config.WATCH_SETTING_DEFAULT_CONFIG)
+
+
+def build_routes(watch_config, bin_config=None):
+    """
+    按配置生成文件扩展名到转换函数的路由，格式为空字符串的类型不处理。
+
+    :param watch_config: 监视模式配置字典。
+    :param bin_config: bin 参数配置字典，None 表示读取配置文件。
+    :return: {扩展名: (转换函数, 附加位置参数, 关键字参数, 是否传入 error_label)}。
+    """
+    routes = {}
+    if watch_config['bin_format']:
+        route = (bin_to_image, (watch_config['bin_format'],), {'plan': compile_bin_plan(bin_config)}, True)
+        routes.update(dict.fromkeys(BIN_EXTENSIONS, route))
+    if watch_config['video_format']:
+        route = (video_to_images, (float(watch_config['video_nums']), watch_config['video_format']), {}, True)
+        routes.update(dict.fromkeys(VIDEO_EXTENSIONS, route))
+    if watch_config['image_format']:
+        route = (convert_image, (watch_config['image_format'],), {}, True)
+        routes.update(dict.fromkeys(IMAGE_EXTENSIONS, route))
+    return routes
+
+
+def _route_params(routes):
+    """
+    生成路由的可 JSON 序列化描述，作为转换清单的参数，路由变化时所有文件重新转换。
+
+    :param routes: build_routes 返回的路由。
+    :return: 参数字典。
+    """
+    params = {}
+    for ext, (func, extra_args, func_kwargs, _) in sorted(routes.items()):
+        plan = func_kwargs.get('plan')
+        params[ext] = [func.__name__, list(extra_args), asdict(plan) if plan is not None else None]
+    return {'operation': 'watch_folder', 'routes': params}
+
+
+class WatchFolderService:
+    """
+    监视文件夹持续转换服务。监视输入文件夹（Linux 下使用 inotify，否则定时重新扫描），
+    新文件写入完成后放入有界队列，由进程池按扩展名调用对应的转换函数，输出到输出文件夹的对应子文件夹。
+
+    等待写入完成与排队中的文件数达到队列上限时，扫描线程暂停接收新文件（背压），文件仍保留在输入文件夹中，不会丢失；
+    转换结果记录在输出文件夹的转换清单中，重启后跳过已转换且未变化的文件。
+
+    Attributes:
+        input_folder (str): 输入文件夹地址。
+        output_folder (str): 输出文件夹地址。
+        watch_config (dict): 监视模式配置。
+        routes (dict): 扩展名到转换函数的路由。
+        uses_inotify (bool): 是否使用 inotify 监视输入文件夹。
+    """
+
+    def __init__(self, input_folder, output_folder, error_label=None, progress_callback=None, watch_config=None,
+                 bin_config=None):
+        """
+        初始化监视服务，调用 run 后开始监视。
+
+        :param input_folder: 输入文件夹地址。
+        :param output_folder: 输出文件夹地址。
+        :param error_label: 错误信息信号，默认为 None。
+        :param progress_callback: 进度回调函数，接收事件字典：
+                                  {'event': 'file', 'input', 'output', 'ok', 'latency'}、
+                                  {'event': 'metrics', ...}（字段见 metrics），默认为 None。
+        :param watch_config: 覆盖配置文件的监视模式参数字典，默认为 None。
+        :param bin_config: bin 参数配置字典，None 表示读取配置文件。
+        """
+        self.input_folder = os.path.abspath(input_folder)
+        self.output_folder = os.path.abspath(output_folder)
+        self.error_label = error_label
+        self.progress_callback = progress_callback
+        self.watch_config = {**load_watch_config(), **(watch_config or {})}
+        self.routes = build_routes(self.watch_config, bin_config)
+        self.workers = batch_executor.resolve_workers(self.watch_config['workers'])
+        self.uses_inotify = False
+
+        self._queue = queue.Queue(maxsize=max(1, int(self.watch_config['queue_size'])))
+        # 每个等待写入完成或排队中的文件占用一个名额，出队时归还，写入完成后放入队列不会阻塞检测线程
+        self._slots = threading.Semaphore(self._queue.maxsize)
+        self._ready_watcher = FileReadyWatcher(stable_time=float(self.watch_config['stable_time']))
+        self._stop = threading.Event()
+        self._active = set()  # 等待写入完成、排队中与转换中的文件
+        self._active_lock = threading.Lock()
+        self._arrivals = {}
+        self._in_flight = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._counters = dict.fromkeys(('arrived', 'converted', 'failed', 'skipped', 'timeouts',
+                                        'backpressure_waits', 'bytes_in'), 0)
+        self._counters_lock = threading.Lock()  # 扫描线程、检测线程与运行线程均会更新计数
+        self._started = None
+        self._last_metrics = (None, 0)
+
+    def stop(self):
+        """
+        请求停止，run 在当前转换中的文件完成后返回，可在信号处理函数或其他线程中调用。
+        """
+        self._stop.set()
+
+    def metrics(self):
+        """
+        获取运行指标。
+
+        :return: 指标字典：queue_depth 队列中的文件数、queue_size 队列上限、waiting 等待写入完成的文件数、
+                 in_flight 转换中的文件数、arrived/converted/failed/skipped/timeouts 累计文件数、
+                 backpressure_waits 因队列满而暂停接收的次数、bytes_in 已转换的输入字节数、
+                 throughput 累计吞吐（文件/秒）、recent_throughput 距上次输出指标以来的吞吐、
+                 latency_avg/latency_p50/latency_p95/latency_max 从发现文件到输出完成的延迟（秒）。
+        """
+        now = time.monotonic()
+        elapsed = now - self._started if self._started else 0.0
+        last_time, last_converted = self._last_metrics
+        latencies = sorted(self._latencies)
+
+        def percentile(fraction):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] if latencies else 0.0
+
+        with self._counters_lock:
+            counters = dict(self._counters)
+        converted = counters['converted']
+        return {
+            'event': 'metrics',
+            'queue_depth': self._queue.qsize(),
+            'queue_size': self._queue.maxsize,
+            'waiting': self._ready_watcher.pending,
+            'in_flight': self._in_flight,
+            **counters,
+            'throughput': converted / elapsed if elapsed else 0.0,
+            'recent_throughput': ((converted - last_converted) / (now - last_time)
+                                  if last_time and now > last_time else 0.0),
+            'latency_avg': sum(latencies) / len(latencies) if latencies else 0.0,
+            'latency_p50': percentile(0.5),
+            'latency_p95': percentile(0.95),
+            'latency_max': latencies[-1] if latencies else 0.0,
+        }
+
+    def run(self):
+        """
+        开始监视并持续转换，直到调用 stop。
+        """
+        if not self.routes:
+            raise ValueError("没有需要处理的文件类型，请在监视模式配置中设置目标格式")
+        os.makedirs(self.output_folder, exist_ok=True)
+        self._started = time.monotonic()
+        self._last_metrics = (self._started, 0)
+
+        scanner = threading.Thread(target=self._scan_loop, name='WatchFolderScanner', daemon=True)
+        executor = None
+        if self.workers > 1:
+            executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        in_flight = {}
+        metrics_interval = float(self.watch_config['metrics_interval'])
+        next_metrics = self._started + metrics_interval
+
+        try:
+            with ConversionManifest(self.output_folder, _route_params(self.routes)) as manifest:
+                scanner.start()  # 清单数据库创建后再启动扫描线程
+                while not self._stop.is_set() or in_flight:
+                    # 在途任务上限为进程数的两倍，其余文件留在有界队列中
+                    while not self._stop.is_set() and len(in_flight) < self.workers * 2:
+                        try:
+                            item = self._queue.get(timeout=0 if in_flight else 0.2)
+                        except queue.Empty:
+                            break
+                        self._slots.release()
+                        future = self._submit(executor, manifest, item)
+                        if future is not None:
+                            in_flight[future] = item
+                    self._in_flight = len(in_flight)
+
+                    if in_flight:
+                        done, _ = wait(in_flight, timeout=0.2, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            self._finish(manifest, in_flight.pop(future), future)
+                        self._in_flight = len(in_flight)
+
+                    if time.monotonic() >= next_metrics:
+                        self._emit_metrics()
+                        next_metrics = time.monotonic() + metrics_interval
+        finally:
+            self._stop.set()
+            if scanner.is_alive():
+                scanner.join()
+            self._ready_watcher.close()
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            self._emit_metrics()
+
+    def _emit_metrics(self):
+        """
+        通过进度回调输出运行指标。
+        """
+        metrics = self.metrics()
+        self._last_metrics = (time.monotonic(), metrics['converted'])
+        if self.progress_callback is not None:
+            self.progress_callback(metrics)
+
+    def _emit_error(self, text):
+        """
+        发送错误信息。
+
+        :param text: 错误信息。
+        """
+        if self.error_label is not None:
+            self.error_label.emit(text)
+        else:
+            print(text)
+
+    def _count(self, name, value=1):
+        """
+        增加计数。
+
+        :param name: 计数名称。
+        :param value: 增加的数量，默认为 1。
+        """
+        with self._counters_lock:
+            self._counters[name] += value
+
+    def _release(self, input_path):
+        """
+        文件处理结束（完成、失败、跳过或超时），之后的修改会重新触发转换。
+
+        :param input_path: 输入文件路径。
+        """
+        with self._active_lock:
+            self._active.discard(input_path)
+        return self._arrivals.pop(input_path, None)
+
+    def _submit(self, executor, manifest, item):
+        """
+        提交一个写入完成的文件。转换前再次检查转换清单，文件签名取写入完成后的状态。
+
+        :param executor: 进程池，单进程时为 None（在当前线程中执行）。
+        :param manifest: 运行线程的转换清单。
+        :param item: (input_path, output_path, route)。
+        :return: Future 对象，无需转换时返回 None。
+        """
+        input_path, output_path, route = item
+        signature = manifest.check(input_path)
+        if signature is None or signature[0] is None:  # 无需转换，或写入完成后又被移走或删除
+            self._count('skipped')
+            self._release(input_path)
+            return None
+
+        func, extra_args, func_kwargs, collect_errors = route
+        chunk = [(input_path, output_path, *extra_args)]
+        if executor is not None:
+            future = executor.submit(batch_executor.run_chunk, func, chunk, func_kwargs, collect_errors)
+        else:
+            future = Future()
+            future.set_result(batch_executor.run_chunk(func, chunk, func_kwargs, collect_errors))
+        future.signature = signature
+        return future
+
+    def _finish(self, manifest, item, future):
+        """
+        处理一个完成的转换任务：记录转换清单、更新指标并输出进度事件。
+
+        :param manifest: 运行线程的转换清单。
+        :param item: (input_path, output_path, route)。
+        :param future: 已完成的 Future 对象。
+        """
+        input_path = item[0]
+        try:
+            [(_, result, messages, exc)], _ = future.result()
+        except Exception as e:  # 子进程异常退出
+            result, messages, exc = None, [], e
+        for message in messages:
+            self._emit_error(message)
+        if exc is not None:
+            self._emit_error(f"错误: {input_path}, {str(exc)}")
+            result = None
+
+        arrived = self._release(input_path)
+        latency = time.monotonic() - arrived if arrived is not None else 0.0
+        if result:
+            manifest.record(input_path, future.signature, result)
+            with self._counters_lock:
+                self._counters['converted'] += 1
+                self._counters['bytes_in'] += future.signature[0]
+            self._latencies.append(latency)
+        else:
+            self._count('failed')
+        if self.progress_callback is not None:
+            self.progress_callback({'event': 'file', 'input': input_path, 'output': result, 'ok': bool(result),
+                                    'latency': latency})
+
+    def _scan_loop(self):
+        """
+        扫描线程：首次遍历输入文件夹，之后通过 inotify 事件（或定时重新扫描）发现新文件与修改过的文件。
+        """
+        # SQLite 连接只能在创建它的线程中使用，扫描线程使用独立的清单连接预先过滤已转换的文件
+        with ConversionManifest(self.output_folder, _route_params(self.routes)) as manifest:
+            inotify = create_inotify()
+            self.uses_inotify = inotify is not None
+            if inotify is None:
+                self._poll_loop(manifest)
+                return
+
+            dir_watches = {}
+            try:
+                self._watch_tree(inotify, dir_watches, self.input_folder, manifest)
+                while not self._stop.is_set():
+                    for wd, mask, name in inotify.read_events(0.2):
+                        if mask & IN_Q_OVERFLOW:
+                            # 事件队列溢出，可能漏掉了事件，重新遍历
+                            self._watch_tree(inotify, dir_watches, self.input_folder, manifest)
+                            continue
+                        dir_path = dir_watches.get(wd)
+                        if dir_path is None or not name:
+                            continue
+                        path = os.path.join(dir_path, name)
+                        if mask & IN_ISDIR:
+                            # 新建或移入的子文件夹，添加监视后遍历其中已有的文件
+                            self._watch_tree(inotify, dir_watches, path, manifest)
+                        else:
+                            self._schedule(path, manifest)
+            finally:
+                inotify.close()
+
+    def _watch_tree(self, inotify, dir_watches, root, manifest):
+        """
+        为文件夹及其子文件夹添加 inotify 监视，并调度其中已有的文件。先添加监视再遍历，不会漏掉遍历期间新建的文件。
+
+        :param inotify: Inotify 对象。
+        :param dir_watches: {监视描述符: 文件夹路径}。
+        :param root: 文件夹路径。
+        :param manifest: 扫描线程的转换清单。
+        """
+        for dir_path, dirs, files in os.walk(root):
+            if self._stop.is_set():
+                return
+            if self._is_output(dir_path):
+                dirs[:] = []
+                continue
+            try:
+                dir_watches[inotify.add_watch(dir_path, DIR_EVENTS)] = dir_path
+            except OSError as e:
+                self._emit_error(f"错误: 无法监视文件夹 {dir_path}, {str(e)}")
+            for file in files:
+                self._schedule(os.path.join(dir_path, file), manifest)
+
+    def _poll_loop(self, manifest):
+        """
+        不支持 inotify 时定时重新扫描输入文件夹，只调度新增或大小、修改时间变化的文件。
+
+        :param manifest: 扫描线程的转换清单。
+        """
+        known = {}
+        interval = float(self.watch_config['rescan_interval'])
+        while not self._stop.is_set():
+            for dir_path, dirs, files in os.walk(self.input_folder):
+                if self._stop.is_set():
+                    return
+                if self._is_output(dir_path):
+                    dirs[:] = []
+                    continue
+                for file in files:
+                    path = os.path.join(dir_path, file)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    signature = (stat.st_size, stat.st_mtime_ns)
+                    if known.get(path) != signature:
+                        known[path] = signature
+                        self._schedule(path, manifest)
+            self._stop.wait(interval)
+
+    def _is_output(self, path):
+        """
+        判断路径是否位于输出文件夹中（输出文件夹在输入文件夹内时不监视输出）。
+
+        :param path: 路径。
+        :return: 位于输出文件夹中返回 True。
+        """
+        return path == self.output_folder or path.startswith(self.output_folder + os.sep)
+
+    def _schedule(self, input_path, manifest):
+        """
+        开始等待文件写入完成，已在处理中、无对应转换函数或已转换且未变化的文件跳过。
+        等待写入完成与排队中的文件数达到队列上限时阻塞扫描线程，直到有文件出队或停止。
+
+        :param input_path: 输入文件路径。
+        :param manifest: 扫描线程的转换清单。
+        """
+        filename = os.path.basename(input_path)
+        route = self.routes.get(os.path.splitext(filename)[1].lower())
+        if route is None or filename.startswith(batch_executor.RESERVED_PREFIXES):
+            return
+        with self._active_lock:
+            if input_path in self._active:
+                return
+        signature = manifest.check(input_path)
+        if signature is None or signature[0] is None:
+            return
+
+        if not self._slots.acquire(blocking=False):
+            self._count('backpressure_waits')
+            while not self._slots.acquire(timeout=0.2):
+                if self._stop.is_set():
+                    return
+
+        with self._active_lock:
+            self._active.add(input_path)
+        self._arrivals[input_path] = time.monotonic()
+        self._count('arrived')
+        output_path = os.path.join(self.output_folder, os.path.relpath(os.path.dirname(input_path), self.input_folder))
+        self._ready_watcher.watch(
+            input_path,
+            lambda path, ok: self._on_ready(path, output_path, route, ok),
+            timeout=float(self.watch_config['file_timeout']),
+        )
+
+    def _on_ready(self, input_path, output_path, route, ok):
+        """
+        文件写入完成（或超时）的回调，在检测线程中执行。名额已在调度时占用，放入队列不会阻塞。
+
+        :param input_path: 输入文件路径。
+        :param output_path: 输出文件夹路径。
+        :param route: 转换路由。
+        :param ok: 是否写入完成。
+        """
+        if not ok:
+            self._slots.release()
+            self._release(input_path)
+            if not self._stop.is_set():  # 停止时关闭检测对象，未完成的文件同样以 ok=False 回调
+                self._count('timeouts')
+                self._emit_error(f"错误: 等待文件写入完成超时 {input_path}")
+            return
+        self._queue.put_nowait((input_path, output_path, route))
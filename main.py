@@ -4,9 +4,10 @@ Project Name: format_conversion
 File Created: 2024.06.14
 Author: ZhangYuetao
 File Name: main.py
-Update: 2025.06.25
+Update: 2026.10.18
 """
 
+import multiprocessing
 import sys
 
 from PyQt5 import QtCore
@@ -17,6 +18,8 @@ import config
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 打包后批量转换进程池的子进程入口
+    
     QApplication.setAttribute(QtCore.Qt.AA_EnableHighDpiScaling)  # 自适应适配不同分辨率
     QApplication.setAttribute(QtCore.Qt.AA_UseHighDpiPixmaps)
     
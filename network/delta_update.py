@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: delta_update.py
+Update: 2026.10.18
+"""
+
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import shutil
+
+import toml
+
+import config
+
+MANIFEST_FILENAME = 'update_manifest.json'
+STAGING_DIRNAME = '.update_staging'
+READ_BLOCK_SIZE = 1 << 20
+
+
+def file_sha256(file_path, open_func=open):
+    """
+    计算文件内容的 SHA-256 哈希值。
+
+    :param file_path: 文件路径。
+    :param open_func: 打开文件的函数，远程文件传入共享目录后端的 open_file，默认为 open。
+    :return: 十六进制哈希字符串。
+    """
+    digest = hashlib.sha256()
+    with open_func(file_path, mode='rb') as f:
+        for block in iter(lambda: f.read(READ_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_manifest(software_dir):
+    """
+    生成软件文件夹的更新清单，记录每个文件的相对路径、大小与 SHA-256，排除隐藏文件与清单本身。
+
+    :param software_dir: 服务器上（或待发布）的软件文件夹。
+    :return: 清单字典 {'version': 版本号, 'files': [{'path', 'size', 'sha256'}, ...]}。
+    """
+    version = None
+    infos_path = os.path.join(software_dir, config.SOFTWARE_INFOS_FILE)
+    if os.path.exists(infos_path):
+        with open(infos_path, 'r', encoding='utf-8') as f:
+            version = toml.load(f).get('version')
+
+    files = []
+    for root, dirs, names in os.walk(software_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(names):
+            if name.startswith('.') or name == MANIFEST_FILENAME:
+                continue
+            file_path = os.path.join(root, name)
+            files.append({
+                'path': os.path.relpath(file_path, software_dir).replace(os.sep, '/'),
+                'size': os.path.getsize(file_path),
+                'sha256': file_sha256(file_path),
+            })
+    return {'version': version, 'files': files}
+
+
+def write_manifest(software_dir):
+    """
+    生成并原子写入软件文件夹的更新清单，发布新版本时在服务器软件文件夹上运行。
+
+    :param software_dir: 软件文件夹。
+    :return: 清单字典。
+    """
+    manifest = build_manifest(software_dir)
+    manifest_path = os.path.join(software_dir, MANIFEST_FILENAME)
+    temp_path = os.path.join(software_dir, f'.{MANIFEST_FILENAME}.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, manifest_path)
+    return manifest
+
+
+def load_remote_manifest(backend, remote_dir):
+    """
+    读取服务器软件文件夹中的更新清单。
+
+    :param backend: 共享目录访问后端。
+    :param remote_dir: 服务器上的软件文件夹。
+    :return: 清单字典，服务器未提供清单时返回 None。
+    """
+    try:
+        with backend.open_file(os.path.join(remote_dir, MANIFEST_FILENAME), mode='r', encoding='utf-8') as f:
+            return json.load(f)
+    except OSError:  # smbclient 的 SMBOSError 也是 OSError 的子类
+        return None
+
+
+def local_target(software_dir, relative_path):
+    """
+    计算清单中的文件在本地的安装路径，可执行文件放入 temp 文件夹，由新程序启动后替换旧程序。
+
+    :param software_dir: 当前软件的目录。
+    :param relative_path: 清单中的相对路径。
+    :return: 本地安装路径。
+    """
+    if relative_path.endswith('.exe'):
+        return os.path.join(software_dir, 'temp', os.path.basename(relative_path))
+    return os.path.join(software_dir, *relative_path.split('/'))
+
+
+def plan_update(manifest, software_dir):
+    """
+    对比清单与本地文件，找出需要下载的文件。大小不同时不再计算哈希。
+
+    :param manifest: 清单字典。
+    :param software_dir: 当前软件的目录。
+    :return: 需要下载的清单条目列表。
+    """
+    changed = []
+    for entry in manifest['files']:
+        local_path = os.path.join(software_dir, *entry['path'].split('/'))
+        if (os.path.isfile(local_path) and os.path.getsize(local_path) == entry['size']
+                and file_sha256(local_path) == entry['sha256']):
+            continue
+        changed.append(entry)
+    return changed
+
+
+def download_files(backend, remote_dir, entries, staging_dir, workers=4, chunk_size=8 << 20):
+    """
+    将文件下载到暂存文件夹并校验。大文件按 chunk_size 拆分为多个区间，所有区间由线程池并行下载，
+    全部下载完成后逐个校验大小与 SHA-256。
+
+    :param backend: 共享目录访问后端。
+    :param remote_dir: 服务器上的软件文件夹。
+    :param entries: 需要下载的清单条目列表。
+    :param staging_dir: 本地暂存文件夹。
+    :param workers: 并行下载线程数，默认为 4。
+    :param chunk_size: 下载区间大小（字节），默认为 8 MB。
+    :return: 下载的字节数。
+    :raises ValueError: 如果文件校验失败。
+    """
+    ranges = []
+    for entry in entries:
+        staged_path = os.path.join(staging_dir, *entry['path'].split('/'))
+        os.makedirs(os.path.dirname(staged_path), exist_ok=True)
+        with open(staged_path, 'wb') as f:
+            f.truncate(entry['size'])  # 预分配，各区间直接写入对应位置
+        remote_path = os.path.join(remote_dir, *entry['path'].split('/'))
+        for offset in range(0, entry['size'], chunk_size):
+            ranges.append((remote_path, staged_path, offset, min(chunk_size, entry['size'] - offset)))
+
+    def fetch(task):
+        remote_path, staged_path, offset, length = task
+        with backend.open_file(remote_path, mode='rb') as src, open(staged_path, 'r+b') as dst:
+            src.seek(offset)
+            dst.seek(offset)
+            remaining = length
+            while remaining:
+                block = src.read(min(remaining, READ_BLOCK_SIZE))
+                if not block:
+                    raise ValueError(f"文件下载不完整: {remote_path}")
+                dst.write(block)
+                remaining -= len(block)
+        return length
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        transferred = sum(executor.map(fetch, ranges))
+
+    for entry in entries:
+        staged_path = os.path.join(staging_dir, *entry['path'].split('/'))
+        if os.path.getsize(staged_path) != entry['size'] or file_sha256(staged_path) != entry['sha256']:
+            raise ValueError(f"文件校验失败: {entry['path']}")
+    return transferred
+
+
+def apply_update(entries, staging_dir, software_dir):
+    """
+    将暂存文件夹中已校验的文件替换到安装位置。被替换的旧文件先移入备份文件夹，
+    任一文件替换失败时全部回滚，不会留下新旧混合的安装。
+
+    :param entries: 已下载的清单条目列表。
+    :param staging_dir: 本地暂存文件夹，需与软件目录位于同一磁盘。
+    :param software_dir: 当前软件的目录。
+    :return: 替换后的本地文件路径列表。
+    """
+    backup_dir = os.path.join(staging_dir, '.backup')
+    applied = []
+    try:
+        for entry in entries:
+            staged_path = os.path.join(staging_dir, *entry['path'].split('/'))
+            target = local_target(software_dir, entry['path'])
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            backup = None
+            if os.path.exists(target):
+                backup = os.path.join(backup_dir, *entry['path'].split('/'))
+                os.makedirs(os.path.dirname(backup), exist_ok=True)
+                os.replace(target, backup)
+            applied.append((target, backup))
+            os.replace(staged_path, target)
+    except BaseException:
+        for target, backup in reversed(applied):
+            if backup is not None:
+                os.replace(backup, target)
+            elif os.path.exists(target):
+                os.remove(target)
+        raise
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    return [target for target, _ in applied]
+
+
+def delta_update(backend, remote_dir, software_dir, workers=4, chunk_size=8 << 20):
+    """
+    按服务器上的更新清单增量更新软件：只下载有变化的文件，并行下载、校验哈希后整体替换。
+
+    :param backend: 共享目录访问后端。
+    :param remote_dir: 服务器上的软件文件夹。
+    :param software_dir: 当前软件的目录。
+    :param workers: 并行下载线程数，默认为 4。
+    :param chunk_size: 下载区间大小（字节），默认为 8 MB。
+    :return: 更新统计字典 {'files', 'changed', 'bytes', 'targets'}，服务器未提供清单时返回 None。
+    """
+    manifest = load_remote_manifest(backend, remote_dir)
+    if manifest is None:
+        return None
+
+    entries = plan_update(manifest, software_dir)
+    staging_dir = os.path.join(software_dir, STAGING_DIRNAME)
+    shutil.rmtree(staging_dir, ignore_errors=True)  # 清除上次中断留下的暂存文件
+    try:
+        transferred = download_files(backend, remote_dir, entries, staging_dir, workers, chunk_size)
+        targets = apply_update(entries, staging_dir, software_dir)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    return {'files': len(manifest['files']), 'changed': len(entries), 'bytes': transferred, 'targets': targets}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="生成软件文件夹的更新清单（发布新版本时在服务器上运行）")
+    parser.add_argument('software_dir', help="软件文件夹")
+    args = parser.parse_args()
+    result = write_manifest(args.software_dir)
+    print(f"已写入 {MANIFEST_FILENAME}: 版本 {result['version']}, {len(result['files'])} 个文件")
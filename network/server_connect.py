@@ -4,20 +4,226 @@ Project Name: format_conversion
 File Created: 2024.11.14
 Author: ZhangYuetao
 File Name: server_connect.py
-Update: 2025.06.24
+Update: 2026.10.18
 """
 
 import os
+import shutil
 import subprocess
 import sys
+import threading
 import time
-import shutil
 
-import smbclient
 import toml
 
 from utils import is_file_complete
 import config
+from network import delta_update
+
+
+class SmbShareBackend:
+    """
+    基于 smbclient 的服务器共享目录访问后端。
+    """
+
+    def __init__(self):
+        import smbclient  # 在此导入，使用本地目录后端时不依赖 smbclient
+
+        self.smbclient = smbclient
+
+    def connect(self, server_ip, share_name, username, password, timeout):
+        """
+        注册会话。
+
+        :param server_ip: 服务器 IP。
+        :param share_name: 共享名称。
+        :param username: 用户名。
+        :param password: 密码。
+        :param timeout: 连接超时秒数。
+        :return: 共享根路径。
+        """
+        self.smbclient.register_session(server_ip, username=username, password=password,
+                                        connection_timeout=timeout)
+        return f"\\\\{server_ip}\\{share_name}"
+
+    def listdir(self, path):
+        """
+        列出共享目录中的文件名。
+        """
+        return self.smbclient.listdir(path)
+
+    def walk(self, path):
+        """
+        遍历共享目录，返回值与 os.walk 相同。
+        """
+        return self.smbclient.walk(path)
+
+    def open_file(self, path, mode='r', **kwargs):
+        """
+        打开共享目录中的文件，参数与 open 相同。
+        """
+        return self.smbclient.open_file(path, mode=mode, **kwargs)
+
+    def makedirs(self, path):
+        """
+        创建共享目录中的文件夹，已存在时忽略。
+        """
+        self.smbclient.makedirs(path, exist_ok=True)
+
+    def copy_file(self, src, dst):
+        """
+        将共享目录中的文件复制到本地。
+        """
+        shutil.copy2(src, dst)
+
+
+class LocalShareBackend:
+    """
+    以本地文件夹代替服务器共享目录的访问后端，用于测试与离线环境，接口与 SmbShareBackend 相同。
+
+    Attributes:
+        root (str): 代替共享根路径的本地文件夹。
+        connect_count (int): 注册会话的次数。
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.connect_count = 0
+
+    def connect(self, server_ip, share_name, username, password, timeout):
+        self.connect_count += 1
+        return self.root
+
+    def listdir(self, path):
+        return os.listdir(path)
+
+    def walk(self, path):
+        return os.walk(path)
+
+    def open_file(self, path, mode='r', **kwargs):
+        return open(path, mode, **kwargs)
+
+    def makedirs(self, path):
+        os.makedirs(path, exist_ok=True)
+
+    def copy_file(self, src, dst):
+        shutil.copy2(src, dst)
+
+
+class ShareConnection:
+    """
+    服务器共享目录连接管理类。整个进程复用同一个会话，凭证只读取一次，
+    软件文件夹的查找结果在有效期内缓存，一次手动更新只需注册一次会话并列出一次共享目录。
+
+    访问出错时调用 reset 清除会话与查找缓存，下次调用时重新连接。
+    锁只保护会话与缓存状态，连接与列目录等网络操作在锁外进行，后台版本检查卡在网络调用上时不会阻塞界面线程的操作。
+
+    Attributes:
+        backend: 共享目录访问后端，None 表示首次连接时创建 SmbShareBackend。
+        credentials (tuple): (服务器IP, 共享名称, 用户名, 密码)，None 表示首次连接时从配置文件读取。
+        lookup_ttl (float): 软件文件夹查找结果的缓存有效秒数。
+        timeout (float): 默认的连接超时秒数。
+        share_path (str): 已连接时的共享根路径，未连接时为 None。
+    """
+
+    def __init__(self, backend=None, credentials=None, lookup_ttl=300, timeout=60):
+        """
+        初始化连接管理对象，不立即连接。
+
+        :param backend: 共享目录访问后端，默认为 None（SmbShareBackend）。
+        :param credentials: 连接凭证元组，默认为 None（读取 .secret.toml）。
+        :param lookup_ttl: 软件文件夹查找结果的缓存有效秒数，默认为 300。
+        :param timeout: 默认的连接超时秒数，默认为 60。
+        """
+        self.backend = backend
+        self.credentials = credentials
+        self.lookup_ttl = lookup_ttl
+        self.timeout = timeout
+        self.share_path = None
+        self._software_dirs = {}
+        self._lock = threading.Lock()  # 后台版本检查与界面操作可能同时访问
+
+    def connect(self, timeout=None):
+        """
+        连接服务器，已连接时直接返回。
+
+        :param timeout: 连接超时秒数，默认为 None（使用 self.timeout）。
+        :return: 共享根路径。
+        """
+        with self._lock:
+            if self.share_path is not None:
+                return self.share_path
+            if self.backend is None:
+                self.backend = SmbShareBackend()
+            if self.credentials is None:
+                self.credentials = config.load_credentials()
+            backend, credentials = self.backend, self.credentials
+
+        # 两个线程同时首次连接时各自注册一次会话，后端复用同一服务器的会话，结果相同
+        server_ip, share_name, username, password = credentials
+        share_path = backend.connect(server_ip, share_name, username, password, timeout or self.timeout)
+        with self._lock:
+            if self.share_path is None:
+                self.share_path = share_path
+            return self.share_path
+
+    def reset(self):
+        """
+        清除会话与查找缓存，下次调用时重新连接。
+        """
+        with self._lock:
+            self.share_path = None
+            self._software_dirs.clear()
+
+    def software_dir(self, software_name, timeout=None):
+        """
+        查找服务器上指定软件的文件夹，查找结果在 lookup_ttl 内缓存。
+
+        :param software_name: 软件的名称。
+        :param timeout: 连接超时秒数，默认为 None（使用 self.timeout）。
+        :return: 软件文件夹路径，未找到时返回 None。
+        """
+        with self._lock:
+            cached = self._software_dirs.get(software_name)
+            if cached is not None and time.monotonic() - cached[1] < self.lookup_ttl:
+                return cached[0]
+
+        file_dir = os.path.join(self.connect(timeout), config.SHARE_DIR)
+        found = None
+        for dir_name in self.backend.listdir(file_dir):
+            if software_name in dir_name and 'linux' not in dir_name:
+                found = os.path.join(file_dir, dir_name)
+                break
+        if found is not None:
+            with self._lock:
+                self._software_dirs[software_name] = (found, time.monotonic())
+        return found
+
+
+_connection = None
+
+
+def get_connection():
+    """
+    获取进程内共享的服务器连接对象。
+
+    :return: ShareConnection 对象。
+    """
+    global _connection
+    if _connection is None:
+        update_config = config.load_config(config.UPDATE_SETTING_FILE, config.UPDATE_SETTING_DEFAULT_CONFIG)
+        _connection = ShareConnection(lookup_ttl=update_config['share_lookup_ttl'])
+    return _connection
+
+
+def set_connection(connection):
+    """
+    替换进程内共享的服务器连接对象，如使用 LocalShareBackend 测试。
+
+    :param connection: ShareConnection 对象，None 表示恢复默认。
+    """
+    global _connection
+    _connection = connection
 
 
 def get_current_software_version(current_software_path):
@@ -52,72 +258,44 @@ def get_update_log(software_name):
     :return: 更新日志的内容。
     :raises ValueError: 如果读取文件出错。
     """
-    # 从 .secret.toml 中加载配置信息
-    server_ip, share_name, username, password = config.load_credentials()
-
-    # 注册会话
-    smbclient.register_session(server_ip, username=username, password=password)
-
-    # 构建共享路径
-    share_path = f"\\\\{server_ip}\\{share_name}"
-
-    file_dir = os.path.join(share_path, config.SHARE_DIR)
+    connection = get_connection()
 
     # 读取文件内容
     try:
-        txt_path = None
-        files = smbclient.listdir(file_dir)
-        for dir_name in files:
-            if software_name in dir_name and 'linux' not in dir_name:
-                software_dir = os.path.join(file_dir, dir_name)
-                txt_path = os.path.join(software_dir, 'update_log.txt')
-                break
-
-        if not txt_path:
+        software_dir = connection.software_dir(software_name)
+        if not software_dir:
             raise FileNotFoundError("未找到txt对应文件")
 
-        with smbclient.open_file(txt_path, mode='r', encoding='utf-8') as file:
+        txt_path = os.path.join(software_dir, 'update_log.txt')
+        with connection.backend.open_file(txt_path, mode='r', encoding='utf-8') as file:
             txt_content = file.read()
 
         return txt_content
 
     except Exception as e:
+        connection.reset()
         raise ValueError(f"读取文件出错: {e}")
 
 
-def get_new_software_version(software_name):
+def get_new_software_version(software_name, timeout=60):
     """
     从服务器获取指定软件的最新版本号。
 
     :param software_name: 软件的名称。
+    :param timeout: 连接服务器的超时秒数，默认为 60（与 smbclient 默认值一致）。
     :return: 最新版本号。
     :raises ValueError: 如果读取文件出错。
     """
-    # 从 .secret.toml 中加载配置信息
-    server_ip, share_name, username, password = config.load_credentials()
-
-    # 注册会话
-    smbclient.register_session(server_ip, username=username, password=password)
-
-    # 构建共享路径
-    share_path = f"\\\\{server_ip}\\{share_name}"
-
-    file_dir = os.path.join(share_path, config.SHARE_DIR)
+    connection = get_connection()
 
     # 读取文件内容
     try:
-        toml_path = None
-        files = smbclient.listdir(file_dir)
-        for dir_name in files:
-            if software_name in dir_name and 'linux' not in dir_name:
-                software_dir = os.path.join(file_dir, dir_name)
-                toml_path = os.path.join(software_dir, config.SOFTWARE_INFOS_FILE)
-                break
-
-        if not toml_path:
+        software_dir = connection.software_dir(software_name, timeout)
+        if not software_dir:
             raise FileNotFoundError("未找到对应文件")
 
-        with smbclient.open_file(toml_path, mode='r', encoding='utf-8') as file:
+        toml_path = os.path.join(software_dir, config.SOFTWARE_INFOS_FILE)
+        with connection.backend.open_file(toml_path, mode='r', encoding='utf-8') as file:
             toml_content = file.read()
 
         # 解析 TOML 文件
@@ -127,74 +305,112 @@ def get_new_software_version(software_name):
         version = toml_data.get("version", "未找到 version 信息")
         return version
     except Exception as e:
+        connection.reset()
         raise ValueError(f"读取文件出错: {e}")
 
 
-def update_software(software_dir, software_name):
+def copy_software(connection, update_software_dir, software_dir):
     """
-    从服务器更新指定软件。
+    完整复制服务器上的软件文件夹，服务器未提供更新清单时使用。
 
+    :param connection: ShareConnection 对象。
+    :param update_software_dir: 服务器上的软件文件夹。
     :param software_dir: 当前软件的目录。
-    :param software_name: 软件的名称。
-    :raises ValueError: 如果更新过程中出错。
+    :return: 新版本可执行文件的本地路径，没有可执行文件时返回 None。
     """
-    server_ip, share_name, username, password = config.load_credentials()
+    new_software_path = None
+
+    for root, _, files in connection.backend.walk(update_software_dir):
+        files = [f for f in files if not f.startswith('.')]  # 排除隐藏文件
+        for file in files:
+            if file.endswith('.exe'):
+                new_software_path = os.path.join(root, file)
+                temp_dir = os.path.join(software_dir, 'temp')
+                os.makedirs(temp_dir, exist_ok=True)
+                connection.backend.copy_file(new_software_path, temp_dir)
+                new_software_path = os.path.join(temp_dir, file)
+            else:
+                src_file = os.path.join(root, file)
+                dst_file = os.path.join(software_dir, os.path.relpath(src_file, update_software_dir))
+                os.makedirs(os.path.dirname(dst_file), exist_ok=True)
+                connection.backend.copy_file(src_file, dst_file)
+
+    return new_software_path
 
-    # 注册会话
-    smbclient.register_session(server_ip, username=username, password=password)
 
-    # 构建共享路径
-    share_path = f"\\\\{server_ip}\\{share_name}"
+def update_software(software_dir, software_name):
+    """
+    从服务器更新指定软件。服务器软件文件夹中有更新清单时只下载有变化的文件并校验哈希，
+    否则完整复制整个文件夹。
 
-    file_dir = os.path.join(share_path, config.SHARE_DIR)
+    :param software_dir: 当前软件的目录。
+    :param software_name: 软件的名称。
+    :raises ValueError: 如果更新过程中出错。
+    """
+    connection = get_connection()
+    update_config = config.load_config(config.UPDATE_SETTING_FILE, config.UPDATE_SETTING_DEFAULT_CONFIG)
 
     # 读取文件内容
     try:
-        files = smbclient.listdir(file_dir)
-        update_software_dir = None
-        for dir_name in files:
-            if software_name in dir_name and 'linux' not in dir_name:
-                update_software_dir = os.path.join(file_dir, dir_name)
-                break
-
+        update_software_dir = connection.software_dir(software_name)
         if not update_software_dir:
             raise FileNotFoundError("未找到对应软件")
 
-        new_software_path = None
-
-        for root, _, files in smbclient.walk(update_software_dir):
-            files = [f for f in files if not f.startswith('.')]  # 排除隐藏文件
-            for file in files:
-                if file.endswith('.exe'):
-                    new_software_path = os.path.join(root, file)
-                    temp_dir = os.path.join(software_dir, 'temp')
-                    os.makedirs(temp_dir, exist_ok=True)
-                    shutil.copy2(new_software_path, temp_dir)
-                    new_software_path = os.path.join(temp_dir, file)
-                else:
-                    src_file = os.path.join(root, file)
-                    dst_file = os.path.join(software_dir, os.path.relpath(src_file, update_software_dir))
-                    os.makedirs(os.path.dirname(dst_file), exist_ok=True)
-                    shutil.copy2(src_file, dst_file)
-
-        if new_software_path and is_file_complete(new_software_path):
+        stats = delta_update.delta_update(connection.backend, update_software_dir, software_dir,
+                                          workers=update_config['download_workers'],
+                                          chunk_size=int(update_config['download_chunk_mb'] * (1 << 20)))
+        if stats is None:
+            new_software_path = copy_software(connection, update_software_dir, software_dir)
+            is_complete = new_software_path is not None and is_file_complete(new_software_path)
+        else:
+            # 增量更新的文件已校验哈希，无需再等待文件大小稳定
+            new_software_path = next((path for path in stats['targets'] if path.endswith('.exe')), None)
+            is_complete = new_software_path is not None
+
+        if is_complete:
             subprocess.Popen(new_software_path)
             time.sleep(1)
             sys.exit("程序已退出")
 
     except Exception as e:
+        connection.reset()
         raise ValueError(f"读取文件出错: {e}")
 
 
-def check_version(current_version):
+def get_cached_software_version(software_name, cache_ttl=0, timeout=60):
+    """
+    获取指定软件的最新版本号，缓存有效期内直接返回本地缓存，不访问服务器。
+
+    :param software_name: 软件的名称。
+    :param cache_ttl: 缓存有效秒数，0 表示不使用缓存，默认为 0。
+    :param timeout: 连接服务器的超时秒数，默认为 60。
+    :return: 最新版本号。
+    :raises ValueError: 如果读取文件出错。
+    """
+    if cache_ttl > 0:
+        cache = config.load_config(config.UPDATE_CACHE_FILE, config.UPDATE_CACHE_DEFAULT_CONFIG)
+        if cache['server_version'] and 0 <= time.time() - cache['checked_at'] < cache_ttl:
+            return cache['server_version']
+
+    version = get_new_software_version(software_name, timeout)
+    try:
+        config.save_config(config.UPDATE_CACHE_FILE, {'server_version': version, 'checked_at': time.time()})
+    except OSError:
+        pass  # 缓存写入失败不影响版本检查
+    return version
+
+
+def check_version(current_version, cache_ttl=0, timeout=60):
     """
     检查当前版本是否与服务器上的最新版本一致。
 
     :param current_version: 当前软件的版本号。
+    :param cache_ttl: 服务器版本号缓存有效秒数，0 表示每次都访问服务器，默认为 0。
+    :param timeout: 连接服务器的超时秒数，默认为 60。
     :return: 1 表示有新版本，0 表示版本一致，-1 表示无法获取最新版本。
     """
     try:
-        new_version = get_new_software_version(config.SOFTWARE_NAME)
+        new_version = get_cached_software_version(config.SOFTWARE_NAME, cache_ttl, timeout)
     except:
         new_version = '未知'
 
@@ -215,29 +431,21 @@ def submit_problem_feedback(feedback_words, problem_type):
     :param problem_type: 问题类型。
     :raises ValueError: 如果写入文件出错。
     """
-    # 从 .secret.toml 中加载配置信息
-    server_ip, share_name, username, password = config.load_credentials()
-
-    # 注册会话
-    smbclient.register_session(server_ip, username=username, password=password)
+    connection = get_connection()
 
-    # 构建共享路径
-    share_path = f"\\\\{server_ip}\\{share_name}"
-
-    problem_share_dir = config.PROBLEM_SHARE_DIR
-    file_dir = os.path.join(share_path, problem_share_dir)
+    try:
+        file_dir = os.path.join(connection.connect(), config.PROBLEM_SHARE_DIR)
 
-    # 确保目录存在
-    os.makedirs(file_dir, exist_ok=True)
+        # 确保目录存在
+        connection.backend.makedirs(file_dir)
 
-    # 读取文件内容
-    try:
         current_time = time.strftime("%Y-%m-%d_%H-%M-%S")
 
         file_path = os.path.join(file_dir, f"{problem_type}_{current_time}.txt")
 
-        with smbclient.open_file(file_path, mode='w') as file:
+        with connection.backend.open_file(file_path, mode='w') as file:
             file.write(feedback_words)
 
     except Exception as e:
+        connection.reset()
         raise ValueError(f"写入文件出错: {e}")
@@ -4,7 +4,7 @@ Project Name: format_conversion
 File Created: 2025.06.24
 Author: ZhangYuetao
 File Name: software_update.py
-Update: 2025.06.24
+Update: 2026.10.18
 """
 
 import os
@@ -17,6 +17,7 @@ from PyQt5.QtWidgets import QMessageBox
 
 import config
 from network import server_connect
+from threads.update_thread import VersionCheckThread
 
 
 class Updater:
@@ -26,10 +27,12 @@ class Updater:
         Attributes:
             current_software_path (str): 当前软件的可执行文件路径。
             current_software_version (str): 当前软件的版本号。
+            check_thread (VersionCheckThread): 正在进行的后台版本检查线程。
         """
     def __init__(self, current_software_path, current_software_version):
         self.current_software_path = current_software_path
         self.current_software_version = current_software_version
+        self.check_thread = None
 
     def init_update(self):
         """
@@ -72,25 +75,50 @@ class Updater:
 
     def auto_update(self):
         """
-        自动检查并更新软件。
+        在后台自动检查更新，发现新版本时询问是否更新。服务器版本号缓存有效期内不访问服务器。
         """
         dir_path = os.path.dirname(self.current_software_path)
         dir_name = os.path.basename(dir_path)
         if dir_name != 'temp':
-            if server_connect.check_version(self.current_software_version) == 1:
-                self.update_software()
+            update_config = config.load_config(config.UPDATE_SETTING_FILE, config.UPDATE_SETTING_DEFAULT_CONFIG)
+            self.start_check(update_config['version_cache_ttl'], manual=False)
 
     def update_software(self):
         """
-        更新软件到最新版本。
+        手动检查并更新软件到最新版本，始终访问服务器获取最新版本号。
+        """
+        self.start_check(0, manual=True)
+
+    def start_check(self, cache_ttl, manual):
+        """
+        启动后台版本检查线程，检查结果由 handle_check_result 处理。
+
+        :param cache_ttl: 服务器版本号缓存有效秒数，0 表示不使用缓存。
+        :param manual: 是否为手动检查，手动检查时提示网络未连接与已为最新版本。
+        """
+        if self.check_thread is not None and self.check_thread.isRunning():
+            return
+        update_config = config.load_config(config.UPDATE_SETTING_FILE, config.UPDATE_SETTING_DEFAULT_CONFIG)
+        self.check_thread = VersionCheckThread(self.current_software_version, cache_ttl,
+                                               float(update_config['check_timeout']))
+        self.check_thread.result_signal.connect(lambda update_way: self.handle_check_result(update_way, manual))
+        self.check_thread.start()
+
+    def handle_check_result(self, update_way, manual):
+        """
+        处理版本检查结果。
+
+        :param update_way: 1 表示有新版本，0 表示版本一致，-1 表示无法获取最新版本。
+        :param manual: 是否为手动检查。
         """
-        update_way = server_connect.check_version(self.current_software_version)
         if update_way == -1:
-            # 网络未连接，弹出提示框
-            QMessageBox.warning(None, '更新提示', '网络未连接，暂时无法更新')
+            if manual:
+                # 网络未连接，弹出提示框
+                QMessageBox.warning(None, '更新提示', '网络未连接，暂时无法更新')
         elif update_way == 0:
-            # 当前已为最新版本，弹出提示框
-            QMessageBox.information(None, '更新提示', '当前已为最新版本')
+            if manual:
+                # 当前已为最新版本，弹出提示框
+                QMessageBox.information(None, '更新提示', '当前已为最新版本')
         else:
             # 弹出提示框，询问是否立即更新
             msg_box = QMessageBox()  # 创建一个新的 QMessageBox 对象
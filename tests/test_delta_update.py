@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: test_delta_update.py
+Update: 2026.10.18
+"""
+
+import hashlib
+import os
+
+import pytest
+
+from network.delta_update import apply_update, build_manifest, delta_update, download_files, write_manifest
+from network.server_connect import LocalShareBackend
+
+FILE_SIZE = 64 << 10
+CHUNK_SIZE = 16 << 10
+
+
+class CountingFile:
+    """
+    统计读取字节数的文件包装类。
+    """
+
+    def __init__(self, file, backend):
+        self.file = file
+        self.backend = backend
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.file.close()
+
+    def seek(self, offset):
+        return self.file.seek(offset)
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        self.backend.bytes_read += len(data)
+        return data
+
+
+class CountingBackend(LocalShareBackend):
+    """
+    以本地文件夹代替服务器共享目录，并统计以二进制方式从“服务器”读取的字节数（不含更新清单）。
+    """
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.bytes_read = 0
+
+    def open_file(self, path, mode='r', **kwargs):
+        file = super().open_file(path, mode, **kwargs)
+        return CountingFile(file, self) if 'b' in mode else file
+
+
+def write_file(path, data):
+    """
+    写入文件，自动创建所在文件夹。
+
+    :param path: 文件路径。
+    :param data: 文件内容。
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+@pytest.fixture
+def release(tmp_path):
+    """
+    模拟的服务器软件文件夹（含更新清单）与空的本地软件目录。
+
+    :return: (服务器软件文件夹, 本地软件目录, 全部文件的字节数)。
+    """
+    remote_dir = tmp_path / 'share' / '格式转换软件'
+    local_dir = tmp_path / 'app'
+    local_dir.mkdir(parents=True)
+    write_file(str(remote_dir / 'settings' / 'software_infos.toml'), b'version = "V1.6"\n')
+    for i in range(4):
+        write_file(str(remote_dir / 'lib' / f'module_{i}.pyd'), os.urandom(FILE_SIZE))
+    write_manifest(str(remote_dir))
+    total = sum(entry['size'] for entry in build_manifest(str(remote_dir))['files'])
+    return str(remote_dir), str(local_dir), total
+
+
+def run_update(remote_dir, local_dir):
+    """
+    执行一次增量更新。
+
+    :return: (更新统计字典, 从服务器读取的字节数)。
+    """
+    backend = CountingBackend(os.path.dirname(remote_dir))
+    stats = delta_update(backend, remote_dir, local_dir, workers=4, chunk_size=CHUNK_SIZE)
+    return stats, backend.bytes_read
+
+
+def test_full_update_transfers_every_file(release):
+    remote_dir, local_dir, total = release
+    stats, bytes_read = run_update(remote_dir, local_dir)
+    assert stats['changed'] == stats['files'] == 5
+    assert stats['bytes'] == bytes_read == total
+    for name in ('module_0.pyd', 'module_3.pyd'):
+        with open(os.path.join(remote_dir, 'lib', name), 'rb') as src, \
+                open(os.path.join(local_dir, 'lib', name), 'rb') as dst:
+            assert src.read() == dst.read()
+
+
+def test_unchanged_update_transfers_nothing(release):
+    remote_dir, local_dir, _ = release
+    run_update(remote_dir, local_dir)
+    stats, bytes_read = run_update(remote_dir, local_dir)
+    assert stats['changed'] == 0
+    assert stats['bytes'] == bytes_read == 0
+
+
+def test_one_changed_file_transfers_only_that_file(release):
+    remote_dir, local_dir, _ = release
+    run_update(remote_dir, local_dir)
+    with open(os.path.join(remote_dir, 'lib', 'module_2.pyd'), 'r+b') as f:
+        f.write(os.urandom(4096))
+    write_manifest(remote_dir)
+
+    stats, bytes_read = run_update(remote_dir, local_dir)
+    assert stats['changed'] == 1
+    assert stats['bytes'] == bytes_read == FILE_SIZE
+    assert stats['targets'] == [os.path.join(local_dir, 'lib', 'module_2.pyd')]
+    assert not os.path.exists(os.path.join(local_dir, '.update_staging'))
+
+
+def test_download_files_rejects_hash_mismatch(release, tmp_path):
+    remote_dir, _, _ = release
+    entry = {'path': 'lib/module_1.pyd', 'size': FILE_SIZE, 'sha256': hashlib.sha256(b'other').hexdigest()}
+    with pytest.raises(ValueError, match='校验失败'):
+        download_files(CountingBackend(os.path.dirname(remote_dir)), remote_dir, [entry], str(tmp_path / 'staging'),
+                       chunk_size=CHUNK_SIZE)
+
+
+def test_apply_update_rolls_back_on_failure(tmp_path):
+    software_dir = tmp_path / 'app'
+    staging_dir = tmp_path / 'app' / '.update_staging'
+    write_file(str(software_dir / 'a.txt'), b'old a')
+    write_file(str(staging_dir / 'a.txt'), b'new a')
+    write_file(str(staging_dir / 'b.txt'), b'new b')
+    # c.txt 没有暂存文件，替换到它时失败
+    entries = [{'path': name, 'size': 0, 'sha256': ''} for name in ('a.txt', 'b.txt', 'c.txt')]
+
+    with pytest.raises(OSError):
+        apply_update(entries, str(staging_dir), str(software_dir))
+    assert (software_dir / 'a.txt').read_bytes() == b'old a'
+    assert not (software_dir / 'b.txt').exists()
+    assert not (software_dir / 'c.txt').exists()
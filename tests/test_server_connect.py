@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: test_server_connect.py
+Update: 2026.10.18
+"""
+
+import os
+import time
+
+import pytest
+
+import config
+from network import server_connect
+from network.server_connect import LocalShareBackend, ShareConnection
+
+CREDENTIALS = ('127.0.0.1', 'share', 'user', 'password')
+
+
+class CountingBackend(LocalShareBackend):
+    """
+    统计列目录次数的本地共享目录后端，fail_opens 次打开文件失败，模拟网络中断。
+    """
+
+    def __init__(self, root, fail_opens=0):
+        super().__init__(root)
+        self.listdir_count = 0
+        self.fail_opens = fail_opens
+
+    def listdir(self, path):
+        self.listdir_count += 1
+        return super().listdir(path)
+
+    def open_file(self, path, mode='r', **kwargs):
+        if self.fail_opens:
+            self.fail_opens -= 1
+            raise OSError("连接已断开")
+        return super().open_file(path, mode, **kwargs)
+
+
+@pytest.fixture
+def share(tmp_path):
+    """
+    模拟的服务器共享根目录，其中有当前软件与其 linux 版本的文件夹。
+
+    :return: 共享根目录路径。
+    """
+    root = tmp_path / 'share'
+    for name in (f'{config.SOFTWARE_NAME}_linux', config.SOFTWARE_NAME):
+        infos_path = root / config.SHARE_DIR / name / config.SOFTWARE_INFOS_FILE
+        infos_path.parent.mkdir(parents=True)
+        infos_path.write_text('version = "V2.0"\n', encoding='utf-8')
+    return str(root)
+
+
+@pytest.fixture
+def connection(share):
+    """
+    使用本地共享目录的进程内连接对象，测试结束后恢复默认连接。
+    """
+    connection = ShareConnection(CountingBackend(share), CREDENTIALS)
+    server_connect.set_connection(connection)
+    yield connection
+    server_connect.set_connection(None)
+
+
+def test_credentials_loaded_once_and_session_reused(share, monkeypatch):
+    loads = []
+    monkeypatch.setattr(config, 'load_credentials', lambda: loads.append(1) or CREDENTIALS)
+    connection = ShareConnection(CountingBackend(share))
+
+    assert connection.connect() == share
+    assert connection.connect() == share
+    connection.software_dir(config.SOFTWARE_NAME)
+    assert len(loads) == 1
+    assert connection.backend.connect_count == 1
+
+
+def test_software_dir_skips_linux_build(connection, share):
+    found = connection.software_dir(config.SOFTWARE_NAME)
+    assert found == os.path.join(share, config.SHARE_DIR, config.SOFTWARE_NAME)
+
+
+def test_software_dir_cached_until_ttl_expires(connection):
+    connection.lookup_ttl = 0.2
+    first = connection.software_dir(config.SOFTWARE_NAME)
+    assert connection.software_dir(config.SOFTWARE_NAME) == first
+    assert connection.backend.listdir_count == 1
+
+    time.sleep(0.3)
+    assert connection.software_dir(config.SOFTWARE_NAME) == first
+    assert connection.backend.listdir_count == 2
+
+
+def test_reset_after_failure_reconnects(connection):
+    connection.backend.fail_opens = 1
+    with pytest.raises(ValueError):
+        server_connect.get_new_software_version(config.SOFTWARE_NAME)
+    assert connection.share_path is None
+
+    assert server_connect.get_new_software_version(config.SOFTWARE_NAME) == 'V2.0'
+    assert connection.backend.connect_count == 2
+    assert connection.backend.listdir_count == 2  # 出错后查找缓存被清除，重新列目录
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Project Name: format_conversion
+File Created: 2026.10.18
+Author: ZhangYuetao
+File Name: update_thread.py
+Update: 2026.10.18
+"""
+
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from network import server_connect
+
+
+class VersionCheckThread(QThread):
+    """
+    版本检查线程类，在后台检查服务器上是否有新版本，避免网络缓慢或不可达时阻塞主界面。
+
+    Signals:
+        result_signal (pyqtSignal): 检查完成的信号，参数为 check_version 的返回值
+            （1 表示有新版本，0 表示版本一致，-1 表示无法获取或超时）。
+    """
+
+    result_signal = pyqtSignal(int)
+
+    def __init__(self, current_version, cache_ttl=0, timeout=5.0):
+        """
+        初始化版本检查线程。
+
+        :param current_version: 当前软件的版本号。
+        :param cache_ttl: 服务器版本号缓存有效秒数，0 表示每次都访问服务器，默认为 0。
+        :param timeout: 检查的总超时秒数，超时视为无法获取最新版本，默认为 5.0。
+        """
+        super().__init__()
+        self.current_version = current_version
+        self.cache_ttl = cache_ttl
+        self.timeout = timeout
+
+    def run(self):
+        """
+        线程执行的核心方法，检查版本并通过信号发送结果。
+        """
+        result = []
+        # smbclient 只能限制建立连接的时间，读取阶段仍可能阻塞，放在守护线程中执行并限制总等待时间，
+        # 保证本线程按时结束，关闭窗口时不会等待网络请求
+        checker = threading.Thread(
+            target=lambda: result.append(
+                server_connect.check_version(self.current_version, self.cache_ttl, self.timeout)),
+            daemon=True,
+        )
+        checker.start()
+        checker.join(self.timeout)
+        self.result_signal.emit(result[0] if result else -1)
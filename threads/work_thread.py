@@ -4,10 +4,11 @@ Project Name: format_conversion
 File Created: 2024.08.19
 Author: ZhangYuetao
 File Name: work_thread.py
-Update: 2025.06.25
+Update: 2026.10.18
 """
 
 import os
+import time
 
 from PyQt5.QtCore import QThread, pyqtSignal
 
@@ -21,20 +22,28 @@ class WorkingThread(QThread):
     Signals:
         update_signal(pyqtSignal): 用于更新主界面中的状态标签的信号。
         error_signal (pyqtSignal): 用于在发生错误时更新主界面中的错误标签的信号。
+        progress_signal (pyqtSignal): 用于更新主界面中的进度显示的信号，参数为 ProgressTracker 的进度快照字典，
+            发送频率受 ProgressTracker 的 min_interval 限制。
     """
 
     update_signal = pyqtSignal(str)
     error_signal = pyqtSignal(str)
+    progress_signal = pyqtSignal(dict)
 
-    def __init__(self, file_path, save_path, process_type, target_format, nums=None):
+    def __init__(self, file_path, save_path, process_type, target_format, nums=None, workers=None,
+                 gif_scale=None, gif_frame_step=None, incremental=None):
         """
         初始化工作线程。
 
         :param file_path: 待处理文件的路径。
         :param save_path: 保存处理结果的路径。
-        :param process_type: 处理类型，如 "convent_image"、"video_to_image" 等。
+        :param process_type: 处理类型，如 "convent_image"、"video_to_image" 等，"resume" 表示从检查点继续上次的批量任务。
         :param target_format: 目标格式，如 "jpeg"、"png" 等。
         :param nums: 视频转图像时的帧率参数，默认为 None。
+        :param workers: 批量转换的进程数，None 表示读取配置，0 表示自动，默认为 None。
+        :param gif_scale: 视频转 GIF 时的帧缩放比例，默认为 None（读取配置）。
+        :param gif_frame_step: 视频转 GIF 时的抽帧间隔，默认为 None（读取配置）。
+        :param incremental: 批量转换时是否跳过未变化的文件，默认为 None（读取配置）。
         """
         super().__init__()
         self.file_path = file_path
@@ -42,6 +51,57 @@ class WorkingThread(QThread):
         self.process_type = process_type
         self.target_format = target_format
         self.nums = nums
+        self.workers = workers
+        self.gif_scale = gif_scale
+        self.gif_frame_step = gif_frame_step
+        self.incremental = incremental
+        self.progress = core.ProgressTracker(self.progress_signal.emit)
+        self.cancel_token = core.CancelToken()
+
+    def cancel(self):
+        """
+        请求取消任务，转换在下一个检查点停止，已写出的文件均为完整文件。
+        """
+        self.cancel_token.cancel()
+
+    def pause(self):
+        """
+        暂停任务，转换在下一个检查点等待。
+        """
+        self.cancel_token.pause()
+
+    def resume(self):
+        """
+        继续暂停中的任务。
+        """
+        self.cancel_token.resume()
+
+    def run_single(self, func, *args, **kwargs):
+        """
+        转换单个文件，并发送与批量转换相同格式的进度事件。转换出错或被取消时同样发送 'end' 事件，异常继续向上抛出。
+
+        :param func: 单文件转换函数。
+        :param args: 单文件转换函数的位置参数，第一个为输入文件路径。
+        :param kwargs: 单文件转换函数的关键字参数。
+        """
+        start = time.perf_counter()
+        result = None
+        cancelled = False
+        try:
+            # 输入文件不存在或无法读取时 getsize 抛出异常，同样在 finally 中发送 'end' 事件
+            self.progress({'event': 'start', 'total': 1, 'skipped': 0, 'bytes_total': os.path.getsize(args[0])})
+            with core.use_token(self.cancel_token):
+                core.checkpoint()
+                result = func(*args, **kwargs)
+            self.progress({'event': 'file', 'input': args[0], 'output': result, 'ok': result is not None, 'done': 1,
+                           'total': 1, 'bytes_in': os.path.getsize(args[0]),
+                           'bytes_out': core.output_bytes(result)})
+        except core.ConversionCancelled:
+            cancelled = True
+            raise
+        finally:
+            self.progress({'event': 'end', 'done': int(not cancelled), 'failed': int(not cancelled and result is None),
+                           'skipped': 0, 'cancelled': cancelled, 'elapsed': time.perf_counter() - start})
 
     def run(self):
         """
@@ -49,31 +109,49 @@ class WorkingThread(QThread):
         """
         self.update_signal.emit("格式转换进行中")
         try:
-            if self.process_type == "convent_image":
+            if self.process_type == "resume":
+                # 从检查点继续上次的批量任务，save_path 为该任务的输出文件夹
+                core.resume_batch(self.save_path, self.error_signal, progress_callback=self.progress,
+                                  cancel_token=self.cancel_token)
+            elif self.process_type == "convent_image":
                 # 处理图像格式转换
                 if os.path.isdir(self.file_path):
-                    core.convert_images(self.file_path, self.save_path, self.target_format)
+                    core.convert_images(self.file_path, self.save_path, self.target_format, self.error_signal,
+                                        workers=self.workers, incremental=self.incremental,
+                                        progress_callback=self.progress, cancel_token=self.cancel_token)
                 else:
-                    core.convert_image(self.file_path, self.save_path, self.target_format)
+                    self.run_single(core.convert_image, self.file_path, self.save_path, self.target_format,
+                                    self.error_signal)
             elif self.process_type == "video_to_image":
                 # 处理视频转图像
                 if os.path.isdir(self.file_path):
-                    core.videos_to_images(self.file_path, self.save_path, self.nums, self.target_format, self.error_signal)
+                    core.videos_to_images(self.file_path, self.save_path, self.nums, self.target_format,
+                                          self.error_signal, workers=self.workers, gif_scale=self.gif_scale,
+                                          gif_frame_step=self.gif_frame_step, progress_callback=self.progress,
+                                          cancel_token=self.cancel_token)
                 else:
-                    core.video_to_images(self.file_path, self.save_path, self.nums, self.target_format, self.error_signal)
+                    self.run_single(core.video_to_images, self.file_path, self.save_path, self.nums, self.target_format,
+                                    self.error_signal, gif_scale=self.gif_scale, gif_frame_step=self.gif_frame_step)
             elif self.process_type == "bin_to_image":
                 # 处理二进制文件转图像
                 if os.path.isdir(self.file_path):
-                    core.bins_to_images(self.file_path, self.save_path, self.target_format, self.error_signal)
+                    core.bins_to_images(self.file_path, self.save_path, self.target_format, self.error_signal,
+                                        workers=self.workers, incremental=self.incremental,
+                                        progress_callback=self.progress, cancel_token=self.cancel_token)
                 else:
-                    core.bin_to_image(self.file_path, self.save_path, self.target_format, self.error_signal)
+                    self.run_single(core.bin_to_image, self.file_path, self.save_path, self.target_format,
+                                    self.error_signal)
             elif self.process_type == "image_to_bin":
                 # 处理图像转二进制文件
                 if os.path.isdir(self.file_path):
-                    core.images_to_bins(self.file_path, self.save_path, self.error_signal)
+                    core.images_to_bins(self.file_path, self.save_path, self.error_signal, workers=self.workers,
+                                        incremental=self.incremental, progress_callback=self.progress,
+                                        cancel_token=self.cancel_token)
                 else:
-                    core.image_to_bin(self.file_path, self.save_path, self.error_signal)
+                    self.run_single(core.image_to_bin, self.file_path, self.save_path, self.error_signal)
             self.update_signal.emit("格式转换完成")
+        except core.ConversionCancelled:
+            self.update_signal.emit("格式转换已取消")
         except Exception as e:
             # 捕获异常并发送错误信息
             self.update_signal.emit("格式转换中断")
@@ -14,7 +14,7 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 class Ui_Dialog(object):
     def setupUi(self, Dialog):
         Dialog.setObjectName("Dialog")
-        Dialog.resize(400, 300)
+        Dialog.resize(400, 420)
         self.verticalLayout = QtWidgets.QVBoxLayout(Dialog)
         self.verticalLayout.setObjectName("verticalLayout")
         self.horizontalLayout = QtWidgets.QHBoxLayout()
@@ -202,6 +202,98 @@ class Ui_Dialog(object):
         self.horizontalLayout_6.setStretch(2, 2)
         self.horizontalLayout_6.setStretch(3, 1)
         self.verticalLayout.addLayout(self.horizontalLayout_6)
+        self.horizontalLayout_7 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_7.setObjectName("horizontalLayout_7")
+        self.mmap_checkBox = QtWidgets.QCheckBox(Dialog)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.mmap_checkBox.sizePolicy().hasHeightForWidth())
+        self.mmap_checkBox.setSizePolicy(sizePolicy)
+        self.mmap_checkBox.setLayoutDirection(QtCore.Qt.RightToLeft)
+        self.mmap_checkBox.setObjectName("mmap_checkBox")
+        self.horizontalLayout_7.addWidget(self.mmap_checkBox)
+        spacerItem2 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_7.addItem(spacerItem2)
+        self.multi_frame_checkBox = QtWidgets.QCheckBox(Dialog)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.multi_frame_checkBox.sizePolicy().hasHeightForWidth())
+        self.multi_frame_checkBox.setSizePolicy(sizePolicy)
+        self.multi_frame_checkBox.setLayoutDirection(QtCore.Qt.RightToLeft)
+        self.multi_frame_checkBox.setObjectName("multi_frame_checkBox")
+        self.horizontalLayout_7.addWidget(self.multi_frame_checkBox)
+        spacerItem3 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_7.addItem(spacerItem3)
+        self.horizontalLayout_7.setStretch(0, 2)
+        self.horizontalLayout_7.setStretch(1, 1)
+        self.horizontalLayout_7.setStretch(2, 2)
+        self.horizontalLayout_7.setStretch(3, 1)
+        self.verticalLayout.addLayout(self.horizontalLayout_7)
+        self.horizontalLayout_8 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_8.setObjectName("horizontalLayout_8")
+        self.label_9 = QtWidgets.QLabel(Dialog)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.label_9.sizePolicy().hasHeightForWidth())
+        self.label_9.setSizePolicy(sizePolicy)
+        self.label_9.setObjectName("label_9")
+        self.horizontalLayout_8.addWidget(self.label_9)
+        self.frame_header_bytes_lineEdit = QtWidgets.QLineEdit(Dialog)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.frame_header_bytes_lineEdit.sizePolicy().hasHeightForWidth())
+        self.frame_header_bytes_lineEdit.setSizePolicy(sizePolicy)
+        self.frame_header_bytes_lineEdit.setObjectName("frame_header_bytes_lineEdit")
+        self.horizontalLayout_8.addWidget(self.frame_header_bytes_lineEdit)
+        self.label_10 = QtWidgets.QLabel(Dialog)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.label_10.sizePolicy().hasHeightForWidth())
+        self.label_10.setSizePolicy(sizePolicy)
+        self.label_10.setObjectName("label_10")
+        self.horizontalLayout_8.addWidget(self.label_10)
+        self.frame_footer_bytes_lineEdit = QtWidgets.QLineEdit(Dialog)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.frame_footer_bytes_lineEdit.sizePolicy().hasHeightForWidth())
+        self.frame_footer_bytes_lineEdit.setSizePolicy(sizePolicy)
+        self.frame_footer_bytes_lineEdit.setObjectName("frame_footer_bytes_lineEdit")
+        self.horizontalLayout_8.addWidget(self.frame_footer_bytes_lineEdit)
+        self.horizontalLayout_8.setStretch(0, 1)
+        self.horizontalLayout_8.setStretch(1, 2)
+        self.horizontalLayout_8.setStretch(2, 1)
+        self.horizontalLayout_8.setStretch(3, 2)
+        self.verticalLayout.addLayout(self.horizontalLayout_8)
+        self.horizontalLayout_9 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_9.setObjectName("horizontalLayout_9")
+        self.label_11 = QtWidgets.QLabel(Dialog)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.label_11.sizePolicy().hasHeightForWidth())
+        self.label_11.setSizePolicy(sizePolicy)
+        self.label_11.setObjectName("label_11")
+        self.horizontalLayout_9.addWidget(self.label_11)
+        self.header_bytes_lineEdit = QtWidgets.QLineEdit(Dialog)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.header_bytes_lineEdit.sizePolicy().hasHeightForWidth())
+        self.header_bytes_lineEdit.setSizePolicy(sizePolicy)
+        self.header_bytes_lineEdit.setObjectName("header_bytes_lineEdit")
+        self.horizontalLayout_9.addWidget(self.header_bytes_lineEdit)
+        spacerItem4 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_9.addItem(spacerItem4)
+        self.horizontalLayout_9.setStretch(0, 1)
+        self.horizontalLayout_9.setStretch(1, 2)
+        self.horizontalLayout_9.setStretch(2, 3)
+        self.verticalLayout.addLayout(self.horizontalLayout_9)
         self.horizontalLayout_3 = QtWidgets.QHBoxLayout()
         self.horizontalLayout_3.setObjectName("horizontalLayout_3")
         self.buttonBox = QtWidgets.QDialogButtonBox(Dialog)
@@ -228,6 +320,9 @@ class Ui_Dialog(object):
         self.verticalLayout.setStretch(3, 1)
         self.verticalLayout.setStretch(4, 1)
         self.verticalLayout.setStretch(5, 1)
+        self.verticalLayout.setStretch(6, 1)
+        self.verticalLayout.setStretch(7, 1)
+        self.verticalLayout.setStretch(8, 1)
 
         self.retranslateUi(Dialog)
         self.buttonBox.accepted.connect(Dialog.accept) # type: ignore
@@ -247,3 +342,8 @@ class Ui_Dialog(object):
         self.label_8.setText(_translate("Dialog", "旋转角度"))
         self.normalize_checkBox.setText(_translate("Dialog", "是否归一化"))
         self.flip_checkBox.setText(_translate("Dialog", "是否垂直翻转图像"))
+        self.mmap_checkBox.setText(_translate("Dialog", "内存映射读取"))
+        self.multi_frame_checkBox.setText(_translate("Dialog", "多帧bin文件"))
+        self.label_9.setText(_translate("Dialog", "帧头字节数"))
+        self.label_10.setText(_translate("Dialog", "帧尾字节数"))
+        self.label_11.setText(_translate("Dialog", "文件头字节数"))
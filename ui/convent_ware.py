@@ -14,7 +14,7 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
         MainWindow.setObjectName("MainWindow")
-        MainWindow.resize(501, 300)
+        MainWindow.resize(501, 340)
         self.centralwidget = QtWidgets.QWidget(MainWindow)
         self.centralwidget.setObjectName("centralwidget")
         self.verticalLayout = QtWidgets.QVBoxLayout(self.centralwidget)
@@ -135,6 +135,73 @@ class Ui_MainWindow(object):
         self.horizontalLayout_3.setStretch(1, 4)
         self.horizontalLayout_3.setStretch(2, 4)
         self.verticalLayout.addLayout(self.horizontalLayout_3)
+        self.horizontalLayout_6 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_6.setObjectName("horizontalLayout_6")
+        self.workers_label = QtWidgets.QLabel(self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.workers_label.sizePolicy().hasHeightForWidth())
+        self.workers_label.setSizePolicy(sizePolicy)
+        self.workers_label.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.workers_label.setObjectName("workers_label")
+        self.horizontalLayout_6.addWidget(self.workers_label)
+        self.workers_spinBox = QtWidgets.QSpinBox(self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.workers_spinBox.sizePolicy().hasHeightForWidth())
+        self.workers_spinBox.setSizePolicy(sizePolicy)
+        self.workers_spinBox.setMaximum(256)
+        self.workers_spinBox.setObjectName("workers_spinBox")
+        self.horizontalLayout_6.addWidget(self.workers_spinBox)
+        self.gif_scale_label = QtWidgets.QLabel(self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.gif_scale_label.sizePolicy().hasHeightForWidth())
+        self.gif_scale_label.setSizePolicy(sizePolicy)
+        self.gif_scale_label.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.gif_scale_label.setObjectName("gif_scale_label")
+        self.horizontalLayout_6.addWidget(self.gif_scale_label)
+        self.gif_scale_doubleSpinBox = QtWidgets.QDoubleSpinBox(self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.gif_scale_doubleSpinBox.sizePolicy().hasHeightForWidth())
+        self.gif_scale_doubleSpinBox.setSizePolicy(sizePolicy)
+        self.gif_scale_doubleSpinBox.setMinimum(0.05)
+        self.gif_scale_doubleSpinBox.setMaximum(1.0)
+        self.gif_scale_doubleSpinBox.setSingleStep(0.05)
+        self.gif_scale_doubleSpinBox.setProperty("value", 1.0)
+        self.gif_scale_doubleSpinBox.setObjectName("gif_scale_doubleSpinBox")
+        self.horizontalLayout_6.addWidget(self.gif_scale_doubleSpinBox)
+        self.gif_step_label = QtWidgets.QLabel(self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.gif_step_label.sizePolicy().hasHeightForWidth())
+        self.gif_step_label.setSizePolicy(sizePolicy)
+        self.gif_step_label.setAlignment(QtCore.Qt.AlignRight|QtCore.Qt.AlignTrailing|QtCore.Qt.AlignVCenter)
+        self.gif_step_label.setObjectName("gif_step_label")
+        self.horizontalLayout_6.addWidget(self.gif_step_label)
+        self.gif_step_spinBox = QtWidgets.QSpinBox(self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.gif_step_spinBox.sizePolicy().hasHeightForWidth())
+        self.gif_step_spinBox.setSizePolicy(sizePolicy)
+        self.gif_step_spinBox.setMinimum(1)
+        self.gif_step_spinBox.setMaximum(1000)
+        self.gif_step_spinBox.setObjectName("gif_step_spinBox")
+        self.horizontalLayout_6.addWidget(self.gif_step_spinBox)
+        self.horizontalLayout_6.setStretch(0, 3)
+        self.horizontalLayout_6.setStretch(1, 2)
+        self.horizontalLayout_6.setStretch(2, 2)
+        self.horizontalLayout_6.setStretch(3, 2)
+        self.horizontalLayout_6.setStretch(4, 2)
+        self.horizontalLayout_6.setStretch(5, 2)
+        self.verticalLayout.addLayout(self.horizontalLayout_6)
         self.horizontalLayout_4 = QtWidgets.QHBoxLayout()
         self.horizontalLayout_4.setObjectName("horizontalLayout_4")
         self.convent_image_checkBox = QtWidgets.QCheckBox(self.centralwidget)
@@ -196,6 +263,22 @@ class Ui_MainWindow(object):
         self.submit_button.setSizePolicy(sizePolicy)
         self.submit_button.setObjectName("submit_button")
         self.horizontalLayout_5.addWidget(self.submit_button)
+        self.pause_button = QtWidgets.QPushButton(self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.pause_button.sizePolicy().hasHeightForWidth())
+        self.pause_button.setSizePolicy(sizePolicy)
+        self.pause_button.setObjectName("pause_button")
+        self.horizontalLayout_5.addWidget(self.pause_button)
+        self.stop_button = QtWidgets.QPushButton(self.centralwidget)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.stop_button.sizePolicy().hasHeightForWidth())
+        self.stop_button.setSizePolicy(sizePolicy)
+        self.stop_button.setObjectName("stop_button")
+        self.horizontalLayout_5.addWidget(self.stop_button)
         self.error_label = QtWidgets.QLabel(self.centralwidget)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
         sizePolicy.setHorizontalStretch(0)
@@ -207,13 +290,16 @@ class Ui_MainWindow(object):
         self.error_label.setObjectName("error_label")
         self.horizontalLayout_5.addWidget(self.error_label)
         self.horizontalLayout_5.setStretch(0, 3)
-        self.horizontalLayout_5.setStretch(1, 7)
+        self.horizontalLayout_5.setStretch(1, 2)
+        self.horizontalLayout_5.setStretch(2, 2)
+        self.horizontalLayout_5.setStretch(3, 7)
         self.verticalLayout.addLayout(self.horizontalLayout_5)
         self.verticalLayout.setStretch(0, 1)
         self.verticalLayout.setStretch(1, 1)
         self.verticalLayout.setStretch(2, 1)
         self.verticalLayout.setStretch(3, 1)
         self.verticalLayout.setStretch(4, 1)
+        self.verticalLayout.setStretch(5, 1)
         MainWindow.setCentralWidget(self.centralwidget)
         self.menubar = QtWidgets.QMenuBar(MainWindow)
         self.menubar.setGeometry(QtCore.QRect(0, 0, 501, 23))
@@ -234,6 +320,14 @@ class Ui_MainWindow(object):
         self.software_update_action.setObjectName("software_update_action")
         self.problem_feedback_action = QtWidgets.QAction(MainWindow)
         self.problem_feedback_action.setObjectName("problem_feedback_action")
+        self.incremental_action = QtWidgets.QAction(MainWindow)
+        self.incremental_action.setCheckable(True)
+        self.incremental_action.setObjectName("incremental_action")
+        self.resume_action = QtWidgets.QAction(MainWindow)
+        self.resume_action.setObjectName("resume_action")
+        self.menu.addAction(self.incremental_action)
+        self.menu.addAction(self.resume_action)
+        self.menu.addSeparator()
         self.menu.addAction(self.software_update_action)
         self.menu.addAction(self.problem_feedback_action)
         self.menubar.addAction(self.menu.menuAction())
@@ -250,14 +344,22 @@ class Ui_MainWindow(object):
         self.nums_label.setText(_translate("MainWindow", "每秒数量"))
         self.save_path_button.setText(_translate("MainWindow", "保存地址"))
         self.bin_settings_button.setText(_translate("MainWindow", "bin文件参数设置"))
+        self.workers_label.setText(_translate("MainWindow", "批量转换进程数"))
+        self.workers_spinBox.setSpecialValueText(_translate("MainWindow", "自动"))
+        self.gif_scale_label.setText(_translate("MainWindow", "GIF缩放"))
+        self.gif_step_label.setText(_translate("MainWindow", "GIF抽帧间隔"))
         self.convent_image_checkBox.setText(_translate("MainWindow", "图片格式转换"))
         self.video_to_image_checkBox.setText(_translate("MainWindow", "视频抽帧"))
         self.bin_to_image_checkBox.setText(_translate("MainWindow", "bin转图片"))
         self.image_to_bin_checkBox.setText(_translate("MainWindow", "图片转bin"))
         self.submit_button.setText(_translate("MainWindow", "转换"))
+        self.pause_button.setText(_translate("MainWindow", "暂停"))
+        self.stop_button.setText(_translate("MainWindow", "停止"))
         self.menu.setTitle(_translate("MainWindow", "设置"))
         self.update_action.setText(_translate("MainWindow", "检查更新"))
         self.log_action.setText(_translate("MainWindow", "更新日志"))
         self.action_3.setText(_translate("MainWindow", "关于"))
         self.software_update_action.setText(_translate("MainWindow", "软件更新"))
         self.problem_feedback_action.setText(_translate("MainWindow", "问题反馈"))
+        self.incremental_action.setText(_translate("MainWindow", "增量转换（跳过未变化的文件）"))
+        self.resume_action.setText(_translate("MainWindow", "继续上次任务"))
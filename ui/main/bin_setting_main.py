@@ -4,7 +4,7 @@ Project Name: format_conversion
 File Created: 2024.08.19
 Author: ZhangYuetao
 File Name: BinSetting.py
-Update: 2025.06.25
+Update: 2026.10.18
 """
 
 from ui.bin_settings import Ui_Dialog
@@ -53,6 +53,11 @@ class SettingsDialog(QDialog, Ui_Dialog):
         self.normalize_checkBox.setChecked(self.config['normalize'])
         self.flip_checkBox.setChecked(self.config['flip'])
         self.rotate_lineEdit.setText(str(self.config['rotate']))
+        self.mmap_checkBox.setChecked(self.config['use_mmap'])
+        self.multi_frame_checkBox.setChecked(self.config['multi_frame'])
+        self.header_bytes_lineEdit.setText(str(self.config['header_bytes']))
+        self.frame_header_bytes_lineEdit.setText(str(self.config['frame_header_bytes']))
+        self.frame_footer_bytes_lineEdit.setText(str(self.config['frame_footer_bytes']))
         
     def save_settings_to_toml(self):
         """
@@ -71,6 +76,11 @@ class SettingsDialog(QDialog, Ui_Dialog):
         self.config['normalize'] = self.normalize_checkBox.isChecked()
         self.config['flip'] = self.flip_checkBox.isChecked()
         self.config['rotate'] = int(self.rotate_lineEdit.text())
+        self.config['use_mmap'] = self.mmap_checkBox.isChecked()
+        self.config['multi_frame'] = self.multi_frame_checkBox.isChecked()
+        self.config['header_bytes'] = int(self.header_bytes_lineEdit.text())
+        self.config['frame_header_bytes'] = int(self.frame_header_bytes_lineEdit.text())
+        self.config['frame_footer_bytes'] = int(self.frame_footer_bytes_lineEdit.text())
 
         # 保存到 TOML 文件
         config.save_config(config.BIN_SETTING_FILE, self.config)
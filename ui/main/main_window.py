@@ -4,7 +4,7 @@ Project Name: format_conversion
 File Created: 2025.06.24
 Author: ZhangYuetao
 File Name: main_window.py
-Update: 2025.06.25
+Update: 2026.10.18
 """
 
 from PyQt5.QtCore import QTimer
@@ -12,6 +12,7 @@ from PyQt5.QtWidgets import QMainWindow, QFileDialog, QMessageBox
 from PyQt5 import QtGui
 
 import config
+import core
 import utils
 from ui.convent_ware import Ui_MainWindow
 from ui.main.bin_setting_main import SettingsDialog
@@ -32,9 +33,9 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         current_software_path (str): 当前软件的路径。
         current_software_version (str): 当前软件的版本号。
         updater(Updater): 自动更新类。
-        timer (QTimer): 用于动画效果的定时器。
-        animation_index (int): 动画索引，用于显示动态效果。
-        working_thread (WorkingThread): 工作线程对象。
+        batch_config (dict): 批量转换配置，包括进程数等数据。
+        video_config (dict): 视频抽帧配置，包括 GIF 缩放比例与抽帧间隔等数据。
+        worker (WorkingThread): 工作线程对象。
     """
 
     def __init__(self, window_title, parent=None):
@@ -57,28 +58,41 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.current_software_version = server_connect.get_current_software_version(self.current_software_path)
         
         self.updater = Updater(self.current_software_path, self.current_software_version)
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_animation)
-        self.animation_index = 0
-        self.working_thread = None
+        self.worker = None
 
         self.input_file_button.clicked.connect(self.open_file)
         self.input_dir_button.clicked.connect(self.open_dir)
         self.save_path_button.clicked.connect(self.save_file)
         self.bin_settings_button.clicked.connect(self.open_settings_dialog)
         self.submit_button.clicked.connect(self.submit)
+        self.pause_button.clicked.connect(self.toggle_pause)
+        self.stop_button.clicked.connect(self.stop_worker)
         self.convent_image_checkBox.clicked.connect(self.click_convent_image)
         self.video_to_image_checkBox.clicked.connect(self.click_video_to_image)
         self.bin_to_image_checkBox.clicked.connect(self.click_bin_to_image)
         self.image_to_bin_checkBox.clicked.connect(self.click_image_to_bin)
+        self.convent_image_checkBox.clicked.connect(self.update_gif_options)
+        self.video_to_image_checkBox.clicked.connect(self.update_gif_options)
+        self.bin_to_image_checkBox.clicked.connect(self.update_gif_options)
+        self.image_to_bin_checkBox.clicked.connect(self.update_gif_options)
+        self.target_format_box.currentTextChanged.connect(self.update_gif_options)
         self.software_update_action.triggered.connect(self.updater.update_software)
         self.problem_feedback_action.triggered.connect(self.feedback_problem)
+        self.incremental_action.toggled.connect(self.toggle_incremental)
+        self.resume_action.triggered.connect(self.resume_last_job)
         
-        self.updater.auto_update()
         self.updater.init_update()
+        QTimer.singleShot(0, self.updater.auto_update)  # 窗口显示后再在后台检查更新，不阻塞启动
 
-        self.target_format_box.addItems(['jpeg', 'bmp', 'png', 'tiff'])
+        self.target_format_box.addItems(['jpeg', 'bmp', 'png', 'tiff', 'gif'])
+        self.batch_config = config.load_config(config.BATCH_SETTING_FILE, config.BATCH_SETTING_DEFAULT_CONFIG)
+        self.workers_spinBox.setValue(int(self.batch_config['workers']))
+        self.incremental_action.setChecked(bool(self.batch_config['incremental']))
+        self.video_config = config.load_config(config.VIDEO_SETTING_FILE, config.VIDEO_SETTING_DEFAULT_CONFIG)
+        self.gif_scale_doubleSpinBox.setValue(float(self.video_config['gif_scale']))
+        self.gif_step_spinBox.setValue(int(self.video_config['gif_frame_step']))
         
+        self.task_controls_enabled(False)
         self.init_input()
 
     def init_input(self):
@@ -91,6 +105,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.nums_doubleSpinBox.setEnabled(False)
         self.nums_label.setEnabled(False)
         self.bin_settings_button.setEnabled(False)
+        self.update_gif_options()
         self.input_file_label.setText('请先导入待处理文件(夹)')
 
     def init_save_path(self):
@@ -113,6 +128,16 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.bin_to_image_checkBox.setEnabled(enable)
         self.image_to_bin_checkBox.setEnabled(enable)
         self.submit_button.setEnabled(enable)
+
+    def task_controls_enabled(self, running):
+        """
+        控制暂停与停止按钮的启用状态，只在任务进行中可用。
+
+        :param running: 是否有任务正在进行。
+        """
+        self.pause_button.setEnabled(running)
+        self.stop_button.setEnabled(running)
+        self.pause_button.setText('暂停')
     
     def feedback_problem(self):
         """
@@ -242,6 +267,47 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         else:
             self.process_type = None
 
+    def update_gif_options(self):
+        """
+        根据处理类型与保存格式更新 GIF 参数控件，视频转 GIF 时每秒数量改为分段数量。
+        """
+        is_gif = self.process_type == 'video_to_image' and self.target_format_box.currentText() == 'gif'
+        self.gif_scale_label.setEnabled(is_gif)
+        self.gif_scale_doubleSpinBox.setEnabled(is_gif)
+        self.gif_step_label.setEnabled(is_gif)
+        self.gif_step_spinBox.setEnabled(is_gif)
+        self.nums_label.setText('分段数量' if is_gif else '每秒数量')
+
+    def toggle_incremental(self, checked):
+        """
+        切换增量转换模式并保存到批量转换配置。
+
+        :param checked: 是否启用增量转换。
+        """
+        if checked != self.batch_config['incremental']:
+            self.batch_config['incremental'] = checked
+            config.save_config(config.BATCH_SETTING_FILE, self.batch_config)
+
+    def resume_last_job(self):
+        """
+        从检查点继续上次未完成的批量任务。
+        """
+        self.info_label.clear()
+        self.error_label.clear()
+        if self.worker is not None and self.worker.isRunning():
+            self.info_label.setText("已有任务正在进行")
+            return
+
+        output_folder = core.load_last_job()
+        job = core.load_job(output_folder) if output_folder else None
+        if job is None or job['status'] == 'completed':
+            self.info_label.setText("没有可继续的任务")
+            return
+
+        self.control_enabled(False)
+        self.worker = WorkingThread(None, output_folder, 'resume', None)
+        self.start_worker()
+
     def submit(self):
         """
         提交处理任务与工作线程，根据选择的处理类型执行相应的操作。
@@ -254,12 +320,19 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             self.control_enabled(False)
             if self.process_type == "video_to_image":
                 nums = float(self.nums_doubleSpinBox.text())
-            self.worker = WorkingThread(self.file_path, self.save_path, self.process_type, target_format, nums)
-            self.worker.update_signal.connect(self.update_info_label)
-            self.worker.error_signal.connect(self.update_error_label)
-            self.worker.finished.connect(self.stop_animation)
-            self.worker.start()
-            self.start_animation()
+            workers = self.workers_spinBox.value()
+            if workers != self.batch_config['workers']:
+                self.batch_config['workers'] = workers
+                config.save_config(config.BATCH_SETTING_FILE, self.batch_config)
+            gif_scale = self.gif_scale_doubleSpinBox.value()
+            gif_frame_step = self.gif_step_spinBox.value()
+            if (gif_scale, gif_frame_step) != (self.video_config['gif_scale'], self.video_config['gif_frame_step']):
+                self.video_config['gif_scale'] = gif_scale
+                self.video_config['gif_frame_step'] = gif_frame_step
+                config.save_config(config.VIDEO_SETTING_FILE, self.video_config)
+            self.worker = WorkingThread(self.file_path, self.save_path, self.process_type, target_format, nums, workers,
+                                        gif_scale, gif_frame_step, self.incremental_action.isChecked())
+            self.start_worker()
         elif self.file_path is None:
             self.info_label.setText("未导入文件")
         elif self.save_path is None:
@@ -267,27 +340,94 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         elif self.process_type is None:
             self.info_label.setText("未选择转换选项")
 
-    def start_animation(self):
+    def start_worker(self):
         """
-        启动处理动画。
+        连接工作线程的信号并启动线程。
         """
-        self.animation_index = 0
-        self.timer.start(500)
+        self.statusbar.clearMessage()
+        self.worker.update_signal.connect(self.update_info_label)
+        self.worker.error_signal.connect(self.update_error_label)
+        self.worker.progress_signal.connect(self.update_progress)
+        self.worker.finished.connect(self.worker_finished)
+        self.worker.start()
+        self.task_controls_enabled(True)
 
-    def stop_animation(self):
+    def worker_finished(self):
         """
-        停止处理动画。
+        工作线程结束后恢复控件。
         """
-        self.timer.stop()
+        self.task_controls_enabled(False)
         self.control_enabled(True)
 
-    def update_animation(self):
+    def toggle_pause(self):
+        """
+        暂停或继续当前任务。
+        """
+        if self.worker is None or not self.worker.isRunning():
+            return
+        if self.worker.cancel_token.paused:
+            self.worker.resume()
+            self.pause_button.setText('暂停')
+            self.info_label.setText("格式转换进行中")
+        else:
+            self.worker.pause()
+            self.pause_button.setText('继续')
+            self.info_label.setText("格式转换已暂停")
+
+    def stop_worker(self):
+        """
+        停止当前任务，正在转换的文件在下一个检查点停止，已完成的文件记入检查点，可通过“继续上次任务”继续。
+        """
+        if self.worker is None or not self.worker.isRunning():
+            return
+        self.worker.cancel()
+        self.task_controls_enabled(False)
+        self.info_label.setText("正在停止")
+
+    @staticmethod
+    def format_duration(seconds):
+        """
+        将秒数格式化为 时:分:秒。
+
+        :param seconds: 秒数，None 表示无法估计。
+        :return: 格式化后的文本。
         """
-        更新处理动画的文本。
+        if seconds is None:
+            return '--:--:--'
+        seconds = int(seconds)
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+    def update_progress(self, progress):
         """
-        animation_texts = ["格式转换进行中", "格式转换进行中.", "格式转换进行中..", "格式转换进行中..."]
-        self.info_label.setText(animation_texts[self.animation_index])
-        self.animation_index = (self.animation_index + 1) % len(animation_texts)
+        根据工作线程的进度快照更新进度文本与状态栏中的吞吐、剩余时间。
+
+        :param progress: ProgressTracker 的进度快照字典。
+        """
+        done, total = progress['done'], progress['total']
+        if progress['event'] == 'end':
+            text = (f"{'已取消，' if progress['cancelled'] else ''}共 {done} 个文件，"
+                    f"失败 {progress['failed']}，跳过 {progress['skipped']}，"
+                    f"用时 {self.format_duration(progress['elapsed'])}，"
+                    f"{progress['files_per_sec']:.1f} 个/秒，{progress['mb_per_sec']:.1f} MB/秒")
+            if progress['prefetch']:
+                text += f"，预读隐藏读取等待 {progress['prefetch']['hidden_seconds']:.1f} 秒"
+            self.statusbar.showMessage(text)
+            return
+
+        percent = done / total if total else 0.0
+        state = '已暂停' if self.worker is not None and self.worker.cancel_token.paused else '进行中'
+        if progress['scanning']:
+            # 输入文件夹仍在扫描，总数还会增加
+            self.info_label.setText(f"格式转换{state} {done}/{total}+（扫描中）")
+        else:
+            self.info_label.setText(f"格式转换{state} {done}/{total}（{percent:.0%}）")
+        text = f"{progress['files_per_sec']:.1f} 个/秒，{progress['mb_per_sec']:.1f} MB/秒"
+        if progress['bytes_total']:
+            text += f"，已读 {progress['bytes_in'] / (1 << 20):.1f}/{progress['bytes_total'] / (1 << 20):.1f} MB"
+        if progress['bytes_out']:
+            text += f"，已写 {progress['bytes_out'] / (1 << 20):.1f} MB"
+        text += f"，剩余 {self.format_duration(progress['eta'])}"
+        self.statusbar.showMessage(text)
 
     def update_info_label(self, text):
         """
@@ -318,10 +458,14 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
         :param event: 关闭事件对象。
         """
-        if self.working_thread and self.working_thread.isRunning():
-            self.working_thread.terminate()  # 终止线程
-            self.working_thread.wait()  # 等待线程完全结束
-        self.working_thread = None  # 置为 None
+        if self.worker is not None and self.worker.isRunning():
+            # 协作取消而不是强制终止线程，避免留下写了一半的文件
+            self.worker.cancel()
+            self.worker.wait()
+        self.worker = None
+
+        if self.updater.check_thread is not None:
+            self.updater.check_thread.wait()  # 版本检查有超时限制，等待其结束后再退出
 
         if self.feedback_window:
             self.feedback_window.close()
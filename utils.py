@@ -4,17 +4,18 @@ Project Name: format_conversion
 File Created: 2024.08.19
 Author: ZhangYuetao
 File Name: utils.py
-Update: 2025.06.25
+Update: 2026.10.18
 """
 
 import os
 import sys
-import time
+
+from core.file_monitor import wait_until_complete
 
 
 def is_file_complete(file_path, timeout=60):
     """
-    检查文件是否完全复制完成。
+    检查文件是否完全复制完成，文件大小与修改时间保持稳定或写入方关闭文件后立即返回。
 
     :param file_path: 文件路径。
     :param timeout: 最大等待时间（秒）。
@@ -22,26 +23,7 @@ def is_file_complete(file_path, timeout=60):
     """
     if not os.path.exists(file_path):
         return False
-
-    initial_size = os.path.getsize(file_path)
-    time.sleep(1)  # 等待1秒钟，给文件写入一些时间
-    final_size = os.path.getsize(file_path)
-
-    # 如果文件大小没有变化，认为文件已复制完成
-    if initial_size == final_size:
-        return True
-
-    # 如果文件大小仍在变化，则继续等待
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        time.sleep(1)
-        new_size = os.path.getsize(file_path)
-        if new_size == final_size:
-            return True
-        final_size = new_size
-
-    # 超过最大等待时间后认为文件未复制完成
-    return False
+    return wait_until_complete(file_path, timeout)
 
 
 def get_current_software_path():